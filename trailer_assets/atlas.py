@@ -0,0 +1,129 @@
+import json
+import os
+import re
+from PIL import Image
+from pages import IMG_TAG
+
+ATLAS_DIR = os.path.join('images', 'atlas')
+MAX_SHEET_SIZE = (2048, 2048)
+
+# Sprite width per source directory: about 2x the CSS width the trailer
+# pages show posters (~180px) and category tiles (~385px) at
+THUMBNAIL_WIDTHS = {
+    'images/posters': 342,
+    'images/simple_posters': 342,
+    'images/categories': 768,
+}
+
+def thumbnail_width(path):
+    return THUMBNAIL_WIDTHS.get(os.path.dirname(path).replace(os.sep, '/'), 342)
+
+# Shelf packing: sort by height, fill rows left to right, start a new row
+# when the current one is full and a new sheet when the rows run out.
+# Returns {key: (sheet, x, y)} and the used size of every sheet.
+def pack(sizes, max_sheet=MAX_SHEET_SIZE, padding=2):
+    max_width, max_height = max_sheet
+    order = sorted(sizes, key=lambda key: (-sizes[key][1], -sizes[key][0], key))
+
+    placements = {}
+    sheets = [[0, 0]]
+    x = y = shelf_height = 0
+    for key in order:
+        width, height = sizes[key]
+        if width > max_width or height > max_height:
+            raise ValueError(f"{key} ({width}x{height}) is larger than a sheet")
+
+        # Next row on this sheet
+        if x + width > max_width:
+            x, y = 0, y + shelf_height + padding
+            shelf_height = 0
+        # Next sheet
+        if y + height > max_height:
+            sheets.append([0, 0])
+            x = y = shelf_height = 0
+
+        placements[key] = (len(sheets) - 1, x, y)
+        sheets[-1][0] = max(sheets[-1][0], x + width)
+        sheets[-1][1] = max(sheets[-1][1], y + height)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+    return placements, [tuple(size) for size in sheets]
+
+# Decode a master at (roughly) thumbnail size and scale it to width.
+# draft() lets the JPEG decoder skip most of the full-size decode.
+def load_thumbnail(path, width):
+    with Image.open(path) as image:
+        height = round(image.height * width / image.width)
+        image.draft("RGB", (width, height))
+        return image.convert("RGB").resize((width, height), Image.LANCZOS)
+
+# Pack the given images into one or a few JPEG sheets and write a JSON map
+# to <output_dir>/<name>.json. entries is a list of (image_path, thumbnail_width).
+def build_atlas(entries, name, output_dir=ATLAS_DIR, max_sheet=MAX_SHEET_SIZE, padding=2, quality=85):
+    thumbnails = {path: load_thumbnail(path, width) for path, width in entries}
+    placements, sheet_sizes = pack({path: im.size for path, im in thumbnails.items()},
+                                   max_sheet, padding)
+
+    os.makedirs(output_dir, exist_ok=True)
+    sheets = [Image.new("RGB", size, (0, 0, 0)) for size in sheet_sizes]
+    sprites = {}
+    for path, (sheet, x, y) in placements.items():
+        thumb = thumbnails[path]
+        sheets[sheet].paste(thumb, (x, y))
+        sprites[path] = {"sheet": sheet, "x": x, "y": y, "width": thumb.width, "height": thumb.height}
+
+    sheet_info = []
+    for i, sheet in enumerate(sheets):
+        sheet_path = os.path.join(output_dir, f"{name}_sheet_{i}.jpg")
+        sheet.save(sheet_path, "JPEG", quality=quality, optimize=True, progressive=True)
+        sheet_info.append({"file": sheet_path.replace(os.sep, "/"), "width": sheet.width, "height": sheet.height})
+
+    atlas_map = {"sheets": sheet_info, "sprites": sprites}
+    with open(os.path.join(output_dir, f"{name}.json"), "w") as f:
+        json.dump(atlas_map, f, indent=2, sort_keys=True)
+    return atlas_map
+
+# CSS class name for the sprite of an image path
+def sprite_class(path):
+    return "sprite-" + re.sub(r"[^A-Za-z0-9_-]", "-", os.path.splitext(path)[0].replace("images/", "", 1))
+
+# Stylesheet that shows each sprite through background offsets. Sizes and
+# offsets are percentages so a sprite scales with its (same aspect ratio)
+# container, e.g. the 2:3 .movie-poster box.
+def sprite_css(atlas_map):
+    rules = [".sprite { display: block; width: 100%; height: 100%; background-repeat: no-repeat; }"]
+    for i, sheet in enumerate(atlas_map["sheets"]):
+        rules.append(f".sprite-sheet-{i} {{ background-image: url('{sheet['file']}'); }}")
+
+    for path, sprite in sorted(atlas_map["sprites"].items()):
+        sheet = atlas_map["sheets"][sprite["sheet"]]
+        spare_x = sheet["width"] - sprite["width"]
+        spare_y = sheet["height"] - sprite["height"]
+        pos_x = 100.0 * sprite["x"] / spare_x if spare_x else 0.0
+        pos_y = 100.0 * sprite["y"] / spare_y if spare_y else 0.0
+        size_x = 100.0 * sheet["width"] / sprite["width"]
+        size_y = 100.0 * sheet["height"] / sprite["height"]
+        rules.append(
+            f".{sprite_class(path)} {{ background-size: {size_x:.4f}% {size_y:.4f}%; "
+            f"background-position: {pos_x:.4f}% {pos_y:.4f}%; }}"
+        )
+    return "\n".join(rules)
+
+# Swap every <img> whose source is in the atlas for a sprite element and
+# add the sprite stylesheet to <head>
+def spritify_html(html, atlas_map):
+    sprites = atlas_map["sprites"]
+
+    def replace(match):
+        src, alt = match.group(1), match.group(2)
+        if src not in sprites:
+            return match.group(0)
+        sheet = sprites[src]["sheet"]
+        return f'<span class="sprite sprite-sheet-{sheet} {sprite_class(src)}" role="img" aria-label="{alt}"></span>'
+
+    html = IMG_TAG.sub(replace, html)
+    return html.replace("</head>", f"<style>\n{sprite_css(atlas_map)}\n</style>\n</head>", 1)
+
+# Image paths referenced by <img> tags in a page, in order
+def html_image_paths(html):
+    return [match.group(1) for match in IMG_TAG.finditer(html)]
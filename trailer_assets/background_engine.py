@@ -0,0 +1,151 @@
+from collections import namedtuple
+import numpy as np
+from PIL import Image
+
+# Shape kinds stored in Shapes.kind
+RECTANGLE, CIRCLE, LINE = 0, 1, 2
+
+# One row per shape:
+#   kind   - RECTANGLE, CIRCLE or LINE
+#   geom   - (x1, y1, x2, y2) for rectangles and lines, (cx, cy, r, 0) for circles
+#   width  - stroke width for lines (0 for filled shapes)
+#   color  - RGBA, alpha 0-255
+Shapes = namedtuple("Shapes", ["kind", "geom", "width", "color"])
+
+# Random translucent rectangles over a dark background for a movie poster
+def poster_background(seed, size, count=5):
+    rng = np.random.default_rng(seed)
+    width, height = size
+
+    bg_color = tuple(int(c) for c in rng.integers(20, 61, size=3))
+
+    # Draw every shape parameter for the poster in one go
+    corners = rng.integers(0, [width + 1, height + 1, width + 1, height + 1], size=(count, 4))
+    geom = np.empty((count, 4), dtype=np.float32)
+    geom[:, 0] = np.minimum(corners[:, 0], corners[:, 2])
+    geom[:, 1] = np.minimum(corners[:, 1], corners[:, 3])
+    geom[:, 2] = np.maximum(corners[:, 0], corners[:, 2])
+    geom[:, 3] = np.maximum(corners[:, 1], corners[:, 3])
+
+    color = np.empty((count, 4), dtype=np.uint8)
+    color[:, :3] = rng.integers(100, 256, size=(count, 3))
+    color[:, 3] = rng.integers(30, 101, size=count)
+
+    shapes = Shapes(
+        kind=np.full(count, RECTANGLE, dtype=np.uint8),
+        geom=geom,
+        width=np.zeros(count, dtype=np.float32),
+        color=color,
+    )
+    return bg_color, shapes
+
+# Mixed rectangles, circles and lines tinted from the banner color.
+# bg_color may be None, in which case a random one is picked.
+def banner_background(seed, size, bg_color=None, count=10):
+    rng = np.random.default_rng(seed)
+    width, height = size
+
+    random_bg = rng.integers(20, 181, size=3)
+    if bg_color is None:
+        bg_color = tuple(int(c) for c in random_bg)
+
+    kind = rng.integers(0, 3, size=count).astype(np.uint8)
+    points = rng.integers(0, [width + 1, height + 1, width + 1, height + 1], size=(count, 4))
+    radius = rng.integers(20, 201, size=count)
+    stroke = rng.integers(5, 21, size=count)
+
+    geom = points.astype(np.float32)
+    rects = kind == RECTANGLE
+    geom[rects] = np.column_stack((
+        np.minimum(points[rects, 0], points[rects, 2]),
+        np.minimum(points[rects, 1], points[rects, 3]),
+        np.maximum(points[rects, 0], points[rects, 2]),
+        np.maximum(points[rects, 1], points[rects, 3]),
+    ))
+    circles = kind == CIRCLE
+    geom[circles, 2] = radius[circles]
+    geom[circles, 3] = 0
+
+    color = np.empty((count, 4), dtype=np.uint8)
+    tint = np.asarray(bg_color, dtype=np.int32) + rng.integers(-20, 101, size=(count, 3))
+    color[:, :3] = np.clip(tint, 0, 255)
+    color[:, 3] = rng.integers(30, 151, size=count)
+
+    shapes = Shapes(
+        kind=kind,
+        geom=geom,
+        width=np.where(kind == LINE, stroke, 0).astype(np.float32),
+        color=color,
+    )
+    return bg_color, shapes
+
+# Clip a bounding box to the canvas; returns None when nothing is visible
+def _clip_box(x0, y0, x1, y1, width, height):
+    x0, y0 = max(int(np.floor(x0)), 0), max(int(np.floor(y0)), 0)
+    x1, y1 = min(int(np.ceil(x1)) + 1, width), min(int(np.ceil(y1)) + 1, height)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return x0, y0, x1, y1
+
+# Coverage (0-1) of one shape over the pixels of its bounding box.
+# Circles and lines get a one-pixel soft edge for anti-aliasing.
+def _coverage(kind, geom, stroke, width, height):
+    if kind == RECTANGLE:
+        box = _clip_box(geom[0], geom[1], geom[2], geom[3], width, height)
+        return box, None
+
+    if kind == CIRCLE:
+        cx, cy, r = geom[0], geom[1], geom[2]
+        box = _clip_box(cx - r, cy - r, cx + r, cy + r, width, height)
+        if box is None:
+            return None, None
+        x0, y0, x1, y1 = box
+        xs = np.arange(x0, x1, dtype=np.float32) - cx
+        ys = np.arange(y0, y1, dtype=np.float32)[:, None] - cy
+        dist = np.sqrt(xs * xs + ys * ys)
+        return box, np.clip(r - dist + 0.5, 0.0, 1.0)
+
+    # Line: distance from each pixel to the segment, thickened by the stroke
+    ax, ay, bx, by = geom
+    half = stroke / 2.0
+    box = _clip_box(min(ax, bx) - half, min(ay, by) - half,
+                    max(ax, bx) + half, max(ay, by) + half, width, height)
+    if box is None:
+        return None, None
+    x0, y0, x1, y1 = box
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    px = np.arange(x0, x1, dtype=np.float32) - ax
+    py = np.arange(y0, y1, dtype=np.float32)[:, None] - ay
+    if length_sq == 0:
+        t = 0.0
+    else:
+        t = np.clip((px * dx + py * dy) / length_sq, 0.0, 1.0)
+    ex = px - t * dx
+    ey = py - t * dy
+    dist = np.sqrt(ex * ex + ey * ey)
+    return box, np.clip(half - dist + 0.5, 0.0, 1.0)
+
+# Alpha-blend the shapes over a solid background, in order, and return an
+# RGB Pillow image. Each shape is one vectorized pass over its bounding box.
+def composite(bg_color, shapes, size):
+    width, height = size
+    canvas = np.empty((height, width, 3), dtype=np.float32)
+    canvas[:] = bg_color
+
+    colors = shapes.color[:, :3].astype(np.float32)
+    alphas = shapes.color[:, 3].astype(np.float32) / 255.0
+
+    for i in range(len(shapes.kind)):
+        box, coverage = _coverage(shapes.kind[i], shapes.geom[i], shapes.width[i], width, height)
+        if box is None:
+            continue
+        x0, y0, x1, y1 = box
+        region = canvas[y0:y1, x0:x1]
+        if coverage is None:
+            region += (colors[i] - region) * alphas[i]
+        else:
+            region += (colors[i] - region) * (coverage * alphas[i])[..., None]
+
+    pixels = np.clip(canvas + 0.5, 0, 255).astype(np.uint8)
+    return Image.fromarray(pixels, "RGB")
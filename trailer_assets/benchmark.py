@@ -0,0 +1,370 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ("poster", "banner", "html", "deck")
+SIZES = (10, 1000)
+# Over an hour for the image stages alone, so only run with --large
+LARGE_SIZE = 50000
+BENCH_DIR = "benchmarks"
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+# Every render in a benchmark run uses this font (font_registry.FONT_ENV),
+# so the golden images and timings don't depend on the fonts installed
+PINNED_FONT = os.path.join(BENCH_DIR, "fonts", "DejaVuSans.ttf")
+
+# Files written by the image stages cycle through this many names, so a
+# 50k-title run measures encode + write without filling the disk
+FILE_RING = 100
+
+GENRES = ["Sci-Fi", "Thriller", "Romance", "Adventure", "Horror", "Comedy",
+          "Drama", "Documentary", "Fantasy", "Action", "Animation"]
+TITLE_WORDS = ["Cosmic", "Last", "Midnight", "Urban", "Robot", "Mountain", "Magical",
+               "Speed", "Shadow", "Legend", "Kingdom", "Quest", "Detective", "Factory",
+               "Revolution", "Explorer", "Paris", "Jungle", "World", "Empire", "Signal",
+               "Horizon", "Echoes", "Frontier", "Ember", "Tide", "Circuit", "Harbor"]
+
+# Deterministic made-up catalog shaped like movie_data, with titles of
+# varying length so text fitting sees one-, two- and three-line layouts
+def synthetic_catalog(count, seed=0):
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(count):
+        words = rng.sample(TITLE_WORDS, rng.choice((1, 2, 2, 3, 4)))
+        catalog.append({
+            "title": " ".join(["The"] * (i % 3 == 0) + words),
+            "genre": rng.choice(GENRES),
+            "year": rng.randint(1970, 2025),
+            "rating": round(rng.uniform(2.5, 5.0), 1),
+        })
+    return catalog
+
+# Each stage is a generator that does one item of work per yield, so the
+# runner can time items individually. The first yield marks the end of
+# setup (imports, directories) and is not timed; work after the last
+# yield (saving a page or deck) only shows up in the stage total. Stages
+# run inside a scratch working directory, like the scripts' images/ layout.
+def bench_posters(catalog):
+    from create_trailer_images import create_movie_poster, item_seed
+    os.makedirs(os.path.join("images", "posters"))
+    yield
+    for i, movie in enumerate(catalog):
+        seed = item_seed("poster", f"movie_{i+1}.jpg")
+        create_movie_poster(movie["title"], movie["genre"], movie["year"], movie["rating"],
+                            f"movie_{i % FILE_RING}.jpg", seed=seed)
+        yield
+
+def bench_banners(catalog):
+    from create_trailer_images import create_category_banner, item_seed
+    os.makedirs(os.path.join("images", "categories"))
+    yield
+    for i, movie in enumerate(catalog):
+        seed = item_seed("banner", f"category_{i+1}.jpg")
+        create_category_banner(movie["title"], f"category_{i % FILE_RING}.jpg", seed=seed)
+        yield
+
+# The trailer page with one card per title, minified and precompressed
+# like the real pages
+def bench_html(catalog):
+    from catalog_data import categories
+    from pages import TRAILER_PAGE, hero_slots, movie_card, precompressed, scene_sections
+    from templates import minify_html
+    from trailer_script import load_graph
+    graph = load_graph()
+    cards = []
+    yield
+    for i, movie in enumerate(catalog):
+        cards.append(movie_card(movie, i))
+        yield
+    grid = f'<div class="movie-grid">{"".join(cards)}</div>'
+    html = TRAILER_PAGE.render(hero_slots(categories), scenes=scene_sections({"trending": grid}, graph))
+    data = minify_html(html).encode("utf-8")
+    with open("catalog.html", "wb") as f:
+        f.write(data)
+    for ext, compressed in precompressed(data).items():
+        with open("catalog.html" + ext, "wb") as f:
+            f.write(compressed)
+
+# The catalog deck writer (catalog_deck), one slide per title with its
+# poster. Records point at FILE_RING posters rendered during setup, so
+# each slide still opens, downscales and encodes a poster and the deck
+# stores FILE_RING media parts however many titles there are.
+def bench_deck(catalog):
+    from catalog_deck import DeckWriter, deck_template, prepare_slide
+    from deck_media import DPI
+    from create_trailer_images import create_movie_poster, item_seed
+    os.makedirs(os.path.join("images", "posters"))
+    for i, movie in enumerate(catalog[:FILE_RING]):
+        create_movie_poster(movie["title"], movie["genre"], movie["year"], movie["rating"],
+                            f"movie_{i+1}.jpg", seed=item_seed("poster", f"movie_{i+1}.jpg"))
+    template, layout_name = deck_template()
+    writer = DeckWriter("catalog.pptx", template, layout_name)
+    yield
+    for i, movie in enumerate(catalog):
+        record = dict(movie, id=f"movie_{i % FILE_RING + 1}")
+        writer.add(*prepare_slide((i, record, True, DPI, 0)))
+        yield
+    writer.close()
+
+BENCHMARKS = {
+    "poster": bench_posters,
+    "banner": bench_banners,
+    "html": bench_html,
+    "deck": bench_deck,
+}
+
+# Value at a fraction (0-1) of an already sorted list, nearest rank
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+# Peak resident set size of this process in MB (None where unsupported)
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+# Run one stage over one catalog size in this process. Progress output
+# from the scripts is discarded so it doesn't end up in the timings.
+def run_case(stage, size, seed=0):
+    catalog = synthetic_catalog(size, seed)
+    latencies = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, "w") as devnull:
+        os.chdir(workdir)
+        try:
+            with contextlib.redirect_stdout(devnull):
+                items = BENCHMARKS[stage](catalog)
+                next(items)
+                start = last = time.perf_counter()
+                for _ in items:
+                    now = time.perf_counter()
+                    latencies.append(now - last)
+                    last = now
+                seconds = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+    latencies.sort()
+    return {
+        "stage": stage,
+        "size": size,
+        "seconds": round(seconds, 4),
+        "items_per_s": round(size / seconds, 2) if seconds else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+# Run one case in a fresh interpreter so peak RSS belongs to that case alone
+def run_case_isolated(stage, size, seed=0):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--case", stage, str(size), "--seed", str(seed)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+# Fixed renders whose pixels must not change unless a change means to
+def golden_renders():
+    from create_trailer_images import (
+        categories, item_seed, movie_data, render_category_banner, render_movie_poster
+    )
+    for i, movie in enumerate(movie_data[:3]):
+        filename = f"movie_{i+1}.jpg"
+        yield f"poster_{i+1}", render_movie_poster(
+            movie["title"], movie["genre"], movie["year"], movie["rating"],
+            seed=item_seed("poster", filename))
+    for i, name in enumerate(categories[:2]):
+        yield f"banner_{i+1}", render_category_banner(name, seed=item_seed("banner", f"category_{i+1}.jpg"))
+
+# What the golden images were rendered with. FreeType's rasterizer can
+# shift anti-aliased edges between releases even with the same font, so
+# a mismatch names any difference here as the likely cause.
+def render_environment():
+    import hashlib
+    from PIL import __version__ as pillow_version, features
+    from font_registry import find_font
+    font = find_font()
+    digest = None
+    if font and os.path.exists(font):
+        with open(font, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+    return {"font": os.path.basename(font) if font else None, "font_sha1": digest,
+            "pillow": pillow_version, "freetype": features.version("freetype2")}
+
+# Compare golden_renders() with the PNGs in golden_dir (or rewrite them).
+# Returns a list of problems, empty when every render matches exactly.
+def check_golden(golden_dir=GOLDEN_DIR, update=False):
+    from PIL import Image, ImageChops
+    problems = []
+    os.makedirs(golden_dir, exist_ok=True)
+    environment_path = os.path.join(golden_dir, "environment.json")
+    environment = render_environment()
+    if update:
+        with open(environment_path, "w") as f:
+            json.dump(environment, f, indent=2, sort_keys=True)
+    for name, image in golden_renders():
+        path = os.path.join(golden_dir, f"{name}.png")
+        if update:
+            image.save(path)
+            continue
+        if not os.path.exists(path):
+            problems.append(f"{name}: no golden image (run with --update-golden)")
+            continue
+        with Image.open(path) as golden:
+            golden = golden.convert("RGB")
+            if golden.size != image.size:
+                problems.append(f"{name}: size {image.size} != golden {golden.size}")
+                continue
+            diff = ImageChops.difference(golden, image)
+            if diff.getbbox() is not None:
+                changed = sum(1 for pixel in diff.getdata() if pixel != (0, 0, 0))
+                max_diff = max(high for _, high in diff.getextrema())
+                problems.append(f"{name}: {changed} pixels differ (max channel diff {max_diff})")
+    if problems and os.path.exists(environment_path):
+        with open(environment_path) as f:
+            golden_environment = json.load(f)
+        for key, value in sorted(golden_environment.items()):
+            if environment.get(key) != value:
+                problems.append(f"rendered with {key} {environment.get(key)}, golden images with {value}")
+    return problems
+
+# Timings only mean something against a baseline from the same kind of
+# machine; returns how this run's machine differs from the baseline's
+def machine_differences(results, baseline):
+    return [f"{key} {results.get(key)!r} vs {baseline.get(key)!r}"
+            for key in ("platform", "cpu_count") if results.get(key) != baseline.get(key)]
+
+# Slowdowns smaller than these are timing noise whatever the percentage:
+# the html stage's p99 is a few microseconds, and its 10-title case runs
+# in milliseconds
+P99_FLOOR_MS = 1.0
+TOTAL_FLOOR_SECONDS = 0.05
+
+# Cases slower than the baseline by more than max_regression (a fraction),
+# either in throughput or in p99 latency
+def compare(results, baseline, max_regression=0.10):
+    previous = {(case["stage"], case["size"]): case for case in baseline["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        old = previous.get((case["stage"], case["size"]))
+        if old is None:
+            continue
+        name = f"{case['stage']}@{case['size']}"
+        if (old["items_per_s"] and case["items_per_s"] < old["items_per_s"] * (1 - max_regression)
+                and case["seconds"] - old["seconds"] >= TOTAL_FLOOR_SECONDS):
+            regressions.append(f"{name}: {case['items_per_s']} items/s vs {old['items_per_s']} baseline")
+        if (old["p99_ms"] and case["p99_ms"] > old["p99_ms"] * (1 + max_regression)
+                and case["p99_ms"] - old["p99_ms"] >= P99_FLOOR_MS):
+            regressions.append(f"{name}: p99 {case['p99_ms']} ms vs {old['p99_ms']} ms baseline")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trailer asset pipeline stages")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="comma-separated stages to run (poster, banner, html, deck)")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in SIZES),
+                        help="comma-separated synthetic catalog sizes")
+    parser.add_argument("--large", action="store_true",
+                        help=f"also run the {LARGE_SIZE:,}-title catalogs (takes well over an hour)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic catalogs")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results.json"),
+                        help="where to write this run's results")
+    parser.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"),
+                        help="results to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the new baseline")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="allowed slowdown versus the baseline before failing (0.10 = 10%%)")
+    parser.add_argument("--golden-dir", default=GOLDEN_DIR)
+    parser.add_argument("--update-golden", action="store_true",
+                        help="re-render the golden images instead of checking them")
+    parser.add_argument("--skip-golden", action="store_true")
+    parser.add_argument("--case", nargs=2, metavar=("STAGE", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Set before anything renders; the isolated cases inherit it
+    if not os.environ.get("NETFIX_FONT") and os.path.exists(PINNED_FONT):
+        os.environ["NETFIX_FONT"] = os.path.abspath(PINNED_FONT)
+
+    # Child process for a single isolated case
+    if args.case:
+        print(json.dumps(run_case(args.case[0], int(args.case[1]), args.seed)))
+        return
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    for stage in stages:
+        if stage not in BENCHMARKS:
+            parser.error(f"unknown stage: {stage}")
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    if args.large and LARGE_SIZE not in sizes:
+        sizes.append(LARGE_SIZE)
+
+    failed = False
+    golden = []
+    if not args.skip_golden:
+        golden = check_golden(args.golden_dir, update=args.update_golden)
+        if args.update_golden:
+            print(f"Golden images written to {args.golden_dir}")
+        for problem in golden:
+            print(f"GOLDEN MISMATCH {problem}")
+        failed = failed or bool(golden)
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "cases": [],
+        "golden_problems": golden,
+    }
+    print(f"{'stage':<8}{'size':>8}{'items/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+    for stage in stages:
+        for size in sizes:
+            case = run_case_isolated(stage, size, args.seed)
+            results["cases"].append(case)
+            print(f"{stage:<8}{size:>8}{case['items_per_s']:>12}{case['p50_ms']:>10}"
+                  f"{case['p99_ms']:>10}{case['peak_rss_mb'] or '-':>10}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        differences = machine_differences(results, baseline)
+        if differences:
+            print(f"WARNING {args.baseline} was recorded on another machine ({'; '.join(differences)}), "
+                  "timings not compared; run with --save-baseline to record one for this machine")
+        else:
+            regressions = compare(results, baseline, args.max_regression)
+            for regression in regressions:
+                print(f"REGRESSION {regression}")
+            if not regressions:
+                print(f"No regressions versus {args.baseline}")
+            failed = failed or bool(regressions)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
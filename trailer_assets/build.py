@@ -0,0 +1,394 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from instrumentation import count, report as report_metrics
+
+# Builds the whole asset set as a graph of netfix-assets commands:
+#
+#    (clips) ───────────────┐
+#     posters ─────────┬────┴── page_videos
+#     banners ─────────┼─────── page_trailer
+#     simple_posters ──┴─────── page_simple
+#     posters, banners ──────── deck
+#
+# clips downloads from YouTube (network, pytube), so it's opt-in: it only
+# runs when named as a target, and otherwise page_videos uses whatever
+# clips are on disk. The deck goes to dist/ rather than over the
+# Netfix_App_Trailer.pptx checked into the repo.
+#
+# Each node declares its inputs (source files, plus the outputs of the
+# nodes it depends on) and its outputs. Like make, a node only runs when
+# an output is missing or an input changed since it last succeeded; unlike
+# make, "changed" means different content, not a newer mtime, so a stage
+# that rewrites identical bytes doesn't set off everything downstream.
+# Independent nodes run at the same time, each as its own netfix-assets
+# process; the manifests several of them update (render cache,
+# placeholders, scenes) are merged on save (see file_lock).
+#
+#   name      - node name, used as a build target
+#   command   - netfix-assets arguments
+#   deps      - nodes that have to be built first
+#   inputs    - files whose content the outputs depend on
+#   outputs   - files the command writes
+#   checked   - the inputs the command compares itself (render cache, slide
+#               and page keys). When only these changed it runs as is; when
+#               anything else did (its code, say) it runs with --force, as
+#               its own checks would find its outputs current. None for a
+#               command that has no --force.
+#   optional  - a failure is reported but doesn't stop the nodes after it
+#               (they build with whatever is on disk)
+Node = namedtuple("Node", ["name", "command", "deps", "inputs", "outputs", "checked", "optional"])
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NETFIX_ASSETS = os.path.join(HERE, "netfix_assets.py")
+BUILD_STATE = os.path.join("images", ".build_state.json")
+DECK_OUTPUT = os.path.join("dist", "Netfix_App_Trailer.pptx")
+# Nodes that only run when named as a target
+OPT_IN = ("clips",)
+# Bump whenever nodes are fingerprinted differently
+STATE_VERSION = 1
+
+def _sources(*names):
+    return [os.path.join(HERE, name) for name in names]
+
+RENDER_SOURCES = _sources("create_trailer_images.py", "background_engine.py", "catalog_data.py",
+                          "derivatives.py", "encoder.py", "font_registry.py", "placeholders.py",
+                          "render_cache.py", "text_layout.py")
+SIMPLE_RENDER_SOURCES = _sources("create_simple_trailer.py", "catalog_data.py", "encoder.py", "font_registry.py",
+                                 "placeholders.py", "render_cache.py", "text_layout.py")
+PAGE_SOURCES = _sources("pages.py", "templates.py", "catalog_data.py", "trailer_script.py", "netfix_assets.py")
+
+# Imports the data modules here rather than at the top, so netfix-assets
+# can take build's options without loading them
+def build_nodes():
+    from catalog_data import categories, movie_data, record_key
+    from clip_posters import clip_paths
+    from download_youtube_samples import videos
+    from pages import PAGES, PLACEHOLDER_MANIFEST, SIMPLE_POSTER_DIR
+    from trailer_script import SCRIPT_PATH
+
+    posters = [f"images/posters/{record_key(movie, i, 'poster')}.jpg" for i, movie in enumerate(movie_data)]
+    banners = [f"images/categories/{record_key({}, i, 'banner')}.jpg" for i in range(len(categories))]
+    simple_posters = [f"{SIMPLE_POSTER_DIR}/{record_key(movie, i, 'poster')}.jpg"
+                      for i, movie in enumerate(movie_data)]
+    clips = clip_paths(videos)
+    images = posters + banners
+    deck_inputs = [SCRIPT_PATH] + images
+    nodes = [
+        Node("clips", ["fetch", "--source", "youtube"], [], _sources("download_youtube_samples.py"),
+             clips, None, True),
+        Node("posters", ["posters"], [], RENDER_SOURCES, posters, [], False),
+        Node("banners", ["banners"], [], RENDER_SOURCES, banners, [], False),
+        Node("simple_posters", ["posters", "--simple"], [], SIMPLE_RENDER_SOURCES, simple_posters, [], False),
+        Node("deck", ["deck", "--output", DECK_OUTPUT], ["posters", "banners"],
+             _sources("create_trailer_ppt.py", "deck_media.py", "trailer_script.py") + deck_inputs,
+             [DECK_OUTPUT], deck_inputs, False),
+    ]
+    # Every render node writes its entries into the one placeholder
+    # manifest the pages read, so a page waits for all of them: one that
+    # started sooner would find the manifest changed on the next build
+    renders = ["posters", "banners", "simple_posters"]
+    for page, (path, _) in PAGES.items():
+        deps, page_inputs = renders, [SCRIPT_PATH, PLACEHOLDER_MANIFEST] + images
+        sources = PAGE_SOURCES
+        if page == "simple":
+            page_inputs = [SCRIPT_PATH, PLACEHOLDER_MANIFEST] + simple_posters
+        if page == "videos":
+            deps, page_inputs, sources = deps + ["clips"], page_inputs + clips, sources + _sources("clip_posters.py")
+        nodes.append(Node(f"page_{page}", ["html", "--page", page], deps, sources + page_inputs,
+                          [path, path + ".gz"], page_inputs, False))
+    return {node.name: node for node in nodes}
+
+# The named targets and everything they depend on, in declaration order;
+# no targets means every node but the opt-in ones, which are only
+# selected when named themselves
+def select(nodes, targets=None):
+    if targets is None:
+        targets = [name for name in nodes if name not in OPT_IN]
+    wanted = set()
+
+    def add(name):
+        if name not in wanted:
+            wanted.add(name)
+            for dep in nodes[name].deps:
+                if dep not in OPT_IN or dep in targets:
+                    add(dep)
+
+    for name in targets:
+        add(name)
+    return [name for name in nodes if name in wanted]
+
+# What the last successful run of each node was built from, and content
+# digests of the files looked at, kept by (size, mtime) so an unchanged
+# file isn't read again
+class BuildState:
+    def __init__(self, path=BUILD_STATE):
+        self.path = path
+        self.nodes = {}
+        self.digests = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == STATE_VERSION:
+                    self.nodes = data.get("nodes", {})
+                    self.digests = data.get("digests", {})
+            except (IOError, ValueError):
+                self.nodes, self.digests = {}, {}
+
+    def digest(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        cached = self.digests.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        sha = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        self.digests[path] = [stat.st_size, stat.st_mtime_ns, sha.hexdigest()]
+        count("build_files_hashed")
+        return sha.hexdigest()
+
+    # input path -> digest (None for a missing file) for a node right now
+    def inputs(self, node):
+        inputs = {path: self.digest(path) for path in node.inputs}
+        inputs["command"] = " ".join(node.command)
+        return inputs
+
+    # Inputs (and "command") that differ from the node's last successful
+    # run; None when it never ran
+    def changed(self, node, inputs):
+        previous = self.nodes.get(node.name)
+        if previous is None:
+            return None
+        changed = [path for path, digest in inputs.items() if previous["inputs"].get(path) != digest]
+        return changed + [path for path in previous["inputs"] if path not in inputs]
+
+    # Why node has to run, or None when it's up to date
+    def stale(self, node, inputs, force=False):
+        if force:
+            return "forced"
+        if node.name not in self.nodes:
+            return "never built"
+        missing = [path for path in node.outputs if not os.path.exists(path)]
+        if missing:
+            return f"missing {_relative(missing[0])}" + (f" (+{len(missing) - 1})" if len(missing) > 1 else "")
+        changed = self.changed(node, inputs)
+        if changed:
+            return f"{_relative(changed[0])} changed" + (f" (+{len(changed) - 1})" if len(changed) > 1 else "")
+        return None
+
+    # The command line to run node with: its command, plus --force when
+    # the build is forced or something the command doesn't check itself
+    # changed (see Node)
+    def command(self, node, inputs, force=False):
+        if node.checked is None:
+            return node.command
+        changed = self.changed(node, inputs)
+        if force or set(changed or ()) - set(node.checked):
+            return node.command + ["--force"]
+        return node.command
+
+    def record(self, node, inputs, seconds):
+        self.nodes[node.name] = {"inputs": inputs, "seconds": round(seconds, 3)}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": STATE_VERSION, "nodes": self.nodes, "digests": self.digests},
+                      f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+def _relative(path):
+    if path == "command":
+        return "the command"
+    try:
+        return os.path.relpath(path)
+    except ValueError:
+        return path
+
+def run_command(command):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, NETFIX_ASSETS] + command, capture_output=True, text=True)
+    return result, start, time.perf_counter()
+
+# How a node went: status is one of "built", "up to date", "failed",
+# "skipped" (a node it needs failed) or, for a dry run, "would run";
+# start/end are seconds into the build (equal for nodes that didn't run)
+Result = namedtuple("Result", ["status", "start", "end", "detail"])
+
+# Node name -> Result for the selected nodes
+def run_build(nodes, names, jobs=4, force=False, dry_run=False, state=None):
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    state = state or BuildState()
+    started = time.perf_counter()
+    results = {}
+    pending = list(names)
+    running = {}
+    # Nodes that will run, for --dry-run: their dependents can't be judged
+    # until they have
+    rebuilt = set()
+
+    def settle(name, status, detail="", start=None, end=None):
+        now = time.perf_counter() - started
+        results[name] = Result(status, now if start is None else start - started,
+                               now if end is None else end - started, detail)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while pending or running:
+            for name in list(pending):
+                node = nodes[name]
+                # Deps that weren't selected (opt-in ones) are used as is
+                deps = [dep for dep in node.deps if dep in names]
+                if not all(dep in results for dep in deps):
+                    continue
+                failed = [dep for dep in deps
+                          if results[dep].status in ("failed", "skipped") and not nodes[dep].optional]
+                if failed:
+                    pending.remove(name)
+                    settle(name, "skipped", f"{failed[0]} failed")
+                    count("build_nodes_skipped")
+                    print(f"[{name}] skipped: {failed[0]} failed")
+                    continue
+                inputs = state.inputs(node)
+                reason = state.stale(node, inputs, force)
+                if dry_run and reason is None and rebuilt & set(deps):
+                    reason = f"after {sorted(rebuilt & set(deps))[0]}"
+                pending.remove(name)
+                if reason is None:
+                    settle(name, "up to date")
+                    count("build_nodes_fresh")
+                    print(f"[{name}] up to date")
+                else:
+                    command = state.command(node, inputs, force)
+                    if command != node.command:
+                        reason += f" ({' '.join(command[len(node.command):])})"
+                    if dry_run:
+                        rebuilt.add(name)
+                        settle(name, "would run", reason)
+                        print(f"[{name}] would run: {reason}")
+                    else:
+                        print(f"[{name}] running: {reason}")
+                        running[executor.submit(run_command, command)] = (name, inputs)
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, inputs = running.pop(future)
+                node = nodes[name]
+                result, start, end = future.result()
+                output = (result.stdout + result.stderr).strip()
+                missing = [path for path in node.outputs if not os.path.exists(path)]
+                if result.returncode == 0 and not missing:
+                    state.record(node, inputs, end - start)
+                    settle(name, "built", "", start, end)
+                    count("build_nodes_run")
+                    print(f"[{name}] built in {end - start:.1f}s")
+                else:
+                    detail = (f"exit status {result.returncode}" if result.returncode
+                              else f"did not write {_relative(missing[0])}")
+                    settle(name, "failed", detail, start, end)
+                    count("build_nodes_failed")
+                    print(f"[{name}] failed after {end - start:.1f}s: {detail}" +
+                          (" (optional, continuing)" if node.optional else ""))
+                for line in output.splitlines():
+                    print(f"    {line}")
+    if not dry_run:
+        state.save()
+    return results
+
+# The chain of runs the build's length came down to, last first: from the
+# node that finished last, back through whatever finished just before each
+# one started - a node it needs, or a node whose job slot it took.
+# Speeding up anything off this chain doesn't make the build finish sooner.
+def critical_path(nodes, results, slack=0.05):
+    ran = {name: result for name, result in results.items() if result.end > result.start}
+    if not ran:
+        return []
+    name = max(ran, key=lambda other: ran[other].end)
+    path = [(name, "")]
+    while True:
+        start = ran[name].start
+        before = [other for other in ran if other != name and ran[other].end <= start + slack]
+        if not before:
+            return path
+        previous = max(before, key=lambda other: ran[other].end)
+        node = nodes[name]
+        if previous in select(nodes, node.deps):
+            why = f"needs {previous}"
+        else:
+            why = f"waited for a job slot ({previous})"
+        path[-1] = (name, why)
+        name = previous
+        path.append((name, ""))
+
+def summary(nodes, results, wall):
+    work = sum(result.end - result.start for result in results.values())
+    statuses = {}
+    for result in results.values():
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+    lines = [f"Build: {', '.join(f'{n} {status}' for status, n in sorted(statuses.items()))} "
+             f"in {wall:.1f}s ({work:.1f}s of work)"]
+    path = critical_path(nodes, results)
+    if path:
+        length = sum(results[name].end - results[name].start for name, _ in path)
+        lines.append(f"Critical path: {length:.1f}s in {len(path)} node(s)")
+        for name, why in reversed(path):
+            result = results[name]
+            lines.append(f"  {name:<14} {result.end - result.start:6.1f}s  {result.status}" +
+                         (f"  ({why})" if why else ""))
+    return "\n".join(lines)
+
+# Returns False if a required node failed or was skipped
+def build(targets=None, jobs=4, force=False, dry_run=False):
+    nodes = build_nodes()
+    unknown = [name for name in targets or [] if name not in nodes]
+    if unknown:
+        raise KeyError(f"unknown target {unknown[0]!r}; targets are {', '.join(nodes)}")
+    names = select(nodes, targets or None)
+    start = time.perf_counter()
+    results = run_build(nodes, names, jobs, force, dry_run)
+    if not dry_run:
+        print(summary(nodes, results, time.perf_counter() - start))
+    return all(status in ("built", "up to date", "would run") or nodes[name].optional
+               for name, (status, _, _, _) in results.items())
+
+def add_arguments(parser):
+    parser.add_argument("targets", nargs="*", help="nodes to build, with what they depend on (default: all but clips)")
+    parser.add_argument("--jobs", "-j", type=int, default=4, help="nodes to run at once")
+    parser.add_argument("--force", action="store_true", help="run every selected node even if up to date")
+    parser.add_argument("--dry-run", "-n", action="store_true", help="only print what would run and why")
+    parser.add_argument("--list", action="store_true", help="list the nodes and what they depend on")
+
+def list_nodes():
+    for node in build_nodes().values():
+        after = f" (after {', '.join(node.deps)})" if node.deps else ""
+        opt_in = " [opt-in]" if node.name in OPT_IN else ""
+        print(f"{node.name:<14} netfix-assets {' '.join(node.command)}{after}{opt_in}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Netfix trailer assets, rebuilding only what changed")
+    add_arguments(parser)
+    args = parser.parse_args()
+    if args.list:
+        list_nodes()
+        return
+    try:
+        ok = build(args.targets, args.jobs, args.force, args.dry_run)
+    except KeyError as e:
+        parser.error(e.args[0])
+    report_metrics("build")
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
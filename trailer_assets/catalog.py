@@ -0,0 +1,305 @@
+import csv
+import io
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from queue import Empty, Full, Queue
+from catalog_data import item_seed, record_key
+from encoder import write_bytes
+from instrumentation import collect, count, merge, reset
+from placeholders import manifest_key
+
+# Records are read, validated, rendered and written one at a time, with
+# bounded queues between the stages, so memory stays flat whatever the
+# catalog size. Input is CSV (with a header row) or JSON Lines, from a
+# file or "-" for stdin:
+#
+#     title,genre,year,rating                {"title": "Jungle Quest", "genre": "Adventure",
+#     Jungle Quest,Adventure,2024,4.7         "year": 2024, "rating": 4.7}
+#
+# A record may also carry an "id" (letters, digits, "_" and "-"), which
+# becomes its file name instead of movie_<n>/category_<n>.
+#
+# Reading and validating only need the standard library; the renderer
+# (create_trailer_images, NumPy) is imported by the render stages, so the
+# page and deck scripts can stream catalogs without it.
+
+class CatalogError(ValueError):
+    pass
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl"}
+ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,100}$")
+MIN_YEAR, MAX_YEAR = 1888, 2100
+MAX_TITLE_LENGTH = 200
+
+# Items allowed to wait between two pipeline stages
+QUEUE_SIZE = 64
+# How often a producer blocked on a full queue checks whether the
+# consumer has gone away
+POLL_SECONDS = 0.1
+
+# Format from the file extension; stdin ("-") is sniffed from its first
+# line instead: JSON Lines start with "{" or '"', anything else is CSV
+def detect_format(path, first_line=""):
+    if path == "-":
+        return "jsonl" if first_line.lstrip()[:1] in ("{", '"') else "csv"
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise CatalogError(f"Can't tell the format of {path}; use a .csv or .jsonl file")
+    return fmt
+
+# Yield (line_number, raw_record) from a CSV or JSONL file, or stdin for "-"
+def read_records(path, fmt=None):
+    if path == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+    else:
+        fmt = fmt or detect_format(path)
+        stream = open(path, "r", encoding="utf-8-sig", newline="")
+    with stream:
+        first_line = stream.readline()
+        fmt = fmt or detect_format(path, first_line)
+        lines = itertools.chain([first_line], stream)
+        if fmt == "csv":
+            reader = csv.DictReader(lines)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError as e:
+                    yield line_number, CatalogError(f"invalid JSON: {e}")
+
+def _text(record, *names):
+    for name in names:
+        value = record.get(name)
+        if value is not None and str(value).strip():
+            value = str(value).strip()
+            if len(value) > MAX_TITLE_LENGTH:
+                raise CatalogError(f"{name} is longer than {MAX_TITLE_LENGTH} characters")
+            return value
+    raise CatalogError(f"missing {names[0]}")
+
+def _id(record, normalized):
+    item_id = record.get("id", record.get("key"))
+    if item_id is not None and str(item_id).strip():
+        item_id = str(item_id).strip()
+        if not ID_PATTERN.match(item_id):
+            raise CatalogError(f"id {item_id!r} may only use letters, digits, '_' and '-'")
+        normalized["id"] = item_id
+    return normalized
+
+# Check and normalize one movie record (CSV gives strings for everything)
+def validate_movie(record):
+    if not isinstance(record, dict):
+        raise CatalogError("expected an object with title, genre, year and rating")
+    try:
+        year = int(str(record.get("year", "")).strip())
+    except ValueError:
+        raise CatalogError(f"year {record.get('year')!r} is not a whole number")
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise CatalogError(f"year {year} is outside {MIN_YEAR}-{MAX_YEAR}")
+    try:
+        rating = float(str(record.get("rating", "")).strip())
+    except ValueError:
+        raise CatalogError(f"rating {record.get('rating')!r} is not a number")
+    if not 0 <= rating <= 5:
+        raise CatalogError(f"rating {rating} is outside 0-5")
+    return _id(record, {
+        "title": _text(record, "title"),
+        "genre": _text(record, "genre"),
+        "year": year,
+        "rating": rating,
+    })
+
+# Category records are a name, either bare (a JSON string) or in a
+# name/category/title column
+def validate_category(record):
+    if isinstance(record, str):
+        record = {"name": record}
+    if not isinstance(record, dict):
+        raise CatalogError("expected a category name")
+    return _id(record, {"name": _text(record, "name", "category", "title")})
+
+VALIDATORS = {"poster": validate_movie, "banner": validate_category}
+
+def _report_error(source, line_number, message):
+    print(f"{source}:{line_number}: skipped record: {message}", file=sys.stderr)
+
+# Validated records from a catalog file, in file order. Bad records are
+# passed to on_error(source, line_number, message) and skipped, or raise
+# CatalogError when strict.
+def iter_catalog(path, kind="poster", fmt=None, strict=False, on_error=_report_error):
+    validate = VALIDATORS[kind]
+    for line_number, record in read_records(path, fmt):
+        try:
+            if isinstance(record, CatalogError):
+                raise record
+            yield validate(record)
+        except CatalogError as e:
+            if strict:
+                raise CatalogError(f"{path}:{line_number}: {e}") from None
+            count("catalog_rejected")
+            on_error(path, line_number, str(e))
+
+# Pass records through unchanged, keeping the first n in head on the way
+# (the records a page shows), so a streamed catalog can be rendered and
+# still feed its page without being read twice or held in memory
+def keep_head(records, n, head):
+    for i, record in enumerate(records):
+        if n is None or i < n:
+            head.append(record)
+        yield record
+
+_DONE = object()
+
+class _Failed:
+    def __init__(self, error):
+        self.error = error
+
+# Run a generator in its own thread and hand its items over through a
+# queue of at most maxsize items, so the producer stalls instead of
+# running ahead when the consumer is slow. When the consumer stops early
+# (an error, or closing this generator), the producer is told to stop,
+# closes its generator (and with it any file it's reading) and is joined.
+def _threaded(items, maxsize=QUEUE_SIZE):
+    queue = Queue(maxsize)
+    stop = threading.Event()
+
+    # False once the consumer is gone
+    def put(item):
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=POLL_SECONDS)
+                return True
+            except Full:
+                pass
+        return False
+
+    def pump():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failed(e))
+        finally:
+            _close(items)
+
+    thread = threading.Thread(target=pump, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        # Free the slot a put() may be waiting for, and drop what's queued
+        while True:
+            try:
+                queue.get_nowait()
+            except Empty:
+                break
+        thread.join()
+
+def _close(items):
+    close = getattr(items, "close", None)
+    if close is not None:
+        close()
+
+# Parse stage: records -> render jobs, minus items the cache says are fresh
+def _jobs(records, kind, output_dir, base_seed, encoding, cache):
+    from create_trailer_images import RENDERER_NAME, banner_key, poster_key
+    for i, record in enumerate(records):
+        key = record_key(record, i, kind)
+        filename = f"{key}.jpg"
+        output_path = os.path.join(output_dir, filename)
+        if cache is not None:
+            seed = item_seed(kind, filename, base_seed)
+            if kind == "poster":
+                input_hash = poster_key(record, seed, encoding=encoding)
+            else:
+                input_hash = banner_key(record["name"], seed, encoding=encoding)
+            if cache.is_fresh(output_path, input_hash):
+                continue
+            cache_entry = (input_hash, RENDERER_NAME)
+        else:
+            cache_entry = None
+        yield (kind, key, record, "jpeg", None, encoding, base_seed), output_path, cache_entry
+
+# Render + encode stage. Both run back to back in the same worker so raw
+# pixels never have to cross a process boundary; what comes back is the
+# encoded bytes. Futures are handed on in order, and the bounded queue
+# after this stage caps how many renders are in flight.
+def _submit(jobs, executor):
+    from render_stream import render_record
+    for job, output_path, cache_entry in jobs:
+        if executor is None:
+            future = Future()
+            future.set_result((render_record(*job), None))
+        else:
+            future = executor.submit(partial(collect, _render_job), job)
+        yield future, output_path, cache_entry
+
+def _render_job(job):
+    from render_stream import render_record
+    return render_record(*job)
+
+# Stream a catalog to images/posters (kind="poster") or images/categories
+# (kind="banner"): parse -> render/encode -> write, with at most
+# queue_size items waiting between stages. Output names, seeds and cache
+# keys match create_trailer_images.py, so both produce the same files.
+# Placeholders of rewritten images are dropped from the placeholders dict
+# (placeholders.complete() rebuilds the ones a page needs). Returns the
+# number of images written.
+def render_catalog(records, kind="poster", workers=1, base_seed=0, encoding=None, cache=None,
+                   queue_size=QUEUE_SIZE, output_dir=None, placeholders=None):
+    if output_dir is None:
+        output_dir = os.path.join("images", "posters" if kind == "poster" else "categories")
+    os.makedirs(output_dir, exist_ok=True)
+    if workers is None or workers < 1:
+        workers = os.cpu_count() or 1
+
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=reset)
+    written = 0
+    jobs = _threaded(_jobs(records, kind, output_dir, base_seed, encoding, cache), queue_size)
+    submitted = _threaded(_submit(jobs, executor), queue_size)
+    try:
+        for future, output_path, cache_entry in submitted:
+            (_, data, _), metrics = future.result()
+            if metrics is not None:
+                merge(metrics)
+            write_bytes(output_path, data)
+            count("posters_rendered" if kind == "poster" else "banners_rendered")
+            if cache_entry is not None:
+                cache.record(output_path, cache_entry[0], cache_entry[1])
+            if placeholders is not None:
+                placeholders.pop(manifest_key(output_path), None)
+            written += 1
+    finally:
+        # Downstream stage first: its thread is the one pulling from jobs
+        submitted.close()
+        jobs.close()
+        _close(records)
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if cache is not None:
+        from create_trailer_images import RENDERER_NAME
+        cache.prune(RENDERER_NAME, output_dir)
+    return written
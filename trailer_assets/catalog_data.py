@@ -0,0 +1,42 @@
+import hashlib
+
+# The built-in sample catalog the scripts use without --catalog, and how
+# records map to file names and seeds. Nothing here needs PIL or NumPy,
+# so the pages and the deck can be built from it without the renderers.
+
+# Movie posters for different genres
+movie_data = [
+    {"title": "Cosmic Adventure", "genre": "Sci-Fi", "year": 2025, "rating": 4.8},
+    {"title": "The Last Detective", "genre": "Thriller", "year": 2024, "rating": 4.6},
+    {"title": "Love in Paris", "genre": "Romance", "year": 2025, "rating": 4.5},
+    {"title": "Jungle Quest", "genre": "Adventure", "year": 2024, "rating": 4.7},
+    {"title": "Midnight Shadows", "genre": "Horror", "year": 2025, "rating": 4.4},
+    {"title": "Laugh Factory", "genre": "Comedy", "year": 2024, "rating": 4.9},
+    {"title": "Urban Legend", "genre": "Drama", "year": 2025, "rating": 4.3},
+    {"title": "Robot Revolution", "genre": "Sci-Fi", "year": 2024, "rating": 4.7},
+    {"title": "Mountain Explorer", "genre": "Documentary", "year": 2025, "rating": 4.8},
+    {"title": "Magical Kingdom", "genre": "Fantasy", "year": 2024, "rating": 4.5},
+    {"title": "Speed Racers", "genre": "Action", "year": 2025, "rating": 4.6},
+    {"title": "Cartoon World", "genre": "Animation", "year": 2024, "rating": 4.9}
+]
+
+# Category banners
+categories = [
+    "Action", "Comedy", "Drama", "Sci-Fi", "Documentary",
+    "Horror", "Romance", "Thriller", "Animation", "Fantasy"
+]
+
+# Key for a record: its own "key"/"id" if it has one, otherwise the same
+# stem the file pipeline uses (movie_1, category_3, ...), so streamed
+# renders get the same seed - and the same pixels - as the files on disk
+def record_key(record, index, kind):
+    key = record.get("key", record.get("id"))
+    if key is not None:
+        return str(key)
+    return f"{'movie' if kind == 'poster' else 'category'}_{index + 1}"
+
+# Derive a stable per-item seed so every poster/banner renders the same
+# pixels no matter which process (or in which order) it is drawn
+def item_seed(kind, filename, base_seed=0):
+    digest = hashlib.sha256(f"{base_seed}:{kind}:{filename}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
@@ -0,0 +1,293 @@
+import argparse
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import BytesIO
+from xml.sax.saxutils import escape
+from lxml import etree
+from PIL import Image
+from create_trailer_images import item_seed, render_movie_poster
+from deck_media import DPI, content_hash, encode_for_display, fit, size_summary
+from encoder import encode_default
+from instrumentation import collect, count, merge, report as report_metrics, reset, timed
+from render_stream import record_key
+
+# Catalog decks: one slide per title, in one deck or one deck per genre,
+# for catalogs of thousands of titles.
+#
+# python-pptx keeps every slide and picture of a Presentation in memory
+# until save(), so these decks are written as a stream instead: a themed
+# empty deck (create_trailer_ppt.apply_master_theme) is the template,
+# worker processes turn records into finished slide XML plus a poster
+# JPEG already scaled to its size on the slide, and the main process
+# only writes those parts into the .pptx zip as they arrive. The slides
+# hold text and a picture reference, all formatting comes from the
+# master, so memory stays flat and build time and XML size grow linearly.
+RENDERER_NAME = "catalog_deck"
+DEFAULT_OUTPUT = "Netfix_Catalog.pptx"
+
+EMU_PER_INCH = 914400
+# Poster frame on each slide (inches), right of the bullets
+POSTER_BOX = (10.9, 1.9, 4.4, 6.6)
+# Text box when there's a poster beside it
+TEXT_BOX = (0.75, 2.0, 9.8, 6.5)
+# Slides prepared per worker ahead of the writer
+SLIDES_AHEAD = 16
+
+NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "ct": "http://schemas.openxmlformats.org/package/2006/content-types",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+SLIDE_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+SLIDE_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+LAYOUT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout"
+IMAGE_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+# Parts rewritten at the end, once the slide list is known
+PACKAGE_INDEX = ("[Content_Types].xml", "ppt/presentation.xml", "ppt/_rels/presentation.xml.rels")
+
+def _emu(inches):
+    return int(round(inches * EMU_PER_INCH))
+
+def _xfrm(box):
+    left, top, width, height = (_emu(value) for value in box)
+    return f'<a:xfrm><a:off x="{left}" y="{top}"/><a:ext cx="{width}" cy="{height}"/></a:xfrm>'
+
+def _paragraphs(lines):
+    return "".join(f'<a:p><a:r><a:rPr lang="en-US"/><a:t>{escape(line)}</a:t></a:r></a:p>' for line in lines)
+
+# Slide XML for one title on the themed Title and Content layout.
+# image_size is the (width, height) of the poster in EMU, or None.
+def slide_xml(title, lines, image_size=None):
+    body_xfrm = _xfrm(TEXT_BOX) if image_size else ""
+    picture = ""
+    if image_size:
+        left, top, box_width, box_height = (_emu(value) for value in POSTER_BOX)
+        width, height = image_size
+        left += (box_width - width) // 2
+        top += (box_height - height) // 2
+        picture = (
+            '<p:pic><p:nvPicPr><p:cNvPr id="4" name="Poster"/><p:cNvPicPr><a:picLocks noChangeAspect="1"/>'
+            '</p:cNvPicPr><p:nvPr/></p:nvPicPr><p:blipFill><a:blip r:embed="rId2"/><a:stretch><a:fillRect/>'
+            f'</a:stretch></p:blipFill><p:spPr><a:xfrm><a:off x="{left}" y="{top}"/><a:ext cx="{width}" '
+            f'cy="{height}"/></a:xfrm><a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr></p:pic>'
+        )
+    return (
+        "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+        f'<p:sld xmlns:a="{NS["a"]}" xmlns:r="{NS["r"]}" xmlns:p="{NS["p"]}"><p:cSld><p:spTree>'
+        '<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+        '<p:sp><p:nvSpPr><p:cNvPr id="2" name="Title 1"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>'
+        '<p:nvPr><p:ph type="title"/></p:nvPr></p:nvSpPr><p:spPr/><p:txBody><a:bodyPr/><a:lstStyle/>'
+        f"{_paragraphs([title])}</p:txBody></p:sp>"
+        '<p:sp><p:nvSpPr><p:cNvPr id="3" name="Content Placeholder 2"/><p:cNvSpPr><a:spLocks noGrp="1"/>'
+        f'</p:cNvSpPr><p:nvPr><p:ph idx="1"/></p:nvPr></p:nvSpPr><p:spPr>{body_xfrm}</p:spPr><p:txBody>'
+        f"<a:bodyPr/><a:lstStyle/>{_paragraphs(lines)}</p:txBody></p:sp>"
+        f"{picture}</p:spTree></p:cSld><p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>"
+    ).encode("utf-8")
+
+# The poster fitted to POSTER_BOX, stored at that size for dpi (see
+# deck_media) as JPEG. Returns (image_bytes, (width_emu, height_emu)).
+def prepare_image(image, dpi=DPI):
+    display = fit(image.size, _emu(POSTER_BOX[2]), _emu(POSTER_BOX[3]))
+    return encode_for_display(image.convert("RGB"), display, dpi), display
+
+# Worker entry point: one record -> (slide XML, image bytes or None,
+# image digest or None, bytes the full-size poster would have taken).
+# The poster is the rendered file if there is one, otherwise it's
+# rendered here from the same seed.
+def prepare_slide(job):
+    index, record, with_images, dpi, base_seed = job
+    lines = [record["genre"], f"Released {record['year']}", f"Rated {record['rating']} / 5"]
+    image = image_size = digest = None
+    original_size = 0
+    if with_images:
+        filename = f"{record_key(record, index, 'poster')}.jpg"
+        path = os.path.join("images", "posters", filename)
+        if os.path.exists(path):
+            original_size = os.path.getsize(path)
+            with Image.open(path) as poster:
+                image, image_size = prepare_image(poster, dpi)
+        else:
+            poster = render_movie_poster(record["title"], record["genre"], record["year"], record["rating"],
+                                         seed=item_seed("poster", filename, base_seed))
+            original_size = len(encode_default(poster))
+            image, image_size = prepare_image(poster, dpi)
+        digest = content_hash(image)
+    with timed("slide_build"):
+        xml = slide_xml(record["title"], lines, image_size)
+    return xml, image, digest, original_size
+
+# Empty deck with the master theme applied, as .pptx bytes, plus the zip
+# path of the layout slides are built on
+def deck_template():
+    from create_trailer_ppt import apply_master_theme, new_presentation
+    prs = new_presentation()
+    layout = apply_master_theme(prs)
+    buffer = BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue(), layout.part.partname.lstrip("/")
+
+# Writes a .pptx one slide at a time. Media are stored once per content
+# hash however many slides use them.
+class DeckWriter:
+    def __init__(self, path, template, layout_name):
+        self.path = path
+        self.layout_target = "../slideLayouts/" + os.path.basename(layout_name)
+        self.slides = 0
+        self.media = {}
+        self.placements = 0
+        self.original_bytes = 0
+        self.stored_bytes = 0
+        self._index = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._zip = zipfile.ZipFile(path + ".tmp", "w", zipfile.ZIP_DEFLATED)
+        with zipfile.ZipFile(BytesIO(template)) as source:
+            for name in source.namelist():
+                if name in PACKAGE_INDEX:
+                    self._index[name] = source.read(name)
+                else:
+                    self._zip.writestr(name, source.read(name))
+
+    def add(self, xml, image=None, digest=None, original_size=0):
+        self.slides += 1
+        number = self.slides
+        rels = [f'<Relationship Id="rId1" Type="{LAYOUT_REL}" Target="{self.layout_target}"/>']
+        if image is not None:
+            self.placements += 1
+            self.original_bytes += original_size
+            media_name = self.media.get(digest)
+            if media_name is None:
+                media_name = self.media[digest] = f"poster_{len(self.media) + 1}.jpeg"
+                # JPEG is already compressed; deflating it again only costs time
+                self._zip.writestr(f"ppt/media/{media_name}", image, zipfile.ZIP_STORED)
+                self.stored_bytes += len(image)
+            else:
+                count("media_deduplicated")
+            rels.append(f'<Relationship Id="rId2" Type="{IMAGE_REL}" Target="../media/{media_name}"/>')
+        with timed("file_write"):
+            self._zip.writestr(f"ppt/slides/slide{number}.xml", xml)
+            self._zip.writestr(f"ppt/slides/_rels/slide{number}.xml.rels",
+                               "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+                               f'<Relationships xmlns="{NS["rel"]}">{"".join(rels)}</Relationships>')
+        count("slides")
+
+    # Add the slide list to presentation.xml, its relationships and the
+    # content types, then move the finished file into place
+    def close(self):
+        presentation = etree.fromstring(self._index["ppt/presentation.xml"])
+        rels = etree.fromstring(self._index["ppt/_rels/presentation.xml.rels"])
+        types = etree.fromstring(self._index["[Content_Types].xml"])
+
+        slide_list = etree.Element(f"{{{NS['p']}}}sldIdLst")
+        for number in range(1, self.slides + 1):
+            rel_id = f"rIdSlide{number}"
+            etree.SubElement(rels, f"{{{NS['rel']}}}Relationship",
+                             Id=rel_id, Type=SLIDE_REL, Target=f"slides/slide{number}.xml")
+            etree.SubElement(slide_list, f"{{{NS['p']}}}sldId",
+                             {"id": str(255 + number), f"{{{NS['r']}}}id": rel_id})
+            etree.SubElement(types, f"{{{NS['ct']}}}Override",
+                             PartName=f"/ppt/slides/slide{number}.xml", ContentType=SLIDE_TYPE)
+        # sldIdLst goes after the master (and notes/handout master) lists
+        anchor = presentation.find("p:sldSz", NS)
+        anchor.addprevious(slide_list)
+
+        for name, element in (("ppt/presentation.xml", presentation),
+                              ("ppt/_rels/presentation.xml.rels", rels),
+                              ("[Content_Types].xml", types)):
+            self._zip.writestr(name, etree.tostring(element, xml_declaration=True, encoding="UTF-8",
+                                                    standalone=True))
+        self._zip.close()
+        os.replace(self.path + ".tmp", self.path)
+
+    def abort(self):
+        self._zip.close()
+        os.remove(self.path + ".tmp")
+
+# Prepared slides in catalog order, from a pool that runs at most
+# workers * SLIDES_AHEAD slides ahead of the writer
+def _prepared(jobs, workers):
+    if workers <= 1:
+        for job in jobs:
+            yield job[1], prepare_slide(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=reset) as executor:
+        pending = deque()
+        for job in jobs:
+            pending.append((job[1], executor.submit(partial(collect, prepare_slide), job)))
+            if len(pending) >= workers * SLIDES_AHEAD:
+                record, future = pending.popleft()
+                result, metrics = future.result()
+                merge(metrics)
+                yield record, result
+        while pending:
+            record, future = pending.popleft()
+            result, metrics = future.result()
+            merge(metrics)
+            yield record, result
+
+def _genre_file(output_dir, genre):
+    name = re.sub(r"[^A-Za-z0-9]+", "_", genre).strip("_") or "Other"
+    return os.path.join(output_dir, f"Netfix_{name}.pptx")
+
+# Build catalog decks from validated movie records (catalog.iter_catalog):
+# a single deck at output, or with by_genre one deck per genre in the
+# output directory. Returns {path: DeckWriter} for the decks written.
+def build_catalog_decks(records, output=DEFAULT_OUTPUT, by_genre=False, workers=1, with_images=True,
+                        dpi=DPI, base_seed=0):
+    if workers is None or workers < 1:
+        workers = os.cpu_count() or 1
+    template, layout_name = deck_template()
+    writers = {}
+    jobs = ((i, record, with_images, dpi, base_seed) for i, record in enumerate(records))
+    try:
+        for record, (xml, image, digest, original_size) in _prepared(jobs, workers):
+            path = _genre_file(output, record["genre"]) if by_genre else output
+            writer = writers.get(path)
+            if writer is None:
+                writer = writers[path] = DeckWriter(path, template, layout_name)
+            writer.add(xml, image, digest, original_size)
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
+    for writer in writers.values():
+        writer.close()
+    return {path: writer for path, writer in writers.items()}
+
+def main():
+    from catalog import CatalogError, iter_catalog
+
+    parser = argparse.ArgumentParser(description="Build a one-slide-per-title deck from a movie catalog")
+    parser.add_argument("catalog", help="CSV/JSONL movie catalog ('-' for stdin)")
+    parser.add_argument("--output", default=None,
+                        help=f"deck to write (default {DEFAULT_OUTPUT}), or the directory for --by-genre decks")
+    parser.add_argument("--by-genre", action="store_true", help="write one deck per genre")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="slide preparation processes (0 = one per CPU core)")
+    parser.add_argument("--no-images", action="store_true", help="leave the posters out")
+    parser.add_argument("--dpi", type=int, default=DPI, help="resolution posters are embedded at")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="base seed for posters rendered on the fly")
+    parser.add_argument("--strict", action="store_true",
+                        help="stop at the first invalid catalog record instead of skipping it")
+    args = parser.parse_args()
+
+    output = args.output or ("decks" if args.by_genre else DEFAULT_OUTPUT)
+    records = iter_catalog(args.catalog, "poster", strict=args.strict)
+    try:
+        decks = build_catalog_decks(records, output, args.by_genre, args.workers, not args.no_images,
+                                    args.dpi, args.seed)
+    except CatalogError as e:
+        parser.exit(1, f"Invalid catalog: {e}\n")
+    for path, deck in sorted(decks.items()):
+        print(f"Deck created: {path} ({deck.slides} slides)")
+        print("  " + size_summary(path, deck.placements, len(deck.media), deck.original_bytes, deck.stored_bytes))
+    report_metrics(RENDERER_NAME)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import re
+import sys
+from catalog_data import record_key
+from instrumentation import count, report as report_metrics, timed
+from pages import PAGE_BUDGET_KB, budget_report, catalog_page, precompressed, write_page
+
+# Catalog browser for catalogs too big to put in one page. The records are
+# written as JSON shards of SHARD_SIZE rows each, one run of shards per
+# genre plus one over the whole catalog:
+#
+#     catalog/_all/0.json  catalog/_all/200.json  ...
+#     catalog/action/0.json  catalog/action/200.json  ...
+#
+# named by the offset of their first row. The page itself only carries
+# the index (genres, counts, shard size), and its script fetches the
+# shards for the rows scrolled into view, so what it costs to open stays
+# the same however many titles there are. Records are streamed: at most
+# one shard per genre is held in memory while writing.
+SHARD_SIZE = 200
+SHARD_DIR = "catalog"
+ALL_GENRES = "_all"
+# Rows are lists in this order rather than objects, so the field names
+# aren't repeated in every row; key is the poster's file stem
+FIELDS = ["key", "title", "year", "rating", "genre"]
+INDEX_VERSION = 1
+
+def genre_slug(genre):
+    slug = re.sub(r"[^a-z0-9]+", "-", genre.lower()).strip("-")
+    return slug or "genre"
+
+def _shard_path(shard_dir, slug, offset):
+    return os.path.join(shard_dir, slug, f"{offset}.json")
+
+# Write data to path (with precompressed siblings) unless it already has
+# exactly this content. Returns True if anything was written.
+def _write_if_changed(path, data, compress=True):
+    siblings = precompressed(data) if compress else {}
+    try:
+        with open(path, "rb") as f:
+            unchanged = f.read() == data
+    except OSError:
+        unchanged = False
+    if unchanged and all(os.path.exists(path + ext) for ext in siblings):
+        count("shards_unchanged")
+        return False
+    with open(path, "wb") as f:
+        f.write(data)
+    for ext, compressed in siblings.items():
+        with open(path + ext, "wb") as f:
+            f.write(compressed)
+    for ext in (".gz", ".br"):
+        if ext not in siblings and os.path.exists(path + ext):
+            os.remove(path + ext)
+    count("shards_written")
+    return True
+
+# Shards records into shard_dir as they're added; close() flushes the
+# partial last shards, removes shards left over from a bigger catalog and
+# returns the index
+class ShardWriter:
+    def __init__(self, shard_dir=SHARD_DIR, shard_size=SHARD_SIZE, compress=True):
+        self.shard_dir = shard_dir
+        self.shard_size = shard_size
+        self.compress = compress
+        # slug -> {"name", "slug", "count", "shards"}, in first-seen order
+        self.genres = {ALL_GENRES: {"name": "All", "slug": ALL_GENRES, "count": 0, "shards": 0}}
+        self.pending = {ALL_GENRES: []}
+        # slug -> offsets of this run's shards; any other shard file is stale
+        self.offsets = {ALL_GENRES: set()}
+        self.written = 0
+        self.total = 0
+
+    def add(self, record):
+        row = [record_key(record, self.total, "poster"), record["title"], record["year"],
+               record["rating"], record["genre"]]
+        self.total += 1
+        slug = genre_slug(record["genre"])
+        if slug not in self.genres:
+            self.genres[slug] = {"name": record["genre"], "slug": slug, "count": 0, "shards": 0}
+            self.pending[slug] = []
+            self.offsets[slug] = set()
+        for slug in (ALL_GENRES, slug):
+            self.genres[slug]["count"] += 1
+            self.pending[slug].append(row)
+            if len(self.pending[slug]) == self.shard_size:
+                self._flush(slug)
+
+    def _flush(self, slug):
+        rows = self.pending[slug]
+        if not rows:
+            return
+        genre = self.genres[slug]
+        offset = genre["shards"] * self.shard_size
+        data = json.dumps({"offset": offset, "rows": rows}, ensure_ascii=False, separators=(",", ":"))
+        path = _shard_path(self.shard_dir, slug, offset)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with timed("shard_write"):
+            if _write_if_changed(path, data.encode("utf-8"), self.compress):
+                self.written += 1
+        self.offsets[slug].add(offset)
+        genre["shards"] += 1
+        self.pending[slug] = []
+
+    def close(self):
+        for slug in self.genres:
+            self._flush(slug)
+        self._remove_stale()
+        # Bigger genres first in the picker, after "All"
+        genres = [self.genres[ALL_GENRES]] + sorted(
+            (genre for slug, genre in self.genres.items() if slug != ALL_GENRES),
+            key=lambda genre: (-genre["count"], genre["name"]))
+        return {
+            "version": INDEX_VERSION,
+            "shard_size": self.shard_size,
+            "fields": FIELDS,
+            "base": self.shard_dir.replace(os.sep, "/").rstrip("/") + "/",
+            "posters": "images/posters/",
+            "genres": genres,
+        }
+
+    # Shards this run didn't write: past the end of a genre, at offsets of
+    # an earlier --shard-size, or of genres no longer in the catalog
+    def _remove_stale(self):
+        if not os.path.isdir(self.shard_dir):
+            return
+        for slug in os.listdir(self.shard_dir):
+            directory = os.path.join(self.shard_dir, slug)
+            if not os.path.isdir(directory):
+                continue
+            live = self.offsets.get(slug, set())
+            for name in os.listdir(directory):
+                offset = name.split(".", 1)[0]
+                if (offset.isdigit() and int(offset) not in live
+                        and name.endswith((".json", ".json.gz", ".json.br"))):
+                    os.remove(os.path.join(directory, name))
+                    count("shards_removed")
+            if not os.listdir(directory):
+                os.rmdir(directory)
+
+def write_shards(records, shard_dir=SHARD_DIR, shard_size=SHARD_SIZE, compress=True):
+    writer = ShardWriter(shard_dir, shard_size, compress)
+    for record in records:
+        writer.add(record)
+    return writer.close(), writer
+
+# "10,000 titles in 12 genre(s): 112 shard(s) of up to 200 rows, 3 written"
+def shard_summary(index, writer):
+    shards = sum(genre["shards"] for genre in index["genres"])
+    return (f"{index['genres'][0]['count']:,} titles in {len(index['genres']) - 1} genre(s): "
+            f"{shards} shard(s) of up to {index['shard_size']} rows, {writer.written} written")
+
+# Shard a catalog and write its browser page; returns the index
+def build_catalog_page(records, output, shard_dir=SHARD_DIR, shard_size=SHARD_SIZE, minify=True, compress=True):
+    index, writer = write_shards(records, shard_dir, shard_size, compress)
+    print(shard_summary(index, writer))
+    if write_page(catalog_page(index), output, minify=minify, compress=compress):
+        print(f"HTML page created: {output}")
+    else:
+        print(f"HTML page is up to date: {output}")
+    return index
+
+def main():
+    from catalog import CatalogError, iter_catalog
+
+    parser = argparse.ArgumentParser(description="Write a sharded, virtualized catalog browser page")
+    parser.add_argument("catalog", help="CSV or JSON Lines catalog of movies (- for stdin)")
+    parser.add_argument("--output", default="netfix_catalog.html")
+    parser.add_argument("--shard-dir", default=SHARD_DIR)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--strict", action="store_true",
+                        help="stop at the first invalid catalog record instead of skipping it")
+    parser.add_argument("--budget", type=int, default=PAGE_BUDGET_KB, help="page weight budget in KB")
+    args = parser.parse_args()
+
+    if args.shard_size < 1:
+        parser.error("--shard-size must be at least 1")
+    try:
+        build_catalog_page(iter_catalog(args.catalog, strict=args.strict), args.output,
+                           args.shard_dir, args.shard_size)
+    except CatalogError as e:
+        sys.exit(f"Invalid catalog: {e}")
+    print("  " + budget_report(args.output, args.budget))
+    report_metrics("catalog_pages")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import os
+import shutil
+import subprocess
+from instrumentation import count, report as report_metrics, timed
+
+# Poster frames for the downloaded clips: one small JPEG per clip, taken a
+# little way in (past any fade from black) and written next to it as
+# clips/<category>/<clip>.jpg. The video page shows it in place of the
+# clip until the clip is played, so opening the page fetches ten small
+# stills instead of ten videos. Needs ffmpeg.
+POSTER_WIDTH = 640
+POSTER_AT = 2.0
+
+def find_ffmpeg(path=None):
+    return path or os.environ.get("NETFIX_FFMPEG") or shutil.which("ffmpeg")
+
+def poster_path(clip_path):
+    return os.path.splitext(clip_path)[0] + ".jpg"
+
+# ffmpeg seeking to at seconds (input seeking, so only the frames around
+# it are decoded) and writing that frame scaled to width
+def poster_command(ffmpeg, clip_path, output, width=POSTER_WIDTH, at=POSTER_AT):
+    return [
+        ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+        "-ss", str(at), "-i", clip_path,
+        "-frames:v", "1", "-vf", f"scale={width}:-2", "-q:v", "5",
+        output,
+    ]
+
+# Write the poster of every clip that is on disk and newer than its
+# poster. Clips shorter than POSTER_AT get their first frame instead.
+# Returns the number of posters written.
+def extract_posters(clip_paths, ffmpeg=None, width=POSTER_WIDTH):
+    ffmpeg = find_ffmpeg(ffmpeg)
+    if not ffmpeg:
+        return 0
+    written = 0
+    for clip_path in clip_paths:
+        output = poster_path(clip_path)
+        if not os.path.exists(clip_path):
+            continue
+        if os.path.exists(output) and os.path.getmtime(output) >= os.path.getmtime(clip_path):
+            count("posters_unchanged")
+            continue
+        with timed("poster_extract"):
+            result = subprocess.run(poster_command(ffmpeg, clip_path, output, width), capture_output=True)
+            if result.returncode != 0 or not os.path.exists(output):
+                result = subprocess.run(poster_command(ffmpeg, clip_path, output, width, at=0),
+                                        capture_output=True)
+        if result.returncode == 0 and os.path.exists(output):
+            written += 1
+            count("posters_extracted")
+        else:
+            count("posters_failed")
+            print(f"Could not extract a poster frame from {clip_path}: {result.stderr.decode(errors='replace').strip()}")
+    return written
+
+# Clip paths from download_youtube_samples.videos-style records
+def clip_paths(clips):
+    return [os.path.join("clips", clip["category"], clip["name"]) for clip in clips]
+
+def main():
+    from download_youtube_samples import videos
+
+    parser = argparse.ArgumentParser(description="Extract poster frames for the downloaded clips")
+    parser.add_argument("--ffmpeg", default=None, help="ffmpeg binary (default: NETFIX_FFMPEG or PATH)")
+    parser.add_argument("--width", type=int, default=POSTER_WIDTH)
+    args = parser.parse_args()
+
+    if not find_ffmpeg(args.ffmpeg):
+        parser.exit(1, "ffmpeg not found; install it, pass --ffmpeg or set NETFIX_FFMPEG\n")
+    written = extract_posters(clip_paths(videos), args.ffmpeg, args.width)
+    print(f"Wrote {written} poster frame(s)")
+    report_metrics("clip_posters")
+
+if __name__ == "__main__":
+    main()
@@ -1,609 +1,352 @@
+import argparse
+import json
 import os
-import random
-from PIL import Image, ImageDraw, ImageFont
-import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from background_engine import banner_background, composite, poster_background
+from catalog_data import categories, item_seed, movie_data
+from derivatives import LADDER, available_formats, build_derivatives, derivative_paths
+from encoder import EncodeSettings, encode_default, save_image, summarize, write_bytes
+from font_registry import draw_text_layer
+from instrumentation import collect, count, merge, report as report_metrics, reset, timed
+from pages import (IMG_TAG, SHOWCASE_CATEGORIES, TRENDING_TITLES, budget_report, load_placeholders, trailer_page,
+                   write_page)
+from placeholders import complete, manifest_key, placeholder, save_placeholders
+from text_layout import draw_layout, fit_text
+from render_cache import RenderCache, input_key
+from trailer_script import SceneManifest
 
-# Create directories for images
-os.makedirs('images', exist_ok=True)
-os.makedirs('images/posters', exist_ok=True)
-os.makedirs('images/categories', exist_ok=True)
+# Bump RENDERER_VERSION whenever the drawing code changes so cached
+# outputs from older versions get re-rendered
+RENDERER_NAME = "create_trailer_images"
+RENDERER_VERSION = 4
+POSTER_SIZE = (600, 900)
+BANNER_SIZE = (1280, 720)
 
-# Function to create a movie poster image
-def create_movie_poster(title, genre, year, rating, filename):
-    # Create a blank image with movie poster dimensions (2:3 aspect ratio)
-    width, height = 600, 900
-    image = Image.new('RGB', (width, height), color=(random.randint(20, 60), random.randint(20, 60), random.randint(20, 60)))
-    draw = ImageDraw.Draw(image)
-    
-    # Add some random shapes for visual interest
-    for _ in range(5):
-        shape_color = (
-            random.randint(100, 255),
-            random.randint(100, 255),
-            random.randint(100, 255),
-            random.randint(30, 100)  # Alpha (transparency)
-        )
-        x1 = random.randint(0, width)
-        y1 = random.randint(0, height)
-        x2 = random.randint(0, width)
-        y2 = random.randint(0, height)
-        draw.rectangle([x1, y1, x2, y2], fill=shape_color)
-    
-    # Add title text
-    try:
-        # Try to use a font if available
-        title_font = ImageFont.truetype("arial.ttf", 48)
-        info_font = ImageFont.truetype("arial.ttf", 24)
-    except IOError:
-        # Fall back to default font
-        title_font = ImageFont.load_default()
-        info_font = ImageFont.load_default()
-    
-    # Add title with shadow effect
-    title_x, title_y = width // 2, height - 200
-    # Shadow
-    draw.text((title_x+2, title_y+2), title, font=title_font, fill=(0, 0, 0), anchor="mm")
-    # Main text
-    draw.text((title_x, title_y), title, font=title_font, fill=(255, 255, 255), anchor="mm")
-    
-    # Add genre, year, and rating
-    info_text = f"{genre} • {year} • {rating}★"
-    draw.text((width // 2, height - 120), info_text, font=info_font, fill=(200, 200, 200), anchor="mm")
-    
-    # Add a "NETFIX" watermark
-    watermark_font = title_font
-    draw.text((width // 2, 50), "NETFIX", font=watermark_font, fill=(229, 9, 20), anchor="mm")
+# Function to render a movie poster image in memory
+def render_movie_poster(title, genre, year, rating, seed=None):
+    # Dark background (2:3 aspect ratio) with translucent shapes for visual interest
+    width, height = POSTER_SIZE
+    with timed("shape_draw"):
+        bg_color, shapes = poster_background(seed, POSTER_SIZE, count=5)
+        image = composite(bg_color, shapes, POSTER_SIZE)
     
-    # Save the image
-    image.save(f"images/posters/{filename}")
-    print(f"Created poster: {filename}")
-    return filename
+    with timed("text_draw"):
+        # Add title with shadow effect, wrapped and shrunk to fit above the info line
+        title_x, title_y = width // 2, height - 200
+        layout = fit_text(title, width - 80, 120, 48, min_size=20)
+        draw_layout(image, (title_x, title_y), layout, (255, 255, 255), shadow_offset=2)
+        
+        # Add genre, year, and rating
+        info_text = f"{genre} • {year} • {rating}★"
+        draw_text_layer(image, (width // 2, height - 120), info_text, 24, (200, 200, 200))
+        
+        # Add a "NETFIX" watermark (rasterized once per process, then reused)
+        draw_text_layer(image, (width // 2, 50), "NETFIX", 48, (229, 9, 20))
+    return image
 
-# Function to create a category banner
-def create_category_banner(category_name, filename):
+# Function to create a movie poster image
+def create_movie_poster(title, genre, year, rating, filename, seed=None, formats=(), encoding=None):
+    return _render_poster_job((title, genre, year, rating, filename, seed, formats, encoding))[0]
+
+# Banner background color for each known category (others get a random one)
+CATEGORY_COLORS = {
+    'Action': (180, 30, 30),
+    'Comedy': (255, 191, 0),
+    'Drama': (70, 130, 180),
+    'Sci-Fi': (75, 0, 130),
+    'Documentary': (34, 139, 34),
+    'Horror': (25, 25, 25),
+    'Romance': (219, 112, 147),
+    'Thriller': (47, 79, 79),
+    'Animation': (255, 140, 0),
+    'Fantasy': (148, 0, 211)
+}
+
+# Function to render a category banner in memory
+def render_category_banner(category_name, seed=None):
     # Create a wide banner image (16:9 aspect ratio)
-    width, height = 1280, 720
+    width, height = BANNER_SIZE
     
-    # Choose a background color based on the category
-    color_map = {
-        'Action': (180, 30, 30),
-        'Comedy': (255, 191, 0),
-        'Drama': (70, 130, 180),
-        'Sci-Fi': (75, 0, 130),
-        'Documentary': (34, 139, 34),
-        'Horror': (25, 25, 25),
-        'Romance': (219, 112, 147),
-        'Thriller': (47, 79, 79),
-        'Animation': (255, 140, 0),
-        'Fantasy': (148, 0, 211)
-    }
+    # Blend translucent rectangles, circles and lines over the category color
+    with timed("shape_draw"):
+        bg_color, shapes = banner_background(seed, BANNER_SIZE, CATEGORY_COLORS.get(category_name), count=10)
+        image = composite(bg_color, shapes, BANNER_SIZE)
     
-    bg_color = color_map.get(category_name, (random.randint(20, 180), random.randint(20, 180), random.randint(20, 180)))
-    image = Image.new('RGB', (width, height), color=bg_color)
-    draw = ImageDraw.Draw(image)
-    
-    # Add some random shapes for visual interest
-    for _ in range(10):
-        shape_color = (
-            min(bg_color[0] + random.randint(-20, 100), 255),
-            min(bg_color[1] + random.randint(-20, 100), 255),
-            min(bg_color[2] + random.randint(-20, 100), 255),
-            random.randint(30, 150)  # Alpha (transparency)
-        )
+    with timed("text_draw"):
+        # Add category name with shadow effect
+        title_x, title_y = width // 2, height // 2
+        layout = fit_text(category_name, width - 160, 320, 120, min_size=32, max_lines=2)
+        draw_layout(image, (title_x, title_y), layout, (255, 255, 255), shadow_offset=4)
         
-        # Choose between rectangle, circle, or line
-        shape_type = random.choice(['rectangle', 'circle', 'line'])
-        
-        if shape_type == 'rectangle':
-            x1 = random.randint(0, width)
-            y1 = random.randint(0, height)
-            x2 = random.randint(0, width)
-            y2 = random.randint(0, height)
-            draw.rectangle([x1, y1, x2, y2], fill=shape_color)
-        elif shape_type == 'circle':
-            x1 = random.randint(0, width)
-            y1 = random.randint(0, height)
-            radius = random.randint(20, 200)
-            draw.ellipse([x1-radius, y1-radius, x1+radius, y1+radius], fill=shape_color)
-        else:  # line
-            x1 = random.randint(0, width)
-            y1 = random.randint(0, height)
-            x2 = random.randint(0, width)
-            y2 = random.randint(0, height)
-            draw.line([x1, y1, x2, y2], fill=shape_color, width=random.randint(5, 20))
-    
-    # Add category name text
-    try:
-        # Try to use a font if available
-        title_font = ImageFont.truetype("arial.ttf", 120)
-    except IOError:
-        # Fall back to default font
-        title_font = ImageFont.load_default()
-    
-    # Add title with shadow effect
-    title_x, title_y = width // 2, height // 2
-    # Shadow
-    draw.text((title_x+4, title_y+4), category_name, font=title_font, fill=(0, 0, 0), anchor="mm")
-    # Main text
-    draw.text((title_x, title_y), category_name, font=title_font, fill=(255, 255, 255), anchor="mm")
-    
-    # Add a "NETFIX" watermark
-    try:
-        watermark_font = ImageFont.truetype("arial.ttf", 36)
-    except IOError:
-        watermark_font = ImageFont.load_default()
-    
-    draw.text((width - 100, height - 50), "NETFIX", font=watermark_font, fill=(229, 9, 20), anchor="mm")
-    
-    # Save the image
-    image.save(f"images/categories/{filename}")
+        # Add a "NETFIX" watermark (rasterized once per process, then reused)
+        draw_text_layer(image, (width - 100, height - 50), "NETFIX", 36, (229, 9, 20))
+    return image
+
+# Function to create a category banner
+def create_category_banner(category_name, filename, seed=None, formats=(), encoding=None):
+    return _render_banner_job((category_name, filename, seed, formats, encoding))[0]
+
+# Save a rendered image plus the resized/re-encoded ladder if requested.
+# Returns encoder report rows (empty when encoding is None, which keeps
+# Pillow's default JPEG settings).
+def save_rendered(image, path, formats=(), encoding=None):
+    rows = []
+    if encoding is None:
+        with timed("jpeg_encode"):
+            data = encode_default(image)
+        write_bytes(path, data)
+    else:
+        rows.append(save_image(image, path, encoding))
+    if formats:
+        build_derivatives(image, path, formats=formats, encoding=encoding, report=rows)
+    return rows
+
+# Worker entry points (module level so they can be pickled by the pool)
+def _render_poster_job(job):
+    title, genre, year, rating, filename, seed, formats, encoding = job
+    image = render_movie_poster(title, genre, year, rating, seed=seed)
+    rows = save_rendered(image, f"images/posters/{filename}", formats, encoding)
+    with timed("placeholder"):
+        entry = placeholder(image)
+    count("posters_rendered")
+    print(f"Created poster: {filename}")
+    return filename, rows, entry
+
+def _render_banner_job(job):
+    category_name, filename, seed, formats, encoding = job
+    image = render_category_banner(category_name, seed=seed)
+    rows = save_rendered(image, f"images/categories/{filename}", formats, encoding)
+    with timed("placeholder"):
+        entry = placeholder(image)
+    count("banners_rendered")
     print(f"Created category banner: {filename}")
-    return filename
-
-# Create movie posters for different genres
-movie_data = [
-    {"title": "Cosmic Adventure", "genre": "Sci-Fi", "year": 2025, "rating": 4.8},
-    {"title": "The Last Detective", "genre": "Thriller", "year": 2024, "rating": 4.6},
-    {"title": "Love in Paris", "genre": "Romance", "year": 2025, "rating": 4.5},
-    {"title": "Jungle Quest", "genre": "Adventure", "year": 2024, "rating": 4.7},
-    {"title": "Midnight Shadows", "genre": "Horror", "year": 2025, "rating": 4.4},
-    {"title": "Laugh Factory", "genre": "Comedy", "year": 2024, "rating": 4.9},
-    {"title": "Urban Legend", "genre": "Drama", "year": 2025, "rating": 4.3},
-    {"title": "Robot Revolution", "genre": "Sci-Fi", "year": 2024, "rating": 4.7},
-    {"title": "Mountain Explorer", "genre": "Documentary", "year": 2025, "rating": 4.8},
-    {"title": "Magical Kingdom", "genre": "Fantasy", "year": 2024, "rating": 4.5},
-    {"title": "Speed Racers", "genre": "Action", "year": 2025, "rating": 4.6},
-    {"title": "Cartoon World", "genre": "Animation", "year": 2024, "rating": 4.9}
-]
-
-# Create movie posters
-for i, movie in enumerate(movie_data):
-    create_movie_poster(
-        movie["title"],
-        movie["genre"],
-        movie["year"],
-        movie["rating"],
-        f"movie_{i+1}.jpg"
+    return filename, rows, entry
+
+# Run render jobs serially or spread across a process pool
+def _run_jobs(render, jobs, workers=1, chunksize=None):
+    if workers is None or workers < 1:
+        workers = os.cpu_count() or 1
+    workers = min(workers, max(len(jobs), 1))
+
+    if workers == 1:
+        return [render(job) for job in jobs]
+
+    # Hand each worker a few chunks so slow items don't leave cores idle
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (workers * 4))
+
+    # Workers send their stage timings back with each result
+    with ProcessPoolExecutor(max_workers=workers, initializer=reset) as executor:
+        results = []
+        for result, metrics in executor.map(partial(collect, render), jobs, chunksize=chunksize):
+            merge(metrics)
+            results.append(result)
+        return results
+
+# Render only the jobs whose inputs changed since the last run, then drop
+# outputs from earlier runs that are no longer part of the catalog. The
+# placeholder of every image rendered goes into the placeholders dict.
+def _run_cached_jobs(render, jobs, keys, output_dir, cache, workers, chunksize, report,
+                     placeholders=None):
+    if cache is not None:
+        jobs = [job for job in jobs if not cache.is_fresh(*keys[job])]
+
+    results = _run_jobs(render, jobs, workers, chunksize)
+    rendered = [filename for filename, _, _ in results]
+    if report is not None:
+        for _, rows, _ in results:
+            report.extend(rows)
+    if placeholders is not None:
+        for job, (_, _, entry) in zip(jobs, results):
+            placeholders[manifest_key(keys[job][0])] = entry
+
+    if cache is not None:
+        for job in jobs:
+            output_path, key = keys[job]
+            formats = job[-2]
+            extra_outputs = derivative_paths(output_path, formats=formats) if formats else ()
+            cache.record(output_path, key, RENDERER_NAME, extra_outputs)
+        cache.prune(RENDERER_NAME, output_dir)
+    return rendered
+
+# Cache keys: everything that affects the pixels of one poster/banner
+def poster_key(movie, seed, formats=(), encoding=None):
+    return input_key(
+        renderer=RENDERER_NAME, version=RENDERER_VERSION, kind="poster",
+        title=movie["title"], genre=movie["genre"], year=movie["year"], rating=movie["rating"],
+        size=POSTER_SIZE, seed=seed, ladder=LADDER if formats else None, formats=tuple(formats),
+        encoding=encoding._asdict() if encoding else None
     )
 
-# Create category banners
-categories = [
-    "Action", "Comedy", "Drama", "Sci-Fi", "Documentary",
-    "Horror", "Romance", "Thriller", "Animation", "Fantasy"
-]
-
-for i, category in enumerate(categories):
-    create_category_banner(category, f"category_{i+1}.jpg")
-
-print("All images created successfully!")
-
-# Create an HTML file that uses these images
-html_content = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Netfix App Trailer with Images</title>
-    <style>
-        body {
-            background-color: #000;
-            color: white;
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 0;
-            overflow-x: hidden;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-        }
-        header {
-            text-align: center;
-            margin-bottom: 40px;
-            height: 100vh;
-            display: flex;
-            flex-direction: column;
-            justify-content: center;
-            align-items: center;
-            background: linear-gradient(rgba(0,0,0,0.7), rgba(0,0,0,0.7)), url('images/categories/category_4.jpg');
-            background-size: cover;
-            background-position: center;
-        }
-        h1 {
-            color: #E50914;
-            font-size: 72px;
-            margin: 0;
-            animation: fadeInUp 1.5s ease-out;
-        }
-        h2 {
-            color: #E50914;
-            font-size: 36px;
-            margin-top: 40px;
-            animation: fadeInLeft 1s ease-out;
-        }
-        .tagline {
-            font-size: 24px;
-            margin-top: 20px;
-            opacity: 0;
-            animation: fadeIn 1.5s ease-out 0.5s forwards;
-        }
-        .section {
-            min-height: 100vh;
-            display: flex;
-            flex-direction: column;
-            justify-content: center;
-            padding: 60px 0;
-            opacity: 0;
-            transform: translateY(50px);
-            transition: opacity 1s ease, transform 1s ease;
-        }
-        .section.visible {
-            opacity: 1;
-            transform: translateY(0);
-        }
-        .feature-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 30px;
-            margin-top: 40px;
-        }
-        .feature-card {
-            background-color: rgba(40, 40, 40, 0.7);
-            border-radius: 8px;
-            padding: 30px;
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-            height: 100%;
-        }
-        .feature-card:hover {
-            transform: translateY(-10px);
-            box-shadow: 0 10px 20px rgba(229, 9, 20, 0.3);
-        }
-        .feature-icon {
-            font-size: 48px;
-            margin-bottom: 20px;
-            color: #E50914;
-        }
-        .feature-title {
-            font-size: 24px;
-            margin-bottom: 15px;
-            color: #E50914;
-        }
-        .feature-desc {
-            font-size: 16px;
-            line-height: 1.6;
-        }
-        .category-showcase {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 20px;
-            margin-top: 30px;
-        }
-        .category-item {
-            width: calc(33.33% - 14px);
-            aspect-ratio: 16/9;
-            border-radius: 5px;
-            overflow: hidden;
-            position: relative;
-            transition: transform 0.3s ease;
-        }
-        .category-item:hover {
-            transform: scale(1.05);
-        }
-        .category-item img {
-            width: 100%;
-            height: 100%;
-            object-fit: cover;
-        }
-        .category-name {
-            position: absolute;
-            bottom: 0;
-            left: 0;
-            right: 0;
-            background: linear-gradient(transparent, rgba(0,0,0,0.8));
-            padding: 20px;
-            font-weight: bold;
-            font-size: 18px;
-        }
-        .movie-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(180px, 1fr));
-            gap: 20px;
-            margin-top: 30px;
-        }
-        .movie-card {
-            background-color: #333;
-            border-radius: 5px;
-            overflow: hidden;
-            transition: transform 0.3s ease;
-            height: 100%;
-        }
-        .movie-card:hover {
-            transform: scale(1.05);
-        }
-        .movie-poster {
-            width: 100%;
-            aspect-ratio: 2/3;
-            overflow: hidden;
-        }
-        .movie-poster img {
-            width: 100%;
-            height: 100%;
-            object-fit: cover;
-        }
-        .movie-info {
-            padding: 15px;
-        }
-        .movie-title {
-            font-size: 16px;
-            font-weight: bold;
-            margin-bottom: 5px;
-        }
-        .movie-meta {
-            font-size: 14px;
-            color: #999;
-        }
-        .cta-button {
-            display: inline-block;
-            background-color: #E50914;
-            color: white;
-            padding: 15px 30px;
-            border-radius: 5px;
-            font-size: 18px;
-            font-weight: bold;
-            text-decoration: none;
-            margin-top: 30px;
-            transition: background-color 0.3s ease, transform 0.3s ease;
-        }
-        .cta-button:hover {
-            background-color: #F40612;
-            transform: scale(1.05);
-        }
-        footer {
-            text-align: center;
-            margin-top: 60px;
-            padding: 40px 20px;
-            border-top: 1px solid #333;
-        }
-        
-        /* Animations */
-        @keyframes fadeIn {
-            from { opacity: 0; }
-            to { opacity: 1; }
-        }
-        @keyframes fadeInUp {
-            from { 
-                opacity: 0;
-                transform: translateY(50px);
-            }
-            to { 
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-        @keyframes fadeInLeft {
-            from { 
-                opacity: 0;
-                transform: translateX(-50px);
-            }
-            to { 
-                opacity: 1;
-                transform: translateX(0);
-            }
-        }
-        
-        /* Responsive design */
-        @media (max-width: 768px) {
-            h1 { font-size: 48px; }
-            h2 { font-size: 28px; }
-            .category-item { width: calc(50% - 10px); }
-        }
-        @media (max-width: 480px) {
-            h1 { font-size: 36px; }
-            h2 { font-size: 24px; }
-            .category-item { width: 100%; }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>NETFIX</h1>
-            <p class="tagline">Your Ultimate Streaming Experience</p>
-        </header>
-
-        <section id="intro" class="section">
-            <h2>Welcome to Netfix</h2>
-            <p>The revolutionary streaming platform that brings you the best content across all genres. Our app is designed to provide a seamless and personalized viewing experience.</p>
-            
-            <div class="feature-grid">
-                <div class="feature-card">
-                    <div class="feature-icon">👤</div>
-                    <h3 class="feature-title">Personalized Profiles</h3>
-                    <p class="feature-desc">Create multiple profiles for everyone in your household, each with their own preferences and recommendations.</p>
-                </div>
-                
-                <div class="feature-card">
-                    <div class="feature-icon">🎬</div>
-                    <h3 class="feature-title">Extensive Library</h3>
-                    <p class="feature-desc">Access thousands of movies and TV shows across various genres and languages.</p>
-                </div>
-                
-                <div class="feature-card">
-                    <div class="feature-icon">📱</div>
-                    <h3 class="feature-title">Watch Anywhere</h3>
-                    <p class="feature-desc">Stream on your phone, tablet, or TV with our seamless cross-device experience.</p>
-                </div>
-            </div>
-        </section>
-
-        <section id="categories" class="section">
-            <h2>Discover Content Across Genres</h2>
-            <p>Browse our extensive collection of movies and TV shows organized by genre.</p>
-            
-            <div class="category-showcase">
-                <div class="category-item">
-                    <img src="images/categories/category_1.jpg" alt="Action">
-                    <div class="category-name">Action</div>
-                </div>
-                <div class="category-item">
-                    <img src="images/categories/category_2.jpg" alt="Comedy">
-                    <div class="category-name">Comedy</div>
-                </div>
-                <div class="category-item">
-                    <img src="images/categories/category_3.jpg" alt="Drama">
-                    <div class="category-name">Drama</div>
-                </div>
-                <div class="category-item">
-                    <img src="images/categories/category_4.jpg" alt="Sci-Fi">
-                    <div class="category-name">Sci-Fi</div>
-                </div>
-                <div class="category-item">
-                    <img src="images/categories/category_5.jpg" alt="Documentary">
-                    <div class="category-name">Documentary</div>
-                </div>
-                <div class="category-item">
-                    <img src="images/categories/category_6.jpg" alt="Horror">
-                    <div class="category-name">Horror</div>
-                </div>
-            </div>
-        </section>
-
-        <section id="trending" class="section">
-            <h2>Trending Now</h2>
-            <p>Check out what's popular on Netfix right now.</p>
-            
-            <div class="movie-grid">
-                <div class="movie-card">
-                    <div class="movie-poster">
-                        <img src="images/posters/movie_1.jpg" alt="Cosmic Adventure">
-                    </div>
-                    <div class="movie-info">
-                        <div class="movie-title">Cosmic Adventure</div>
-                        <div class="movie-meta">2025 • Sci-Fi • 4.8 ⭐</div>
-                    </div>
-                </div>
-                
-                <div class="movie-card">
-                    <div class="movie-poster">
-                        <img src="images/posters/movie_2.jpg" alt="The Last Detective">
-                    </div>
-                    <div class="movie-info">
-                        <div class="movie-title">The Last Detective</div>
-                        <div class="movie-meta">2024 • Thriller • 4.6 ⭐</div>
-                    </div>
-                </div>
-                
-                <div class="movie-card">
-                    <div class="movie-poster">
-                        <img src="images/posters/movie_3.jpg" alt="Love in Paris">
-                    </div>
-                    <div class="movie-info">
-                        <div class="movie-title">Love in Paris</div>
-                        <div class="movie-meta">2025 • Romance • 4.5 ⭐</div>
-                    </div>
-                </div>
-                
-                <div class="movie-card">
-                    <div class="movie-poster">
-                        <img src="images/posters/movie_4.jpg" alt="Jungle Quest">
-                    </div>
-                    <div class="movie-info">
-                        <div class="movie-title">Jungle Quest</div>
-                        <div class="movie-meta">2024 • Adventure • 4.7 ⭐</div>
-                    </div>
-                </div>
-                
-                <div class="movie-card">
-                    <div class="movie-poster">
-                        <img src="images/posters/movie_5.jpg" alt="Midnight Shadows">
-                    </div>
-                    <div class="movie-info">
-                        <div class="movie-title">Midnight Shadows</div>
-                        <div class="movie-meta">2025 • Horror • 4.4 ⭐</div>
-                    </div>
-                </div>
-                
-                <div class="movie-card">
-                    <div class="movie-poster">
-                        <img src="images/posters/movie_6.jpg" alt="Laugh Factory">
-                    </div>
-                    <div class="movie-info">
-                        <div class="movie-title">Laugh Factory</div>
-                        <div class="movie-meta">2024 • Comedy • 4.9 ⭐</div>
-                    </div>
-                </div>
-            </div>
-        </section>
-
-        <section id="features" class="section">
-            <h2>Smart Features</h2>
-            <p>Netfix is designed with you in mind, offering a range of features to enhance your viewing experience.</p>
-            
-            <div class="feature-grid">
-                <div class="feature-card">
-                    <div class="feature-icon">🔍</div>
-                    <h3 class="feature-title">Smart Search</h3>
-                    <p class="feature-desc">Find exactly what you're looking for with our intelligent search functionality.</p>
-                </div>
-                
-                <div class="feature-card">
-                    <div class="feature-icon">💾</div>
-                    <h3 class="feature-title">Download & Watch</h3>
-                    <p class="feature-desc">Download your favorite content and watch it offline, anytime, anywhere.</p>
-                </div>
-                
-                <div class="feature-card">
-                    <div class="feature-icon">🤖</div>
-                    <h3 class="feature-title">AI Recommendations</h3>
-                    <p class="feature-desc">Our AI learns your preferences and suggests content you'll love.</p>
-                </div>
-                
-                <div class="feature-card">
-                    <div class="feature-icon">🔄</div>
-                    <h3 class="feature-title">Seamless Streaming</h3>
-                    <p class="feature-desc">Enjoy uninterrupted viewing with adaptive streaming quality.</p>
-                </div>
-            </div>
-            
-            <div style="text-align: center; margin-top: 50px;">
-                <a href="#" class="cta-button">Download Netfix Now</a>
-            </div>
-        </section>
-
-        <footer>
-            <h1>NETFIX</h1>
-            <p>Stream Smarter. Download Now.</p>
-            <p>&copy; 2025 Netfix. All rights reserved.</p>
-        </footer>
-    </div>
-
-    <script>
-        // Intersection Observer to trigger animations when sections come into view
-        document.addEventListener('DOMContentLoaded', function() {
-            const sections = document.querySelectorAll('.section');
-            
-            const observer = new IntersectionObserver((entries) => {
-                entries.forEach(entry => {
-                    if (entry.isIntersecting) {
-                        entry.target.classList.add('visible');
-                    }
-                });
-            }, {
-                threshold: 0.1
-            });
-            
-            sections.forEach(section => {
-                observer.observe(section);
-            });
-        });
-    </script>
-</body>
-</html>
-"""
-
-# Save the HTML file
-with open("netfix_trailer_with_images.html", "w") as f:
-    f.write(html_content)
-
-print("HTML trailer page with images created: netfix_trailer_with_images.html")
+def banner_key(category_name, seed, formats=(), encoding=None):
+    return input_key(
+        renderer=RENDERER_NAME, version=RENDERER_VERSION, kind="banner",
+        title=category_name, size=BANNER_SIZE, seed=seed,
+        ladder=LADDER if formats else None, formats=tuple(formats),
+        encoding=encoding._asdict() if encoding else None
+    )
+
+# Create a poster for every movie
+def render_posters(movies, workers=1, chunksize=None, base_seed=0, cache=None, formats=(),
+                   encoding=None, report=None, placeholders=None):
+    output_dir = os.path.join('images', 'posters')
+    jobs = []
+    keys = {}
+    for i, movie in enumerate(movies):
+        filename = f"movie_{i+1}.jpg"
+        job = (
+            movie["title"],
+            movie["genre"],
+            movie["year"],
+            movie["rating"],
+            filename,
+            item_seed("poster", filename, base_seed),
+            tuple(formats),
+            encoding
+        )
+        jobs.append(job)
+        keys[job] = (os.path.join(output_dir, filename), poster_key(movie, job[5], formats, encoding))
+    return _run_cached_jobs(_render_poster_job, jobs, keys, output_dir, cache, workers, chunksize, report,
+                            placeholders)
+
+# Create a banner for every category
+def render_banners(category_names, workers=1, chunksize=None, base_seed=0, cache=None, formats=(),
+                   encoding=None, report=None, placeholders=None):
+    output_dir = os.path.join('images', 'categories')
+    jobs = []
+    keys = {}
+    for i, category in enumerate(category_names):
+        filename = f"category_{i+1}.jpg"
+        job = (category, filename, item_seed("banner", filename, base_seed), tuple(formats), encoding)
+        jobs.append(job)
+        keys[job] = (os.path.join(output_dir, filename), banner_key(category, job[2], formats, encoding))
+    return _run_cached_jobs(_render_banner_job, jobs, keys, output_dir, cache, workers, chunksize, report,
+                            placeholders)
+
+# Encoder settings for the --optimize-encoding/--max-kb/--min-ssim options
+# (None keeps Pillow's default JPEG settings)
+def encoding_from_args(args):
+    if not (args.optimize_encoding or args.max_kb is not None or args.min_ssim is not None):
+        return None
+    return EncodeSettings(
+        max_bytes=None if args.max_kb is None else int(args.max_kb * 1024),
+        min_similarity=args.min_ssim,
+        progressive=not args.baseline_jpeg,
+        subsampling=args.subsampling,
+    )
+
+# Derivative formats for --derivatives/--formats that this Pillow can write
+def formats_from_args(args):
+    if not args.derivatives:
+        return ()
+    requested = tuple(f.strip().lower() for f in args.formats.split(",") if f.strip())
+    formats = available_formats(requested)
+    for missing in set(requested) - set(formats):
+        print(f"Skipping {missing} derivatives: not supported by this Pillow build")
+    return formats
+
+# Per-image bytes saved versus Pillow's default encoder settings
+def save_encode_report(report):
+    if report:
+        with open(os.path.join('images', 'encode_report.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Encoding: {summarize(report)}")
+
+def main():
+    from catalog import CatalogError, iter_catalog, keep_head, render_catalog
+    parser = argparse.ArgumentParser(description="Generate Netfix trailer posters, banners and HTML page")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of render processes (0 = one per CPU core)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="render jobs handed to a worker at a time")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="base seed for the per-item random shapes")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render every image even if its inputs are unchanged")
+    parser.add_argument("--derivatives", action="store_true",
+                        help="also write w185/w342/w500/original copies of every image")
+    parser.add_argument("--formats", default="jpeg,webp,avif",
+                        help="comma-separated derivative formats (jpeg, webp, avif)")
+    parser.add_argument("--optimize-encoding", action="store_true",
+                        help="encode with progressive/optimized JPEG and write an encode report")
+    parser.add_argument("--max-kb", type=float, default=None,
+                        help="byte budget per master image in KB (searches JPEG/WebP quality)")
+    parser.add_argument("--min-ssim", type=float, default=None,
+                        help="lowest acceptable SSIM against the unencoded render (0-1)")
+    parser.add_argument("--subsampling", default="4:2:0", choices=["4:4:4", "4:2:2", "4:2:0"],
+                        help="JPEG chroma subsampling")
+    parser.add_argument("--baseline-jpeg", action="store_true",
+                        help="disable progressive scans when optimizing encoding")
+    parser.add_argument("--atlas", action="store_true",
+                        help="pack the page's images into sprite sheets and use CSS sprites")
+    parser.add_argument("--catalog", default=None,
+                        help="stream movies from a CSV/JSONL file ('-' for stdin) instead of movie_data")
+    parser.add_argument("--categories", default=None,
+                        help="stream category names from a CSV/JSONL file instead of categories")
+    parser.add_argument("--strict", action="store_true",
+                        help="stop at the first invalid catalog record instead of skipping it")
+    args = parser.parse_args()
+    if args.derivatives and (args.catalog or args.categories):
+        parser.error("--derivatives can't be combined with --catalog/--categories yet")
+
+    encoding = encoding_from_args(args)
+    formats = formats_from_args(args)
+
+    # Create directories for images
+    os.makedirs('images', exist_ok=True)
+    os.makedirs('images/posters', exist_ok=True)
+    os.makedirs('images/categories', exist_ok=True)
+
+    cache = RenderCache(force=args.force)
+    report = []
+    manifest = load_placeholders()
+    # The page shows the first few records of whatever was rendered
+    page_movies, page_categories = movie_data, categories
+    # The cache is saved even when a bad record stops the run, so what was
+    # rendered before it isn't rendered again next time
+    try:
+        if args.catalog:
+            page_movies = []
+            movies = keep_head(iter_catalog(args.catalog, "poster", strict=args.strict), TRENDING_TITLES,
+                               page_movies)
+            render_catalog(movies, "poster", args.workers, args.seed, encoding, cache, placeholders=manifest)
+        else:
+            render_posters(movie_data, args.workers, args.chunksize, args.seed, cache, formats, encoding, report,
+                           manifest)
+        if args.categories:
+            page_categories = []
+            names = keep_head(iter_catalog(args.categories, "banner", strict=args.strict), SHOWCASE_CATEGORIES,
+                              page_categories)
+            render_catalog(names, "banner", args.workers, args.seed, encoding, cache, placeholders=manifest)
+        else:
+            render_banners(categories, args.workers, args.chunksize, args.seed, cache, formats, encoding, report,
+                           manifest)
+    except CatalogError as e:
+        parser.exit(1, f"Invalid catalog: {e}\n")
+    finally:
+        cache.save()
+
+    print(f"Render cache: {cache.summary()}")
+
+    # Images the page shows but that weren't rendered this run (cached, or
+    # streamed from a catalog) get their placeholder from the file on disk
+    scenes = SceneManifest()
+    html_content = trailer_page(page_movies, page_categories)
+    complete(manifest, [match.group(1) for match in IMG_TAG.finditer(html_content)])
+    save_placeholders(manifest)
+
+    save_encode_report(report)
+    print("All images created successfully!")
+
+    # Save the HTML file, optionally serving the page's posters/banners
+    # from a few sprite sheets, with placeholders inlined for the rest
+    write_page(html_content, "netfix_trailer_with_images.html",
+               "trailer_with_images" if args.atlas else None, manifest, scenes=scenes)
+
+    print("HTML trailer page with images created: netfix_trailer_with_images.html")
+    print(budget_report("netfix_trailer_with_images.html"))
+    report_metrics(RENDERER_NAME)
+
+if __name__ == "__main__":
+    main()
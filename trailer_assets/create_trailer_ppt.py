@@ -1,15 +1,16 @@
 from pptx import Presentation
-from pptx.util import Inches, Pt
+from pptx.util import Inches
 from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+import argparse
+import hashlib
+import json
 import os
-
-# Create a new presentation
-prs = Presentation()
-
-# Set slide dimensions to 16:9 (widescreen)
-prs.slide_width = Inches(16)
-prs.slide_height = Inches(9)
+from catalog_data import movie_data
+from deck_media import DPI, DeckMedia, content_hash
+from instrumentation import count, report as report_metrics, timed, traced
+from trailer_script import SCRIPT_PATH, SceneManifest, load_graph, scene_backdrop
 
 # Define colors (Netflix-inspired)
 NETFLIX_RED = RGBColor(229, 9, 20)
@@ -17,177 +18,212 @@ BLACK = RGBColor(0, 0, 0)
 WHITE = RGBColor(255, 255, 255)
 DARK_GRAY = RGBColor(20, 20, 20)
 
-# Helper function to add a title slide
-def add_title_slide(title, subtitle=None, background_color=BLACK):
-    slide_layout = prs.slide_layouts[0]  # Title slide layout
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Set background color
-    background = slide.background
-    fill = background.fill
+# Right-hand area of a scene slide that shows its posters or banners; the
+# bullets are narrowed to BODY_WIDTH to make room
+MEDIA_BOX = (Inches(10.25), Inches(2), Inches(5), Inches(6.5))
+BODY_WIDTH = Inches(9.25)
+
+# Bump whenever slides are built differently, so decks built the old way
+# are rebuilt whole
+DECK_VERSION = 2
+
+# Create a new 16:9 (widescreen) presentation
+def new_presentation():
+    prs = Presentation()
+    prs.slide_width = Inches(16)
+    prs.slide_height = Inches(9)
+    return prs
+
+# Move the deck's look onto the slide master and its Title Slide and
+# Title and Content layouts: black background, red bold Arial titles,
+# white Arial body text with check-mark bullets, placeholders laid out
+# for 16:9. Slides built on those layouts then carry nothing but their
+# text, so their XML stays small.
+def apply_master_theme(prs):
+    master = prs.slide_master
+    fill = master.background.fill
     fill.solid()
-    fill.fore_color.rgb = background_color
-    
-    # Add title
-    title_shape = slide.shapes.title
-    title_shape.text = title
-    title_shape.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-    
-    # Format title
-    for paragraph in title_shape.text_frame.paragraphs:
-        for run in paragraph.runs:
-            run.font.color.rgb = NETFLIX_RED
-            run.font.size = Pt(60)
-            run.font.bold = True
-            run.font.name = 'Arial'
-    
-    # Add subtitle if provided
+    fill.fore_color.rgb = BLACK
+
+    styles = master._element.find(qn("p:txStyles"))
+    title = styles.find(qn("p:titleStyle")).find(qn("a:lvl1pPr"))
+    title.set("algn", "l")
+    _set_default_run(title, 44, NETFLIX_RED, bold=True)
+    body = styles.find(qn("p:bodyStyle")).find(qn("a:lvl1pPr"))
+    _set_default_run(body, 28, WHITE)
+    body.find(qn("a:buChar")).set("char", "✓")
+
+    layout = prs.slide_layouts[1]
+    for placeholder in layout.placeholders:
+        if placeholder.placeholder_format.idx == 0:
+            placeholder.left, placeholder.top = Inches(0.75), Inches(0.4)
+            placeholder.width, placeholder.height = Inches(14.5), Inches(1.4)
+        elif placeholder.placeholder_format.idx == 1:
+            placeholder.left, placeholder.top = Inches(0.75), Inches(2)
+            placeholder.width, placeholder.height = Inches(14.5), Inches(6.5)
+
+    # Title slides: big centered title over a centered subtitle
+    for placeholder in prs.slide_layouts[0].placeholders:
+        list_style = placeholder._element.txBody.find(qn("a:lstStyle"))
+        if placeholder.placeholder_format.idx == 0:
+            placeholder.left, placeholder.top = Inches(1), Inches(2.6)
+            placeholder.width, placeholder.height = Inches(14), Inches(2)
+            if list_style.find(qn("a:lvl1pPr")) is None:
+                list_style.insert(0, parse_xml(f'<a:lvl1pPr {nsdecls("a")} algn="ctr"><a:defRPr/></a:lvl1pPr>'))
+            _set_default_run(list_style.find(qn("a:lvl1pPr")), 60, NETFLIX_RED, bold=True)
+        elif placeholder.placeholder_format.idx == 1:
+            placeholder.left, placeholder.top = Inches(2), Inches(4.8)
+            placeholder.width, placeholder.height = Inches(12), Inches(1.6)
+            _set_default_run(list_style.find(qn("a:lvl1pPr")), 32, WHITE)
+    return layout
+
+def _set_default_run(paragraph_properties, size, color, bold=False):
+    run = paragraph_properties.find(qn("a:defRPr"))
+    run.set("sz", str(size * 100))
+    if bold:
+        run.set("b", "1")
+    for child in list(run):
+        run.remove(child)
+    run.append(parse_xml(f'<a:solidFill {nsdecls("a")}><a:srgbClr val="{color}"/></a:solidFill>'))
+    run.append(parse_xml(f'<a:latin {nsdecls("a")} typeface="Arial"/>'))
+
+# Helper function to add a title slide
+@traced("slide_build")
+def add_title_slide(prs, title, subtitle=None):
+    slide = prs.slides.add_slide(prs.slide_layouts[0])  # Title slide layout
+    slide.shapes.title.text = title
     if subtitle:
-        subtitle_shape = slide.placeholders[1]
-        subtitle_shape.text = subtitle
-        subtitle_shape.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-        
-        # Format subtitle
-        for paragraph in subtitle_shape.text_frame.paragraphs:
-            for run in paragraph.runs:
-                run.font.color.rgb = WHITE
-                run.font.size = Pt(32)
-                run.font.name = 'Arial'
-    
+        slide.placeholders[1].text = subtitle
     return slide
 
 # Helper function to add a content slide
-def add_content_slide(title, content, background_color=BLACK):
-    slide_layout = prs.slide_layouts[1]  # Title and content layout
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Set background color
-    background = slide.background
-    fill = background.fill
-    fill.solid()
-    fill.fore_color.rgb = background_color
-    
-    # Add title
-    title_shape = slide.shapes.title
-    title_shape.text = title
-    title_shape.text_frame.paragraphs[0].alignment = PP_ALIGN.LEFT
-    
-    # Format title
-    for paragraph in title_shape.text_frame.paragraphs:
-        for run in paragraph.runs:
-            run.font.color.rgb = NETFLIX_RED
-            run.font.size = Pt(44)
-            run.font.bold = True
-            run.font.name = 'Arial'
-    
-    # Add content
-    content_shape = slide.placeholders[1]
-    content_shape.text = content
-    
-    # Format content
-    for paragraph in content_shape.text_frame.paragraphs:
-        paragraph.alignment = PP_ALIGN.LEFT
-        for run in paragraph.runs:
-            run.font.color.rgb = WHITE
-            run.font.size = Pt(28)
-            run.font.name = 'Arial'
-    
+@traced("slide_build")
+def add_content_slide(prs, title, content):
+    slide = prs.slides.add_slide(prs.slide_layouts[1])  # Title and content layout
+    slide.shapes.title.text = title
+    slide.placeholders[1].text = content
     return slide
 
-# Helper function to add a feature slide with bullet points
-def add_feature_slide(title, features, background_color=BLACK):
-    slide_layout = prs.slide_layouts[1]  # Title and content layout
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Set background color
-    background = slide.background
-    fill = background.fill
-    fill.solid()
-    fill.fore_color.rgb = background_color
-    
-    # Add title
-    title_shape = slide.shapes.title
-    title_shape.text = title
-    title_shape.text_frame.paragraphs[0].alignment = PP_ALIGN.LEFT
-    
-    # Format title
-    for paragraph in title_shape.text_frame.paragraphs:
-        for run in paragraph.runs:
-            run.font.color.rgb = NETFLIX_RED
-            run.font.size = Pt(44)
-            run.font.bold = True
-            run.font.name = 'Arial'
-    
-    # Add bullet points
-    body_shape = slide.placeholders[1]
-    tf = body_shape.text_frame
-    
+# Helper function to add a feature slide with bullet points (the master
+# draws the check marks)
+@traced("slide_build")
+def add_feature_slide(prs, title, features):
+    slide = prs.slides.add_slide(prs.slide_layouts[1])  # Title and content layout
+    slide.shapes.title.text = title
+    tf = slide.placeholders[1].text_frame
     for i, feature in enumerate(features):
-        if i == 0:
-            p = tf.paragraphs[0]
-        else:
-            p = tf.add_paragraph()
+        p = tf.paragraphs[0] if i == 0 else tf.add_paragraph()
         p.text = feature
-        p.level = 0
-        
-        # Format bullet points
-        for run in p.runs:
-            run.font.color.rgb = WHITE
-            run.font.size = Pt(28)
-            run.font.name = 'Arial'
-    
     return slide
 
-# Create slides for the Netfix app trailer
-
-# 1. Intro slide
-add_title_slide("NETFIX", "Your Ultimate Streaming Experience")
-
-# 2. User Profiles slide
-add_feature_slide("Personalized Profiles", [
-    "✓ Multiple user profiles",
-    "✓ Individual viewing preferences",
-    "✓ Customized recommendations",
-    "✓ Easy profile switching"
-])
-
-# 3. Movie Categories slide
-add_feature_slide("Discover Content", [
-    "✓ Browse by genre: Action, Comedy, Drama, Sci-Fi, Documentary",
-    "✓ Trending now section",
-    "✓ New releases",
-    "✓ Award-winning titles"
-])
-
-# 4. Movie Details slide
-add_feature_slide("Detailed Information", [
-    "✓ Comprehensive movie details",
-    "✓ Cast and crew information",
-    "✓ User ratings and reviews",
-    "✓ Similar recommendations"
-])
-
-# 5. Video Playback slide
-add_feature_slide("Seamless Streaming", [
-    "✓ High-definition playback",
-    "✓ Adaptive streaming quality",
-    "✓ Intuitive playback controls",
-    "✓ Download for offline viewing"
-])
-
-# 6. Personalization slide
-add_feature_slide("Smart Recommendations", [
-    "✓ AI-powered content suggestions",
-    "✓ Based on viewing history",
-    "✓ Tailored to your preferences",
-    "✓ Discover new favorites"
-])
-
-# 7. Closing slide
-add_title_slide("NETFIX", "Stream Smarter. Download Now.")
-
-# Save the presentation
-output_path = os.path.join(os.getcwd(), "Netfix_App_Trailer.pptx")
-prs.save(output_path)
-
-print(f"Presentation created successfully at: {output_path}")
+# Rendered images shown beside a scene: four category banners or four
+# posters (a different four per scene), whichever of them are on disk
+def scene_images(scene):
+    kind = scene_backdrop(scene)
+    if kind == "categories":
+        paths = [os.path.join("images", "categories", f"category_{i + 1}.jpg") for i in range(4)]
+    elif kind == "posters":
+        first = scene.number * 3
+        paths = [os.path.join("images", "posters", f"movie_{(first + i) % len(movie_data) + 1}.jpg")
+                 for i in range(4)]
+    else:
+        paths = []
+    return [path for path in paths if os.path.exists(path)]
+
+# What a scene's slide is built from: the scene's fingerprint plus the
+# content of the images it embeds (a re-rendered poster changes the slide
+# though the script didn't) and the resolution they're embedded at
+def slide_key(node, media):
+    images = []
+    for path in scene_images(node.scene):
+        with open(path, "rb") as f:
+            images.append(content_hash(f.read()))
+    payload = json.dumps([DECK_VERSION, node.fingerprint, media.dpi, images])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+# Add the slide for one scene of the trailer script, with its images
+# placed through media (see deck_media) when given
+def add_scene_slide(prs, node, media=None):
+    if node.layout == "title":
+        return add_title_slide(prs, node.title, node.subtitle)
+    slide = add_feature_slide(prs, node.title, node.bullets)
+    paths = scene_images(node.scene) if media is not None else []
+    if paths:
+        slide.placeholders[1].width = BODY_WIDTH
+        columns = 2 if scene_backdrop(node.scene) == "posters" else 1
+        media.add_grid(slide, paths, MEDIA_BOX, columns=columns, gap=Inches(0.15))
+    return slide
+
+# Create slides for the Netfix app trailer, one per scene of the script
+def build_trailer_deck(prs, graph=None, media=None):
+    graph = graph or load_graph()
+    for node in graph.nodes:
+        add_scene_slide(prs, node, media)
+
+# Swap the slide at index for a freshly built one, keeping its position
+def _replace_slide(prs, index, node, media=None):
+    add_scene_slide(prs, node, media)
+    slide_ids = prs.slides._sldIdLst
+    new_id = slide_ids[-1]
+    old_id = slide_ids[index]
+    slide_ids.remove(new_id)
+    slide_ids.insert(index, new_id)
+    prs.part.drop_rel(old_id.rId)
+    slide_ids.remove(old_id)
+    # New slides are named after the slide count, so a second replacement
+    # would reuse the first one's part name
+    prs.part.rename_slide_parts([slide_id.rId for slide_id in slide_ids])
+
+# Bring the deck at path up to date with the script and the images: only
+# the slides whose slide_key() changed are rebuilt (the whole deck when
+# it's missing, every slide changed, or scenes were added, removed or
+# reordered). Returns the number
+# of slides built; 0 means the deck was already current and wasn't saved.
+# Pictures go through media, which keeps the numbers for its size report.
+def update_deck(path, graph=None, manifest=None, media=None):
+    graph = graph or load_graph()
+    manifest = manifest or SceneManifest()
+    media = media or DeckMedia()
+    keys = [slide_key(node, media) for node in graph.nodes]
+    changed = manifest.changed(path, graph, keys)
+    if changed is None or len(changed) == len(graph.nodes):
+        prs = new_presentation()
+        apply_master_theme(prs)
+        build_trailer_deck(prs, graph, media)
+        built = len(graph.nodes)
+    elif not changed:
+        return 0
+    else:
+        prs = Presentation(path)
+        numbers = [node.scene.number for node in graph.nodes]
+        for node in changed:
+            _replace_slide(prs, numbers.index(node.scene.number), node, media)
+        built = len(changed)
+
+    with timed("file_write"):
+        prs.save(path)
+    count("slides", built)
+    manifest.record(path, graph, keys)
+    manifest.save()
+    return built
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Netfix trailer deck from trailer_script.txt")
+    parser.add_argument("--script", default=SCRIPT_PATH)
+    parser.add_argument("--output", default=os.path.join(os.getcwd(), "Netfix_App_Trailer.pptx"))
+    parser.add_argument("--force", action="store_true", help="rebuild every slide even if its scene is unchanged")
+
+    parser.add_argument("--dpi", type=int, default=DPI, help="resolution slide images are embedded at")
+    args = parser.parse_args()
+
+    media = DeckMedia(args.dpi)
+    built = update_deck(args.output, load_graph(args.script), SceneManifest(force=args.force), media)
+    if built:
+        print(f"Presentation created successfully at: {args.output} ({built} slide(s) rebuilt)")
+        print(media.summary(args.output))
+    else:
+        print(f"Presentation is up to date: {args.output}")
+    report_metrics("create_trailer_ppt")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import hashlib
+import os
+from io import BytesIO
+from PIL import Image
+from instrumentation import count, timed
+
+# Pictures for the decks. An image is stored at the pixel size it's shown
+# at on the slide for DPI (never enlarged) rather than at full render
+# resolution, and identical results are stored once: the same poster
+# placed at the same size always encodes to the same bytes, and the deck
+# keeps one media part per distinct content hash.
+DPI = 150
+JPEG_QUALITY = 85
+EMU_PER_INCH = 914400
+
+# Pixel size for an image of image_size shown at display (width, height)
+# EMU on the slide
+def display_pixels(image_size, display, dpi=DPI):
+    width = min(image_size[0], max(1, round(display[0] / EMU_PER_INCH * dpi)))
+    height = min(image_size[1], max(1, round(display[1] / EMU_PER_INCH * dpi)))
+    return width, height
+
+# Size (EMU) an image takes when fitted inside a box, keeping its aspect
+def fit(image_size, box_width, box_height):
+    scale = min(box_width / image_size[0], box_height / image_size[1])
+    return int(image_size[0] * scale), int(image_size[1] * scale)
+
+# Downscale to the display size and encode: JPEG for opaque images, PNG
+# where there's transparency to keep
+def encode_for_display(image, display, dpi=DPI):
+    pixels = display_pixels(image.size, display, dpi)
+    if pixels != image.size:
+        with timed("resize"):
+            image = image.resize(pixels, Image.LANCZOS, reducing_gap=3.0)
+    buffer = BytesIO()
+    with timed("media_encode"):
+        if image.mode in ("RGBA", "LA", "P"):
+            image.save(buffer, "PNG", optimize=True)
+        else:
+            image.convert("RGB").save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+def content_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+# Adds pictures to python-pptx slides through the display-size/dedupe
+# rules above, and keeps the numbers for the size report
+class DeckMedia:
+    def __init__(self, dpi=DPI):
+        self.dpi = dpi
+        self.placements = 0
+        # What embedding the source files as they are would have stored
+        self.original_bytes = 0
+        # content hash -> size of what was actually stored
+        self.stored = {}
+        self._encoded = {}
+
+    # Place the image file at path fitted inside box (left, top, width,
+    # height in EMU), centered. Returns the picture shape.
+    def add_picture(self, slide, path, box):
+        left, top, box_width, box_height = box
+        with Image.open(path) as image:
+            image_size = image.size
+            width, height = fit(image_size, box_width, box_height)
+            key = (os.path.abspath(path), os.path.getmtime(path), width, height, self.dpi)
+            data = self._encoded.get(key)
+            if data is None:
+                data = self._encoded[key] = encode_for_display(image, (width, height), self.dpi)
+
+        self.placements += 1
+        self.original_bytes += os.path.getsize(path)
+        digest = content_hash(data)
+        if digest in self.stored:
+            count("media_deduplicated")
+        self.stored[digest] = len(data)
+        # python-pptx reuses an existing image part whose SHA-1 matches
+        return slide.shapes.add_picture(BytesIO(data), left + (box_width - width) // 2,
+                                        top + (box_height - height) // 2, width, height)
+
+    # Place images in a grid of columns filling box, row by row
+    def add_grid(self, slide, paths, box, columns=2, gap=0):
+        if not paths:
+            return []
+        left, top, width, height = box
+        rows = (len(paths) + columns - 1) // columns
+        cell_width = (width - gap * (columns - 1)) // columns
+        cell_height = (height - gap * (rows - 1)) // rows
+        shapes = []
+        for i, path in enumerate(paths):
+            row, column = divmod(i, columns)
+            cell = (left + column * (cell_width + gap), top + row * (cell_height + gap), cell_width, cell_height)
+            shapes.append(self.add_picture(slide, path, cell))
+        return shapes
+
+    # "Deck: 412 KB (was ~3,880 KB with full-size, duplicated images); ..."
+    def summary(self, deck_path):
+        return size_summary(deck_path, self.placements, len(self.stored), self.original_bytes,
+                            sum(self.stored.values()))
+
+# original_bytes is what embedding every source file as is would have
+# stored, stored_bytes what the deck actually holds; the "before" size is
+# the deck on disk with one swapped for the other
+def size_summary(deck_path, placements, unique, original_bytes, stored_bytes):
+    size = os.path.getsize(deck_path)
+    before = size - stored_bytes + original_bytes
+    return (f"Deck: {size / 1024:,.0f} KB (was ~{before / 1024:,.0f} KB with full-size, duplicated images); "
+            f"{placements} picture(s), {unique} stored, {stored_bytes / 1024:,.0f} KB of media")
@@ -0,0 +1,88 @@
+import os
+from PIL import Image, features
+from encoder import encode_default, save_image, write_bytes
+from instrumentation import timed
+
+# Width ladder, named the same way as the TMDB image paths the app
+# already uses (e.g. .../w500/poster.jpg). "original" keeps master size.
+LADDER = ("w185", "w342", "w500", "original")
+
+# File extension and encoder options per output format
+FORMAT_OPTIONS = {
+    "jpeg": ("jpg", {"quality": 85}),
+    "webp": ("webp", {"quality": 80, "method": 4}),
+    "avif": ("avif", {"quality": 60, "speed": 8}),
+}
+
+# Known formats this Pillow build can actually write (AVIF needs
+# Pillow 11.2+ or the pillow-avif-plugin package)
+def available_formats(formats=tuple(FORMAT_OPTIONS)):
+    formats = tuple(f for f in formats if f in FORMAT_OPTIONS)
+    if "avif" in formats and not features.check("avif"):
+        try:
+            import pillow_avif  # noqa: F401  (registers the AVIF plugin)
+        except ImportError:
+            formats = tuple(f for f in formats if f != "avif")
+    return tuple(formats)
+
+# Parse "w342" -> 342; "original" -> None
+def ladder_width(label):
+    return None if label == "original" else int(label[1:])
+
+# Path of one derivative of a master image, e.g.
+# images/posters/movie_1.jpg -> images/posters/w342/movie_1.webp
+def derivative_path(master_path, label, fmt):
+    directory, filename = os.path.split(master_path)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, label, f"{stem}.{FORMAT_OPTIONS[fmt][0]}")
+
+# Every file build_derivatives() will write for a master. The master itself
+# is the original-size JPEG, so that one is never duplicated.
+def derivative_paths(master_path, ladder=LADDER, formats=tuple(FORMAT_OPTIONS)):
+    paths = []
+    for label in ladder:
+        for fmt in formats:
+            if label == "original" and fmt == "jpeg":
+                continue
+            paths.append(derivative_path(master_path, label, fmt))
+    return paths
+
+# Downscale to a target width. resize() with reducing_gap first shrinks by
+# an integer factor with Image.reduce (box filter, very cheap) and only
+# runs the Lanczos filter over the last small step.
+def scale_to_width(image, width):
+    if width >= image.width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+
+# Write the whole ladder in every format from one in-memory master image.
+# With encoding settings, JPEG/WebP copies go through the quality search
+# (any byte budget is scaled down by pixel area) and their report rows are
+# appended to report.
+def build_derivatives(image, master_path, ladder=LADDER, formats=tuple(FORMAT_OPTIONS),
+                      encoding=None, report=None):
+    written = []
+    for label in ladder:
+        width = ladder_width(label)
+        with timed("resize"):
+            scaled = image if width is None else scale_to_width(image, width)
+        settings = encoding
+        if encoding is not None and encoding.max_bytes is not None:
+            area = (scaled.width * scaled.height) / (image.width * image.height)
+            settings = encoding._replace(max_bytes=int(encoding.max_bytes * area))
+        for fmt in formats:
+            if label == "original" and fmt == "jpeg":
+                continue
+            path = derivative_path(master_path, label, fmt)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if settings is not None and fmt in ("jpeg", "webp"):
+                row = save_image(scaled, path, settings, fmt)
+                if report is not None:
+                    report.append(row)
+            else:
+                with timed(f"{fmt}_encode"):
+                    data = encode_default(scaled, fmt, **FORMAT_OPTIONS[fmt][1])
+                write_bytes(path, data)
+            written.append(path)
+    return written
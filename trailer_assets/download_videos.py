@@ -1,12 +1,9 @@
 import os
-import requests
-import urllib.request
 import time
+from instrumentation import count, report as report_metrics, timed_download
 
-# Create directories for different categories
+# Clip categories, one directory each under clips/
 categories = ['action', 'comedy', 'drama', 'scifi', 'documentary']
-for category in categories:
-    os.makedirs(f'clips/{category}', exist_ok=True)
 
 # List of free stock videos from Pexels (direct download links)
 # These are sample videos that could represent different movie categories
@@ -32,24 +29,39 @@ videos = [
     {'url': 'https://player.vimeo.com/external/371845661.sd.mp4?s=1ef39e3c9f7d4f4ec2e35908da448fb3498ec30d&profile_id=139&oauth2_token_id=57447761', 'category': 'documentary', 'name': 'cityscape.mp4'},
 ]
 
-print("Starting download of video clips...")
-
-# Download each video
-for i, video in enumerate(videos):
-    try:
-        print(f"Downloading {video['name']} ({i+1}/{len(videos)})...")
-        
-        # Create the full path for saving
-        save_path = os.path.join('clips', video['category'], video['name'])
-        
-        # Download the video
-        urllib.request.urlretrieve(video['url'], save_path)
-        
-        print(f"Successfully downloaded {video['name']}")
-        
-        # Sleep to avoid overwhelming the server
-        time.sleep(1)
-    except Exception as e:
-        print(f"Error downloading {video['name']}: {str(e)}")
-
-print("All downloads completed!")
+# Download every clip into clips/<category>/
+def download_all(videos):
+    # Create directories for different categories
+    for category in categories:
+        os.makedirs(f'clips/{category}', exist_ok=True)
+
+    print("Starting download of video clips...")
+
+    # Download each video
+    for i, video in enumerate(videos):
+        try:
+            print(f"Downloading {video['name']} ({i+1}/{len(videos)})...")
+
+            # Create the full path for saving
+            save_path = os.path.join('clips', video['category'], video['name'])
+
+            # Download the video
+            timed_download(video['url'], save_path)
+            count("downloads_ok")
+
+            print(f"Successfully downloaded {video['name']}")
+
+            # Sleep to avoid overwhelming the server
+            time.sleep(1)
+        except Exception as e:
+            count("downloads_failed")
+            print(f"Error downloading {video['name']}: {str(e)}")
+
+    print("All downloads completed!")
+
+def main():
+    download_all(videos)
+    report_metrics("download_videos")
+
+if __name__ == "__main__":
+    main()
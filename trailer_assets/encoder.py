@@ -0,0 +1,148 @@
+from collections import namedtuple
+from io import BytesIO
+import numpy as np
+from PIL import Image
+from instrumentation import timed
+
+# How to encode a generated image
+#   max_bytes      - byte budget; pick the highest quality that fits
+#   min_similarity - SSIM floor (0-1); pick the lowest quality that meets it
+#   progressive    - progressive JPEG scan order
+#   optimize       - optimized Huffman tables (JPEG) / slower, smaller WebP
+#   subsampling    - JPEG chroma subsampling: "4:4:4", "4:2:2" or "4:2:0"
+#   quality        - fixed quality when neither budget nor floor is set
+EncodeSettings = namedtuple(
+    "EncodeSettings",
+    ["max_bytes", "min_similarity", "progressive", "optimize", "subsampling", "quality"],
+    defaults=[None, None, True, True, "4:2:0", 85],
+)
+
+# Result of encoding one image
+EncodeResult = namedtuple("EncodeResult", ["data", "quality", "similarity"])
+
+# Quality range searched when a budget or floor is set
+MIN_QUALITY, MAX_QUALITY = 30, 95
+
+# Encode with explicit settings and return the bytes
+def encode(image, fmt, quality, settings=EncodeSettings()):
+    buffer = BytesIO()
+    if fmt == "jpeg":
+        image.save(buffer, "JPEG", quality=quality, optimize=settings.optimize,
+                   progressive=settings.progressive, subsampling=settings.subsampling)
+    elif fmt == "webp":
+        image.save(buffer, "WEBP", quality=quality, method=6 if settings.optimize else 4)
+    else:
+        raise ValueError(f"Unsupported format for quality search: {fmt}")
+    return buffer.getvalue()
+
+# Encode with Pillow's default settings, i.e. the same bytes a plain
+# image.save(path) writes
+def encode_default(image, fmt="jpeg", **options):
+    buffer = BytesIO()
+    image.save(buffer, fmt.upper(), **options)
+    return buffer.getvalue()
+
+# Bytes Pillow produces with its default settings, i.e. what a plain
+# image.save(path) wrote before this encoder existed
+def baseline_size(image, fmt):
+    with timed("baseline_encode"):
+        return len(encode_default(image, fmt))
+
+# Write already-encoded bytes to path
+def write_bytes(path, data):
+    with timed("file_write"):
+        with open(path, "wb") as f:
+            f.write(data)
+
+# Luma split into non-overlapping block x block tiles
+def _luma_blocks(image, block=8):
+    luma = np.asarray(image.convert("L"), dtype=np.float32)
+    h = luma.shape[0] // block * block
+    w = luma.shape[1] // block * block
+    return luma[:h, :w].reshape(h // block, block, w // block, block)
+
+# Mean SSIM over 8x8 tiles of the luma channel, all tiles at once
+def _ssim(ref_blocks, blocks):
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    mu_a = ref_blocks.mean(axis=(1, 3), keepdims=True)
+    mu_b = blocks.mean(axis=(1, 3), keepdims=True)
+    da, db = ref_blocks - mu_a, blocks - mu_b
+    var_a = (da * da).mean(axis=(1, 3))
+    var_b = (db * db).mean(axis=(1, 3))
+    cov = (da * db).mean(axis=(1, 3))
+    mu_a, mu_b = mu_a[:, 0, :, 0], mu_b[:, 0, :, 0]
+    ssim = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(ssim.mean())
+
+# Perceptual similarity (SSIM, 1.0 = identical) between two images
+def similarity(reference, candidate):
+    return _ssim(_luma_blocks(reference), _luma_blocks(candidate))
+
+# Encode image, binary-searching quality to meet the byte budget and/or
+# similarity floor in settings. When both can't be met the budget wins.
+def encode_image(image, fmt, settings=EncodeSettings()):
+    if settings.max_bytes is None and settings.min_similarity is None:
+        data = encode(image, fmt, settings.quality, settings)
+        return EncodeResult(data, settings.quality, None)
+
+    ref_blocks = _luma_blocks(image) if settings.min_similarity is not None else None
+    tried = {}
+
+    def attempt(quality):
+        if quality not in tried:
+            data = encode(image, fmt, quality, settings)
+            score = None
+            if ref_blocks is not None:
+                score = _ssim(ref_blocks, _luma_blocks(Image.open(BytesIO(data))))
+            tried[quality] = EncodeResult(data, quality, score)
+        return tried[quality]
+
+    # Highest quality within the byte budget
+    budget_quality = MAX_QUALITY
+    if settings.max_bytes is not None:
+        low, high, budget_quality = MIN_QUALITY, MAX_QUALITY, MIN_QUALITY
+        while low <= high:
+            mid = (low + high) // 2
+            if len(attempt(mid).data) <= settings.max_bytes:
+                budget_quality, low = mid, mid + 1
+            else:
+                high = mid - 1
+
+    # Lowest quality that still looks close enough to the master
+    floor_quality = MAX_QUALITY
+    if settings.min_similarity is not None:
+        low, high = MIN_QUALITY, MAX_QUALITY
+        while low <= high:
+            mid = (low + high) // 2
+            if attempt(mid).similarity >= settings.min_similarity:
+                floor_quality, high = mid, mid - 1
+            else:
+                low = mid + 1
+
+    return attempt(min(budget_quality, floor_quality))
+
+# Encode and write image to path, returning a report row comparing the
+# result with Pillow's default output
+def save_image(image, path, settings=EncodeSettings(), fmt="jpeg"):
+    with timed(f"{fmt}_encode"):
+        result = encode_image(image, fmt, settings)
+    write_bytes(path, result.data)
+
+    baseline = baseline_size(image, fmt)
+    return {
+        "path": path,
+        "format": fmt,
+        "quality": result.quality,
+        "similarity": None if result.similarity is None else round(result.similarity, 4),
+        "bytes": len(result.data),
+        "baseline_bytes": baseline,
+        "saved_bytes": baseline - len(result.data),
+    }
+
+# One-line summary of a batch of report rows
+def summarize(rows):
+    total = sum(row["bytes"] for row in rows)
+    baseline = sum(row["baseline_bytes"] for row in rows)
+    saved = baseline - total
+    percent = 100.0 * saved / baseline if baseline else 0.0
+    return f"{len(rows)} images, {total / 1024:.1f} KB vs {baseline / 1024:.1f} KB default ({percent:.1f}% saved)"
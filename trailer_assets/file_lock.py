@@ -0,0 +1,70 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# The manifests under images/ (render cache, placeholders, scenes) are
+# updated by separate processes at once when the build runs independent
+# steps side by side. Each process saves by taking the manifest's lock,
+# reading what's on disk now, applying only the entries it changed and
+# writing the result, so no process's entries are lost to another's
+# stale copy.
+#
+# The lock is a <path>.lock file created exclusively, which works the
+# same everywhere. A lock older than STALE_SECONDS was left by a process
+# that died mid-save (a save takes milliseconds) and is taken over.
+STALE_SECONDS = 30
+POLL_SECONDS = 0.02
+
+@contextmanager
+def locked(path):
+    lock_path = path + ".lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > STALE_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            time.sleep(POLL_SECONDS)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+# The JSON object at path, or default when it's missing or unreadable
+def read_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return default
+
+# Write data as JSON atomically, so an interrupted run can't corrupt it
+def write_json(path, data, **options):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **options)
+    os.replace(tmp_path, path)
+
+# Apply changes ({key: value}) and removed (keys) to the object stored
+# under section of the JSON file at path (the whole file when section is
+# None), under the file's lock, and return the merged object
+def merge_save(path, changes, removed=(), section=None, **options):
+    with locked(path):
+        data = read_json(path, {})
+        if not isinstance(data, dict):
+            data = {}
+        target = data if section is None else data.setdefault(section, {})
+        for key in removed:
+            target.pop(key, None)
+        target.update(changes)
+        write_json(path, data, **options)
+    return target
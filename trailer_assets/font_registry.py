@@ -0,0 +1,109 @@
+import os
+import sys
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+
+# Preferred font files, in order. Arial is what the posters were designed
+# with; the others are metric-compatible or close stand-ins found on Linux.
+SANS_FONTS = [
+    "arial.ttf", "Arial.ttf",
+    "LiberationSans-Regular.ttf",
+    "Arimo-Regular.ttf",
+    "DejaVuSans.ttf",
+    "Helvetica.ttc",
+    "FreeSans.ttf",
+]
+
+# Extra directories can be listed in NETFIX_FONT_PATH (os.pathsep separated)
+def font_dirs():
+    dirs = [d for d in os.environ.get("NETFIX_FONT_PATH", "").split(os.pathsep) if d]
+    home = os.path.expanduser("~")
+
+    if sys.platform.startswith("win"):
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        dirs.append(os.path.join(windir, "Fonts"))
+        local = os.environ.get("LOCALAPPDATA")
+        if local:
+            dirs.append(os.path.join(local, "Microsoft", "Windows", "Fonts"))
+    elif sys.platform == "darwin":
+        dirs += [
+            os.path.join(home, "Library", "Fonts"),
+            "/Library/Fonts",
+            "/System/Library/Fonts",
+            "/System/Library/Fonts/Supplemental",
+        ]
+    else:
+        # Same places fontconfig looks by default
+        data_home = os.environ.get("XDG_DATA_HOME", os.path.join(home, ".local", "share"))
+        dirs += [
+            os.path.join(data_home, "fonts"),
+            os.path.join(home, ".fonts"),
+            "/usr/local/share/fonts",
+            "/usr/share/fonts",
+        ]
+    return [d for d in dirs if os.path.isdir(d)]
+
+# Index every font file under the search paths by lower-cased file name
+@lru_cache(maxsize=None)
+def _font_index():
+    index = {}
+    for directory in font_dirs():
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.lower().endswith((".ttf", ".otf", ".ttc")):
+                    index.setdefault(name.lower(), os.path.join(root, name))
+    return index
+
+# A font file named in NETFIX_FONT is used for everything instead, so
+# renders can be reproduced exactly across machines (the benchmark's
+# golden images are made with the one in benchmarks/fonts)
+FONT_ENV = "NETFIX_FONT"
+
+# Path of the first available font from candidates, or None
+@lru_cache(maxsize=None)
+def find_font(candidates=tuple(SANS_FONTS)):
+    pinned = os.environ.get(FONT_ENV)
+    if pinned:
+        return pinned
+    index = _font_index()
+    for name in candidates:
+        path = index.get(name.lower())
+        if path:
+            return path
+    return None
+
+# Font object for a size, loaded once per process
+@lru_cache(maxsize=None)
+def get_font(size, candidates=tuple(SANS_FONTS)):
+    path = find_font(candidates)
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except IOError:
+            pass
+    # Fall back to Pillow's built-in font, scaled where supported
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+# Pre-rendered RGBA layer of a piece of text (plus optional drop shadow),
+# cached so constant elements like the watermark are rasterized once.
+# Returns (layer, (dx, dy)): paste the layer at the anchor point + (dx, dy).
+@lru_cache(maxsize=256)
+def text_layer(text, size, fill, shadow_offset=0, shadow_fill=(0, 0, 0)):
+    font = get_font(size)
+    left, top, right, bottom = font.getbbox(text, anchor="mm")
+    layer = Image.new("RGBA", (right - left + shadow_offset, bottom - top + shadow_offset), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    origin = (-left, -top)
+    if shadow_offset:
+        draw.text((origin[0] + shadow_offset, origin[1] + shadow_offset), text,
+                  font=font, fill=shadow_fill + (255,), anchor="mm")
+    draw.text(origin, text, font=font, fill=tuple(fill) + (255,), anchor="mm")
+    return layer, (left, top)
+
+# Composite a cached text layer onto image, centered on (x, y)
+def draw_text_layer(image, xy, text, size, fill, shadow_offset=0):
+    layer, (dx, dy) = text_layer(text, size, tuple(fill), shadow_offset)
+    image.paste(layer, (xy[0] + dx, xy[1] + dy), layer)
@@ -0,0 +1,160 @@
+import functools
+import json
+import os
+import shutil
+import time
+
+# Per-stage timers and plain counters for the asset scripts. Timing a
+# stage costs two perf_counter_ns() calls and a dict lookup, so the
+# timers stay on all the time; nothing is written unless one of these
+# is set:
+#   NETFIX_METRICS_JSONL     - append one JSON line per stage/counter per run
+#   NETFIX_METRICS_PROM_DIR  - write <dir>/netfix_<script>.prom for the
+#                              node_exporter textfile collector
+JSONL_ENV = "NETFIX_METRICS_JSONL"
+PROM_DIR_ENV = "NETFIX_METRICS_PROM_DIR"
+
+# stage -> [calls, total_ns, max_ns]
+_stages = {}
+_counters = {}
+_started = time.time()
+
+class Timer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.start
+        stat = _stages.get(self.stage)
+        if stat is None:
+            stat = _stages[self.stage] = [0, 0, 0]
+        stat[0] += 1
+        stat[1] += elapsed
+        if elapsed > stat[2]:
+            stat[2] = elapsed
+        return False
+
+# with timed("jpeg_encode"): ...
+def timed(stage):
+    return Timer(stage)
+
+# Decorator form of timed() for whole functions
+def traced(stage):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with Timer(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def count(name, n=1):
+    _counters[name] = _counters.get(name, 0) + n
+
+def reset():
+    _stages.clear()
+    _counters.clear()
+
+# Take this process's numbers and reset them
+def drain():
+    snapshot = {"stages": dict(_stages), "counters": dict(_counters)}
+    reset()
+    return snapshot
+
+# Fold a snapshot from another process into this one
+def merge(snapshot):
+    for stage, (calls, total, longest) in snapshot["stages"].items():
+        stat = _stages.setdefault(stage, [0, 0, 0])
+        stat[0] += calls
+        stat[1] += total
+        stat[2] = max(stat[2], longest)
+    for name, value in snapshot["counters"].items():
+        count(name, value)
+
+# Pool worker wrapper: run function(arg) and send back what it measured,
+# e.g. executor.map(partial(collect, render), jobs) then merge() each.
+# Start the pool with initializer=reset so forked workers don't report
+# numbers they inherited from the parent.
+def collect(function, arg):
+    return function(arg), drain()
+
+# urlretrieve() with the connect (request sent, headers received) and
+# transfer (body streamed to disk) phases timed separately. Returns bytes written.
+def timed_download(url, save_path):
+    import urllib.request
+    with Timer("http_connect"):
+        response = urllib.request.urlopen(url)
+    with response, open(save_path, "wb") as f, Timer("http_transfer"):
+        shutil.copyfileobj(response, f)
+        size = f.tell()
+    count("http_bytes", size)
+    return size
+
+# Everything measured so far as JSON-ready dicts
+def records(script):
+    now = time.time()
+    rows = [{"ts": round(now, 3), "script": script, "kind": "run",
+             "seconds": round(now - _started, 6)}]
+    for stage, (calls, total, longest) in sorted(_stages.items()):
+        rows.append({
+            "ts": round(now, 3), "script": script, "kind": "stage", "stage": stage,
+            "calls": calls, "seconds": round(total / 1e9, 6),
+            "mean_ms": round(total / calls / 1e6, 3), "max_ms": round(longest / 1e6, 3),
+        })
+    for name, value in sorted(_counters.items()):
+        rows.append({"ts": round(now, 3), "script": script, "kind": "counter",
+                     "name": name, "value": value})
+    return rows
+
+def prometheus_text(script):
+    lines = [
+        "# HELP netfix_stage_seconds_total Wall-clock seconds spent in a pipeline stage.",
+        "# TYPE netfix_stage_seconds_total counter",
+    ]
+    label = f'script="{script}"'
+    for stage, (_, total, _) in sorted(_stages.items()):
+        lines.append(f'netfix_stage_seconds_total{{{label},stage="{stage}"}} {total / 1e9:.6f}')
+    lines += ["# HELP netfix_stage_calls_total Times a pipeline stage ran.",
+              "# TYPE netfix_stage_calls_total counter"]
+    for stage, (calls, _, _) in sorted(_stages.items()):
+        lines.append(f'netfix_stage_calls_total{{{label},stage="{stage}"}} {calls}')
+    lines += ["# HELP netfix_stage_max_seconds Slowest single run of a pipeline stage.",
+              "# TYPE netfix_stage_max_seconds gauge"]
+    for stage, (_, _, longest) in sorted(_stages.items()):
+        lines.append(f'netfix_stage_max_seconds{{{label},stage="{stage}"}} {longest / 1e9:.6f}')
+    lines += ["# HELP netfix_events_total Items counted by the asset scripts.",
+              "# TYPE netfix_events_total counter"]
+    for name, value in sorted(_counters.items()):
+        lines.append(f'netfix_events_total{{{label},name="{name}"}} {value}')
+    lines += ["# HELP netfix_run_seconds Wall-clock duration of the last run.",
+              "# TYPE netfix_run_seconds gauge",
+              f"netfix_run_seconds{{{label}}} {time.time() - _started:.6f}",
+              "# HELP netfix_run_timestamp_seconds When the last run finished.",
+              "# TYPE netfix_run_timestamp_seconds gauge",
+              f"netfix_run_timestamp_seconds{{{label}}} {time.time():.3f}"]
+    return "\n".join(lines) + "\n"
+
+# Write the run's numbers wherever the environment asks for them. Call
+# once at the end of a script.
+def report(script):
+    jsonl_path = os.environ.get(JSONL_ENV)
+    if jsonl_path:
+        with open(jsonl_path, "a") as f:
+            for row in records(script):
+                f.write(json.dumps(row) + "\n")
+
+    prom_dir = os.environ.get(PROM_DIR_ENV)
+    if prom_dir:
+        # Written under a temporary name and renamed so the collector
+        # never reads a half-written file
+        os.makedirs(prom_dir, exist_ok=True)
+        path = os.path.join(prom_dir, f"netfix_{script}.prom")
+        with open(path + ".tmp", "w") as f:
+            f.write(prometheus_text(script))
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,310 @@
+import argparse
+import os
+import sys
+
+# One entry point for the asset tools:
+#
+#     netfix-assets posters [--catalog movies.csv] [--workers 0] [--vector svg|svgz]
+#     netfix-assets banners [--categories genres.jsonl]
+#     netfix-assets html [--page trailer|simple|videos|all] [--atlas] [--pretty] [--no-compress] [--force]
+#     netfix-assets html --catalog movies.csv [--shard-size 200]
+#     netfix-assets deck [--output Netfix_App_Trailer.pptx] [--catalog movies.csv [--by-genre]]
+#     netfix-assets fetch [--source vimeo|pixabay|youtube]
+#     netfix-assets build [target ...] [--jobs 4] [--force] [--dry-run] [--list]
+#
+# This module only imports argparse, os and sys, plus build for its
+# options (it imports nothing else until it runs). PIL, NumPy,
+# python-pptx and pytube are imported inside the subcommand that needs
+# them, so `netfix-assets --help`, `html` or `fetch` start without
+# paying for them.
+
+# Options shared by the posters and banners subcommands
+def _add_render_options(parser):
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of render processes (0 = one per CPU core)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="render jobs handed to a worker at a time")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="base seed for the per-item random shapes")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render every image even if its inputs are unchanged")
+    parser.add_argument("--strict", action="store_true",
+                        help="stop at the first invalid catalog record instead of skipping it")
+    parser.add_argument("--derivatives", action="store_true",
+                        help="also write w185/w342/w500/original copies of every image")
+    parser.add_argument("--formats", default="jpeg,webp,avif",
+                        help="comma-separated derivative formats (jpeg, webp, avif)")
+    parser.add_argument("--optimize-encoding", action="store_true",
+                        help="encode with progressive/optimized JPEG and write an encode report")
+    parser.add_argument("--max-kb", type=float, default=None,
+                        help="byte budget per master image in KB (searches JPEG/WebP quality)")
+    parser.add_argument("--min-ssim", type=float, default=None,
+                        help="lowest acceptable SSIM against the unencoded render (0-1)")
+    parser.add_argument("--subsampling", default="4:2:0", choices=["4:4:4", "4:2:2", "4:2:0"],
+                        help="JPEG chroma subsampling")
+    parser.add_argument("--baseline-jpeg", action="store_true",
+                        help="disable progressive scans when optimizing encoding")
+    parser.add_argument("--vector", default=None, choices=["svg", "svgz"],
+                        help="write SVG (or gzipped .svgz) files instead of JPEGs")
+
+# Render posters or banners from the built-in lists or a streamed catalog
+def _render(args, kind):
+    if args.vector:
+        return _render_vector(args, kind)
+    from catalog import CatalogError, iter_catalog, render_catalog
+    from pages import load_placeholders
+    from placeholders import save_placeholders
+    from render_cache import RenderCache
+    import create_trailer_images as images
+
+    source = args.catalog if kind == "poster" else args.categories
+    if args.derivatives and source:
+        sys.exit("--derivatives can't be combined with a streamed catalog yet")
+    encoding = images.encoding_from_args(args)
+    formats = images.formats_from_args(args)
+
+    os.makedirs(os.path.join("images", "posters" if kind == "poster" else "categories"), exist_ok=True)
+    cache = RenderCache(force=args.force)
+    report = []
+    manifest = load_placeholders()
+    try:
+        if source:
+            records = iter_catalog(source, kind, strict=args.strict)
+            render_catalog(records, kind, args.workers, args.seed, encoding, cache, placeholders=manifest)
+        elif kind == "poster":
+            images.render_posters(images.movie_data, args.workers, args.chunksize, args.seed,
+                                  cache, formats, encoding, report, manifest)
+        else:
+            images.render_banners(images.categories, args.workers, args.chunksize, args.seed,
+                                  cache, formats, encoding, report, manifest)
+    except CatalogError as e:
+        sys.exit(f"Invalid catalog: {e}")
+    finally:
+        # Keep what was rendered before a bad record stopped the run
+        cache.save()
+        save_placeholders(manifest)
+    print(f"Render cache: {cache.summary()}")
+    images.save_encode_report(report)
+    return images.RENDERER_NAME
+
+def _render_vector(args, kind):
+    from catalog import CatalogError, iter_catalog
+    from render_cache import RenderCache
+    import create_trailer_images as images
+    import svg_render
+
+    source = args.catalog if kind == "poster" else args.categories
+    records = images.movie_data if kind == "poster" else images.categories
+    if source:
+        records = iter_catalog(source, kind, strict=args.strict)
+    cache = RenderCache(force=args.force)
+    try:
+        svg_render.render_svgs(records, kind, args.seed, cache, args.vector == "svgz", args.workers)
+    except CatalogError as e:
+        sys.exit(f"Invalid catalog: {e}")
+    finally:
+        cache.save()
+    print(f"Render cache: {cache.summary()}")
+    return svg_render.RENDERER_NAME
+
+def cmd_posters(args):
+    if args.simple:
+        from catalog import CatalogError, iter_catalog
+        from catalog_data import movie_data
+        from pages import SIMPLE_POSTER_DIR, load_placeholders
+        from placeholders import save_placeholders
+        from render_cache import RenderCache
+        import create_simple_trailer as simple
+
+        os.makedirs(SIMPLE_POSTER_DIR, exist_ok=True)
+        cache = RenderCache(force=args.force)
+        manifest = load_placeholders()
+        movies = movie_data
+        if args.catalog:
+            movies = iter_catalog(args.catalog, "poster", strict=args.strict)
+        try:
+            simple.render_posters(movies, args.seed, cache, manifest)
+        except CatalogError as e:
+            sys.exit(f"Invalid catalog: {e}")
+        finally:
+            cache.save()
+            save_placeholders(manifest)
+        print(f"Render cache: {cache.summary()}")
+        return simple.RENDERER_NAME
+    return _render(args, "poster")
+
+def cmd_banners(args):
+    return _render(args, "banner")
+
+# Pages get the placeholders the posters/banners commands recorded; it
+# takes PIL to compute missing ones, so html only uses what's there.
+# With --catalog, the sharded catalog browser page is written instead.
+def cmd_html(args):
+    if args.catalog:
+        return _catalog_page(args)
+    from pages import PAGES, PAGE_BUDGET_KB, budget_report, default_page, load_placeholders, write_page
+    from trailer_script import SceneManifest
+    manifest = load_placeholders()
+    scenes = SceneManifest(force=args.force)
+    names = list(PAGES) if args.page == "all" else [args.page]
+    for name in names:
+        path, atlas_name = PAGES[name]
+        if name == "videos":
+            from clip_posters import clip_paths, extract_posters
+            from download_youtube_samples import videos
+            extract_posters(clip_paths(videos))
+        if write_page(default_page(name), path, atlas_name if args.atlas else None, manifest,
+                      minify=not args.pretty, compress=not args.no_compress, scenes=scenes):
+            sizes = [f"{os.path.getsize(path) / 1024:.1f} KB"]
+            sizes += [f"{ext} {os.path.getsize(path + ext) / 1024:.1f} KB" for ext in (".gz", ".br")
+                      if os.path.exists(path + ext)]
+            print(f"HTML page created: {path} ({', '.join(sizes)})")
+        else:
+            print(f"HTML page is up to date: {path}")
+        print("  " + budget_report(path, args.budget or PAGE_BUDGET_KB))
+    return "html"
+
+def _catalog_page(args):
+    from catalog import CatalogError, iter_catalog
+    from catalog_pages import build_catalog_page
+    from pages import PAGE_BUDGET_KB, budget_report
+    try:
+        build_catalog_page(iter_catalog(args.catalog, strict=args.strict), args.output,
+                           shard_size=args.shard_size, minify=not args.pretty, compress=not args.no_compress)
+    except CatalogError as e:
+        sys.exit(f"Invalid catalog: {e}")
+    print("  " + budget_report(args.output, args.budget or PAGE_BUDGET_KB))
+    return "html"
+
+# Only the slides of scenes that changed in trailer_script.txt are rebuilt.
+# With --catalog, a one-slide-per-title deck is streamed instead.
+def cmd_deck(args):
+    if args.catalog:
+        from catalog import CatalogError, iter_catalog
+        import catalog_deck
+        from deck_media import size_summary
+        output = args.output
+        if args.by_genre and output == "Netfix_App_Trailer.pptx":
+            output = "decks"
+        try:
+            decks = catalog_deck.build_catalog_decks(iter_catalog(args.catalog, "poster", strict=args.strict),
+                                                     output, args.by_genre, args.workers)
+        except CatalogError as e:
+            sys.exit(f"Invalid catalog: {e}")
+        for path, deck in sorted(decks.items()):
+            print(f"Deck created: {path} ({deck.slides} slides)")
+            print("  " + size_summary(path, deck.placements, len(deck.media), deck.original_bytes, deck.stored_bytes))
+        return catalog_deck.RENDERER_NAME
+    from create_trailer_ppt import update_deck
+    from deck_media import DeckMedia
+    from trailer_script import SCRIPT_PATH, SceneManifest, load_graph
+    graph = load_graph(args.script or SCRIPT_PATH)
+    media = DeckMedia()
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    built = update_deck(args.output, graph, SceneManifest(force=args.force), media)
+    if built:
+        print(f"Presentation created successfully at: {os.path.abspath(args.output)} ({built} slide(s) rebuilt)")
+        print(media.summary(args.output))
+    else:
+        print(f"Presentation is up to date: {os.path.abspath(args.output)}")
+    return "create_trailer_ppt"
+
+def cmd_fetch(args):
+    if args.source == "vimeo":
+        import download_videos as source
+        source.download_all(source.videos)
+    elif args.source == "pixabay":
+        import download_pixabay_videos as source
+        source.download_all(source.search_terms)
+    else:
+        import download_youtube_samples as source
+        source.download_all(source.videos)
+    return source.__name__
+
+# Everything above as one dependency graph, rebuilding only the steps whose
+# inputs changed (see build.py)
+def cmd_build(args):
+    import build
+    if args.list:
+        build.list_nodes()
+        return "build"
+    try:
+        ok = build.build(args.targets, args.jobs, args.force, args.dry_run)
+    except KeyError as e:
+        sys.exit(e.args[0])
+    if not ok:
+        build.report_metrics("build")
+        sys.exit(1)
+    return "build"
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="netfix-assets", description="Build the Netfix trailer assets")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    posters = commands.add_parser("posters", help="render movie posters into images/posters")
+    posters.add_argument("--catalog", default=None,
+                         help="stream movies from a CSV/JSONL file ('-' for stdin) instead of the built-in list")
+    posters.add_argument("--simple", action="store_true",
+                         help="use the simple flat-shape poster style (into images/simple_posters)")
+    _add_render_options(posters)
+    posters.set_defaults(run=cmd_posters)
+
+    banners = commands.add_parser("banners", help="render category banners into images/categories")
+    banners.add_argument("--categories", default=None,
+                         help="stream category names from a CSV/JSONL file instead of the built-in list")
+    _add_render_options(banners)
+    banners.set_defaults(run=cmd_banners)
+
+    html = commands.add_parser("html", help="write the trailer HTML pages")
+    html.add_argument("--page", default="all", choices=["trailer", "simple", "videos", "all"])
+    html.add_argument("--atlas", action="store_true",
+                      help="pack each page's images into sprite sheets and use CSS sprites")
+    html.add_argument("--pretty", action="store_true", help="write the pages unminified")
+    html.add_argument("--no-compress", action="store_true", help="don't write .gz/.br copies of the pages")
+    html.add_argument("--force", action="store_true",
+                      help="rewrite every page even if its scenes and images are unchanged")
+    html.add_argument("--budget", type=int, default=None,
+                      help="KB a page may make a browser fetch on open (default 500)")
+    html.add_argument("--catalog", default=None,
+                      help="write a sharded catalog browser page for this CSV/JSONL catalog instead")
+    html.add_argument("--output", default="netfix_catalog.html", help="catalog browser page (with --catalog)")
+    html.add_argument("--shard-size", type=int, default=200, help="titles per catalog shard (with --catalog)")
+    html.add_argument("--strict", action="store_true",
+                      help="stop at the first invalid catalog record instead of skipping it")
+    html.set_defaults(run=cmd_html)
+
+    deck = commands.add_parser("deck", help="build the PowerPoint trailer deck")
+    deck.add_argument("--output", default="Netfix_App_Trailer.pptx")
+    deck.add_argument("--script", default=None, help="trailer script to build from (default: trailer_script.txt)")
+    deck.add_argument("--force", action="store_true", help="rebuild every slide even if its scene is unchanged")
+    deck.add_argument("--catalog", default=None,
+                      help="build one slide per title of a CSV/JSONL movie catalog instead of the trailer deck")
+    deck.add_argument("--by-genre", action="store_true",
+                      help="with --catalog, write one deck per genre into the --output directory")
+    deck.add_argument("--workers", type=int, default=1,
+                      help="with --catalog, slide preparation processes (0 = one per CPU core)")
+    deck.add_argument("--strict", action="store_true",
+                      help="stop at the first invalid catalog record instead of skipping it")
+    deck.set_defaults(run=cmd_deck)
+
+    fetch = commands.add_parser("fetch", help="download the sample video clips into clips/")
+    fetch.add_argument("--source", default="vimeo", choices=["vimeo", "pixabay", "youtube"])
+    fetch.set_defaults(run=cmd_fetch)
+
+    import build
+    build_command = commands.add_parser("build",
+                                        help="build everything that's out of date, independent steps in parallel")
+    build.add_arguments(build_command)
+    build_command.set_defaults(run=cmd_build)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    script = args.run(args)
+
+    from instrumentation import report
+    report(script)
+
+if __name__ == "__main__":
+    main()
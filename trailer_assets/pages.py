@@ -0,0 +1,1300 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+from html import escape
+from itertools import islice
+from catalog_data import record_key
+from file_lock import read_json
+from instrumentation import count, timed
+from templates import Template, minify_html
+from trailer_script import load_graph
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Pages written by the asset scripts, kept apart from the renderers so
+# writing a page needs neither PIL nor NumPy. Each page is a template
+# whose sections come from the scenes of trailer_script.txt and whose
+# cards, tiles and clip blocks are rendered from catalog data (see
+# trailer_page(), simple_trailer_page() and video_page() below).
+
+# Trailer page that uses the generated posters and banners
+TRAILER_WITH_IMAGES_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Netfix App Trailer with Images</title>{{hero_preload|raw}}
+    <style>
+        body {
+            background-color: #000;
+            color: white;
+            font-family: Arial, sans-serif;
+            margin: 0;
+            padding: 0;
+            overflow-x: hidden;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+        }
+        header {
+            text-align: center;
+            margin-bottom: 40px;
+            height: 100vh;
+            display: flex;
+            flex-direction: column;
+            justify-content: center;
+            align-items: center;
+            background: linear-gradient(rgba(0,0,0,0.7), rgba(0,0,0,0.7)){{hero_background|raw}};
+            background-size: cover;
+            background-position: center;
+        }
+        h1 {
+            color: #E50914;
+            font-size: 72px;
+            margin: 0;
+            animation: fadeInUp 1.5s ease-out;
+        }
+        h2 {
+            color: #E50914;
+            font-size: 36px;
+            margin-top: 40px;
+            animation: fadeInLeft 1s ease-out;
+        }
+        .tagline {
+            font-size: 24px;
+            margin-top: 20px;
+            opacity: 0;
+            animation: fadeIn 1.5s ease-out 0.5s forwards;
+        }
+        .section {
+            min-height: 100vh;
+            display: flex;
+            flex-direction: column;
+            justify-content: center;
+            padding: 60px 0;
+            opacity: 0;
+            transform: translateY(50px);
+            transition: opacity 1s ease, transform 1s ease;
+        }
+        .section.visible {
+            opacity: 1;
+            transform: translateY(0);
+        }
+        .feature-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+            gap: 30px;
+            margin-top: 40px;
+        }
+        .feature-card {
+            background-color: rgba(40, 40, 40, 0.7);
+            border-radius: 8px;
+            padding: 30px;
+            transition: transform 0.3s ease, box-shadow 0.3s ease;
+            height: 100%;
+        }
+        .feature-card:hover {
+            transform: translateY(-10px);
+            box-shadow: 0 10px 20px rgba(229, 9, 20, 0.3);
+        }
+        .feature-title {
+            font-size: 24px;
+            margin-bottom: 15px;
+            color: #E50914;
+        }
+        .feature-desc {
+            font-size: 16px;
+            line-height: 1.6;
+        }
+        .category-showcase {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 20px;
+            margin-top: 30px;
+        }
+        .category-item {
+            width: calc(33.33% - 14px);
+            aspect-ratio: 16/9;
+            border-radius: 5px;
+            overflow: hidden;
+            position: relative;
+            transition: transform 0.3s ease;
+        }
+        .category-item:hover {
+            transform: scale(1.05);
+        }
+        .category-item img {
+            width: 100%;
+            height: 100%;
+            object-fit: cover;
+        }
+        .category-name {
+            position: absolute;
+            bottom: 0;
+            left: 0;
+            right: 0;
+            background: linear-gradient(transparent, rgba(0,0,0,0.8));
+            padding: 20px;
+            font-weight: bold;
+            font-size: 18px;
+        }
+        .movie-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(180px, 1fr));
+            gap: 20px;
+            margin-top: 30px;
+        }
+        .movie-card {
+            background-color: #333;
+            border-radius: 5px;
+            overflow: hidden;
+            transition: transform 0.3s ease;
+            height: 100%;
+        }
+        .movie-card:hover {
+            transform: scale(1.05);
+        }
+        .movie-poster {
+            width: 100%;
+            aspect-ratio: 2/3;
+            overflow: hidden;
+        }
+        .movie-poster img {
+            width: 100%;
+            height: 100%;
+            object-fit: cover;
+        }
+        picture {
+            display: contents;
+        }
+        .movie-info {
+            padding: 15px;
+        }
+        .movie-title {
+            font-size: 16px;
+            font-weight: bold;
+            margin-bottom: 5px;
+        }
+        .movie-meta {
+            font-size: 14px;
+            color: #999;
+        }
+        .cta-button {
+            display: inline-block;
+            background-color: #E50914;
+            color: white;
+            padding: 15px 30px;
+            border-radius: 5px;
+            font-size: 18px;
+            font-weight: bold;
+            text-decoration: none;
+            margin-top: 30px;
+            transition: background-color 0.3s ease, transform 0.3s ease;
+        }
+        .cta-button:hover {
+            background-color: #F40612;
+            transform: scale(1.05);
+        }
+        footer {
+            text-align: center;
+            margin-top: 60px;
+            padding: 40px 20px;
+            border-top: 1px solid #333;
+        }
+        
+        /* Animations */
+        @keyframes fadeIn {
+            from { opacity: 0; }
+            to { opacity: 1; }
+        }
+        @keyframes fadeInUp {
+            from { 
+                opacity: 0;
+                transform: translateY(50px);
+            }
+            to { 
+                opacity: 1;
+                transform: translateY(0);
+            }
+        }
+        @keyframes fadeInLeft {
+            from { 
+                opacity: 0;
+                transform: translateX(-50px);
+            }
+            to { 
+                opacity: 1;
+                transform: translateX(0);
+            }
+        }
+        
+        /* Responsive design */
+        @media (max-width: 768px) {
+            h1 { font-size: 48px; }
+            h2 { font-size: 28px; }
+            .category-item { width: calc(50% - 10px); }
+        }
+        @media (max-width: 480px) {
+            h1 { font-size: 36px; }
+            h2 { font-size: 24px; }
+            .category-item { width: 100%; }
+        }
+        .scene-tagline {
+            font-size: 1.2em;
+            font-style: italic;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+{{scenes|raw}}
+        <footer>
+            <p>&copy; 2025 Netfix. All rights reserved.</p>
+        </footer>
+    </div>
+
+    <script>
+        // Intersection Observer to trigger animations when sections come into view
+        document.addEventListener('DOMContentLoaded', function() {
+            const sections = document.querySelectorAll('.section');
+            
+            const observer = new IntersectionObserver((entries) => {
+                entries.forEach(entry => {
+                    if (entry.isIntersecting) {
+                        entry.target.classList.add('visible');
+                    }
+                });
+            }, {
+                threshold: 0.1
+            });
+            
+            sections.forEach(section => {
+                observer.observe(section);
+            });
+        });
+    </script>
+</body>
+</html>
+"""
+
+# Simple trailer page with the simple posters
+SIMPLE_TRAILER_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Netfix App Trailer</title>
+    <style>
+        body {
+            background-color: #000;
+            color: white;
+            font-family: Arial, sans-serif;
+            margin: 0;
+            padding: 0;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+        }
+        header {
+            text-align: center;
+            padding: 100px 0;
+            background: linear-gradient(rgba(0,0,0,0.7), rgba(0,0,0,0.7)), url('https://images.unsplash.com/photo-1478720568477-152d9b164e26?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80');
+            background-size: cover;
+            background-position: center;
+            margin-bottom: 50px;
+        }
+        h1 {
+            color: #E50914;
+            font-size: 72px;
+            margin: 0;
+            animation: fadeIn 1.5s;
+        }
+        h2 {
+            color: #E50914;
+            font-size: 36px;
+            margin-top: 40px;
+            animation: fadeIn 1.5s;
+        }
+        .tagline {
+            font-size: 24px;
+            margin-top: 20px;
+            animation: fadeIn 2s;
+        }
+        .section {
+            margin-bottom: 80px;
+            animation: fadeIn 1.5s;
+        }
+        .movie-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
+            gap: 20px;
+            margin-top: 30px;
+        }
+        .movie-card {
+            background-color: #333;
+            border-radius: 5px;
+            overflow: hidden;
+            transition: transform 0.3s;
+        }
+        .movie-card:hover {
+            transform: scale(1.05);
+        }
+        .movie-poster {
+            width: 100%;
+            aspect-ratio: 2/3;
+        }
+        .movie-poster img {
+            width: 100%;
+            height: 100%;
+            object-fit: cover;
+        }
+        picture {
+            display: contents;
+        }
+        .movie-info {
+            padding: 15px;
+        }
+        .movie-title {
+            font-size: 16px;
+            font-weight: bold;
+            margin-bottom: 5px;
+        }
+        .movie-meta {
+            font-size: 14px;
+            color: #999;
+        }
+        .feature-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+            gap: 30px;
+            margin-top: 40px;
+        }
+        .feature-card {
+            background-color: #222;
+            border-radius: 8px;
+            padding: 30px;
+            transition: transform 0.3s;
+        }
+        .feature-card:hover {
+            transform: translateY(-10px);
+        }
+        .feature-title {
+            font-size: 24px;
+            margin-bottom: 15px;
+            color: #E50914;
+        }
+        .feature-desc {
+            font-size: 16px;
+            line-height: 1.6;
+        }
+        .cta-button {
+            display: inline-block;
+            background-color: #E50914;
+            color: white;
+            padding: 15px 30px;
+            border-radius: 5px;
+            font-size: 18px;
+            font-weight: bold;
+            text-decoration: none;
+            margin-top: 30px;
+            transition: background-color 0.3s;
+        }
+        .cta-button:hover {
+            background-color: #F40612;
+        }
+        footer {
+            text-align: center;
+            margin-top: 60px;
+            padding: 40px 20px;
+            border-top: 1px solid #333;
+        }
+        
+        /* Animations */
+        @keyframes fadeIn {
+            from { opacity: 0; }
+            to { opacity: 1; }
+        }
+        
+        /* Responsive design */
+        @media (max-width: 768px) {
+            h1 { font-size: 48px; }
+            h2 { font-size: 28px; }
+        }
+        .scene-tagline {
+            font-size: 1.2em;
+            font-style: italic;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+{{scenes|raw}}
+        <footer>
+            <p>&copy; 2025 Netfix. All rights reserved.</p>
+        </footer>
+    </div>
+
+    <script>
+        // Add a simple animation when scrolling
+        document.addEventListener('DOMContentLoaded', function() {
+            const sections = document.querySelectorAll('.section');
+            
+            function checkScroll() {
+                sections.forEach(section => {
+                    const sectionTop = section.getBoundingClientRect().top;
+                    const windowHeight = window.innerHeight;
+                    
+                    if (sectionTop < windowHeight * 0.75) {
+                        section.style.opacity = '1';
+                        section.style.transform = 'translateY(0)';
+                    }
+                });
+            }
+            
+            // Set initial styles
+            sections.forEach(section => {
+                section.style.opacity = '0';
+                section.style.transform = 'translateY(50px)';
+                section.style.transition = 'opacity 1s ease, transform 1s ease';
+            });
+            
+            // Check on scroll
+            window.addEventListener('scroll', checkScroll);
+            
+            // Check on initial load
+            checkScroll();
+        });
+    </script>
+</body>
+</html>
+"""
+
+# Trailer page that plays the downloaded clips
+VIDEO_TRAILER_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Netfix App Trailer</title>
+    <style>
+        body {
+            background-color: #000;
+            color: white;
+            font-family: Arial, sans-serif;
+            margin: 0;
+            padding: 0;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+        }
+        header {
+            text-align: center;
+            margin-bottom: 40px;
+        }
+        h1 {
+            color: #E50914;
+            font-size: 48px;
+            margin: 0;
+        }
+        h2 {
+            color: #E50914;
+            font-size: 32px;
+            margin-top: 40px;
+        }
+        .category {
+            margin-bottom: 40px;
+        }
+        .video-container {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 20px;
+            margin-top: 20px;
+        }
+        .video-item {
+            width: calc(50% - 10px);
+        }
+        video {
+            width: 100%;
+            height: auto;
+            aspect-ratio: 16 / 9;
+            background-color: #141414;
+            border-radius: 5px;
+        }
+        p {
+            font-size: 18px;
+            line-height: 1.6;
+        }
+        footer {
+            text-align: center;
+            margin-top: 60px;
+            padding: 20px;
+            border-top: 1px solid #333;
+        }
+        .scene-tagline {
+            font-size: 1.2em;
+            font-style: italic;
+        }
+        .feature-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+            gap: 30px;
+            margin-top: 40px;
+        }
+        .feature-card {
+            background-color: #222;
+            border-radius: 8px;
+            padding: 30px;
+        }
+        .feature-title {
+            font-size: 24px;
+            margin-bottom: 15px;
+            color: #E50914;
+        }
+        .feature-desc {
+            font-size: 16px;
+            line-height: 1.6;
+        }
+        .cta-button {
+            display: inline-block;
+            background-color: #E50914;
+            color: white;
+            padding: 15px 30px;
+            border-radius: 5px;
+            font-size: 18px;
+            font-weight: bold;
+            text-decoration: none;
+            margin-top: 30px;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+{{scenes|raw}}
+        <footer>
+            <p>&copy; 2025 Netfix. All rights reserved.</p>
+        </footer>
+    </div>
+
+    <script>
+        // Clips start with no source at all (and preload="none"), so opening
+        // the page fetches nothing but their poster frames. A clip gets its
+        // source once it comes near the viewport, ready to play on click.
+        document.addEventListener('DOMContentLoaded', function() {
+            const videos = document.querySelectorAll('video[data-lazy]');
+
+            function attach(video) {
+                video.querySelectorAll('source[data-src]').forEach(source => {
+                    source.src = source.dataset.src;
+                    source.removeAttribute('data-src');
+                });
+                video.removeAttribute('data-lazy');
+                video.load();
+            }
+
+            if (!('IntersectionObserver' in window)) {
+                videos.forEach(attach);
+                return;
+            }
+            const observer = new IntersectionObserver((entries) => {
+                entries.forEach(entry => {
+                    if (entry.isIntersecting) {
+                        observer.unobserve(entry.target);
+                        attach(entry.target);
+                    }
+                });
+            }, {
+                rootMargin: '200px 0px'
+            });
+
+            videos.forEach(video => {
+                observer.observe(video);
+            });
+        });
+    </script>
+</body>
+</html>
+"""
+
+# Catalog browser for catalogs too big to inline (see catalog_pages.py).
+# The page carries only the genre index; titles come from JSON shards of
+# SHARD_SIZE records fetched as the grid scrolls to them, and only the
+# cards in (or just outside) the viewport exist in the DOM.
+CATALOG_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Netfix Catalog</title>
+    <style>
+        body {
+            background-color: #000;
+            color: white;
+            font-family: Arial, sans-serif;
+            margin: 0;
+            padding: 0;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+        }
+        header {
+            display: flex;
+            flex-wrap: wrap;
+            align-items: baseline;
+            justify-content: space-between;
+            gap: 20px;
+            margin-bottom: 30px;
+        }
+        h1 {
+            color: #E50914;
+            font-size: 48px;
+            margin: 0;
+        }
+        select {
+            background-color: #333;
+            color: white;
+            border: 1px solid #555;
+            border-radius: 5px;
+            padding: 8px 12px;
+            font-size: 16px;
+        }
+        .count {
+            color: #999;
+            font-size: 14px;
+        }
+        .virtual-grid {
+            position: relative;
+        }
+        .movie-card {
+            position: absolute;
+            top: 0;
+            left: 0;
+            width: 180px;
+            height: 330px;
+            background-color: #333;
+            border-radius: 5px;
+            overflow: hidden;
+        }
+        .movie-card img {
+            display: block;
+            width: 180px;
+            height: 270px;
+            object-fit: cover;
+            background-color: #222;
+        }
+        .movie-title {
+            font-size: 14px;
+            font-weight: bold;
+            padding: 8px 10px 2px;
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+        }
+        .movie-meta {
+            font-size: 12px;
+            color: #999;
+            padding: 0 10px;
+        }
+        .movie-card.loading {
+            background: linear-gradient(90deg, #222, #333, #222);
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <header>
+            <h1>NETFIX</h1>
+            <label>Genre <select id="genre">{{genre_options|raw}}
+            </select></label>
+            <span class="count" id="count"></span>
+        </header>
+        <div class="virtual-grid" id="grid"></div>
+    </div>
+
+    <script id="catalog-index" type="application/json">{{index_json|raw}}</script>
+    <script>
+        // Cards are laid out on a fixed grid, so the rows in view follow from
+        // the scroll position alone; only those (plus OVERSCAN rows either
+        // side) are in the DOM, and only their shards are fetched
+        (function() {
+            const index = JSON.parse(document.getElementById('catalog-index').textContent);
+            const grid = document.getElementById('grid');
+            const select = document.getElementById('genre');
+            const counter = document.getElementById('count');
+            const CARD_WIDTH = 180, CARD_HEIGHT = 330, GAP = 20, OVERSCAN = 2, MAX_SHARDS = 24;
+            const field = {};
+            index.fields.forEach((name, i) => { field[name] = i; });
+            const shards = new Map();
+            const cards = new Map();
+            let genre = index.genres[0];
+            let frame = 0;
+
+            // Rows of shard n of the current genre; undefined until fetched.
+            // Least recently used shards are dropped past MAX_SHARDS.
+            function shard(n) {
+                const url = index.base + genre.slug + '/' + (n * index.shard_size) + '.json';
+                if (shards.has(url)) {
+                    const rows = shards.get(url);
+                    shards.delete(url);
+                    shards.set(url, rows);
+                    return rows;
+                }
+                shards.set(url, undefined);
+                fetch(url).then(response => response.json()).then(data => {
+                    shards.set(url, data.rows);
+                    schedule();
+                }).catch(() => shards.delete(url));
+                while (shards.size > MAX_SHARDS) {
+                    shards.delete(shards.keys().next().value);
+                }
+                return undefined;
+            }
+
+            function card(row) {
+                const element = document.createElement('div');
+                element.className = 'movie-card';
+                const image = document.createElement('img');
+                image.src = index.posters + row[field.key] + '.jpg';
+                image.alt = row[field.title];
+                image.width = 180;
+                image.height = 270;
+                image.loading = 'lazy';
+                image.decoding = 'async';
+                const title = document.createElement('div');
+                title.className = 'movie-title';
+                title.textContent = row[field.title];
+                const meta = document.createElement('div');
+                meta.className = 'movie-meta';
+                meta.textContent = row[field.year] + ' • ' + row[field.genre] + ' • ' + row[field.rating] + ' ⭐';
+                element.append(image, title, meta);
+                return element;
+            }
+
+            function render() {
+                frame = 0;
+                const columns = Math.max(1, Math.floor((grid.clientWidth + GAP) / (CARD_WIDTH + GAP)));
+                const rowHeight = CARD_HEIGHT + GAP;
+                const rowCount = Math.ceil(genre.count / columns);
+                grid.style.height = Math.max(0, rowCount * rowHeight - GAP) + 'px';
+                const top = grid.getBoundingClientRect().top;
+                const firstRow = Math.max(0, Math.floor(-top / rowHeight) - OVERSCAN);
+                const lastRow = Math.min(rowCount, Math.ceil((window.innerHeight - top) / rowHeight) + OVERSCAN);
+                const first = firstRow * columns;
+                const last = Math.min(genre.count, lastRow * columns);
+
+                cards.forEach((element, i) => {
+                    if (i < first || i >= last) {
+                        element.remove();
+                        cards.delete(i);
+                    }
+                });
+                for (let i = first; i < last; i++) {
+                    let element = cards.get(i);
+                    if (!element || element.classList.contains('loading')) {
+                        const rows = shard(Math.floor(i / index.shard_size));
+                        const next = rows ? card(rows[i % index.shard_size]) : document.createElement('div');
+                        if (!rows) {
+                            next.className = 'movie-card loading';
+                        }
+                        if (element) {
+                            element.replaceWith(next);
+                        } else {
+                            grid.append(next);
+                        }
+                        element = next;
+                        cards.set(i, element);
+                    }
+                    const x = (i % columns) * (CARD_WIDTH + GAP);
+                    const y = Math.floor(i / columns) * rowHeight;
+                    element.style.transform = 'translate(' + x + 'px, ' + y + 'px)';
+                }
+            }
+
+            function schedule() {
+                if (!frame) {
+                    frame = requestAnimationFrame(render);
+                }
+            }
+
+            select.addEventListener('change', function() {
+                genre = index.genres[select.selectedIndex];
+                counter.textContent = genre.count.toLocaleString() + ' titles';
+                cards.forEach(element => element.remove());
+                cards.clear();
+                window.scrollTo(0, 0);
+                schedule();
+            });
+            window.addEventListener('scroll', schedule, { passive: true });
+            window.addEventListener('resize', schedule);
+            counter.textContent = genre.count.toLocaleString() + ' titles';
+            schedule();
+        })();
+    </script>
+</body>
+</html>
+"""
+
+GENRE_OPTION = Template("""
+                <option value="{{slug}}">{{name}} ({{count}})</option>""")
+
+FEATURE_CARD = Template("""
+                <div class="feature-card">
+                    <h3 class="feature-title">{{title}}</h3>{{desc|raw}}
+                </div>""")
+
+CATEGORY_TILE = Template("""
+                <div class="category-item">
+                    <img src="{{src}}" alt="{{name}}">
+                    <div class="category-name">{{name}}</div>
+                </div>""")
+
+MOVIE_CARD = Template("""
+                <div class="movie-card">
+                    <div class="movie-poster">
+                        <img src="{{src}}" alt="{{title}}">
+                    </div>
+                    <div class="movie-info">
+                        <div class="movie-title">{{title}}</div>
+                        <div class="movie-meta">{{year}} • {{genre}} • {{rating}} ⭐</div>
+                    </div>
+                </div>
+""")
+
+CLIP_SECTION = Template("""
+        <section class="category">
+            <h2>{{heading}}</h2>
+            <p>{{blurb}}</p>
+            <div class="video-container">{{clips|raw}}
+            </div>
+        </section>
+""")
+
+CLIP = Template("""
+                <div class="video-item">
+                    <video controls preload="none" playsinline data-lazy{{poster|raw}}>
+                        <source data-src="{{src}}" type="video/mp4">
+                        Your browser does not support the video tag.
+                    </video>
+                    <noscript><a href="{{src}}">Watch {{name}}</a></noscript>
+                </div>""")
+
+# Sections for the scenes of the trailer script (trailer_script.SceneNode):
+# title scenes open and close the page, the others show their features
+# and then the catalog block their Showcase line names
+SCENE_TITLE = Template("""
+        <header id="scene-{{number}}">
+            <h1>{{title}}</h1>
+            <p class="tagline">{{tagline}}</p>{{cta|raw}}
+        </header>
+""")
+
+SCENE_FEATURES = Template("""
+        <section id="scene-{{number}}" class="section scene">
+            <h2>{{title}}</h2>
+            <p class="scene-tagline">{{subtitle}}</p>
+
+            <div class="feature-grid">{{features|raw}}
+            </div><!-- showcase -->
+        </section>
+""")
+
+SHOWCASE_MARKER = "<!-- showcase -->"
+
+TRAILER_PAGE = Template(TRAILER_WITH_IMAGES_HTML)
+SIMPLE_TRAILER_PAGE = Template(SIMPLE_TRAILER_HTML)
+VIDEO_PAGE = Template(VIDEO_TRAILER_HTML)
+CATALOG_PAGE = Template(CATALOG_HTML)
+
+# Clip category -> (heading, blurb) on the video page
+CLIP_CATEGORIES = {
+    "action": ("Action", "Experience heart-pounding action with our extensive collection of action movies and series."),
+    "comedy": ("Comedy", "Laugh out loud with our selection of hilarious comedies that will brighten your day."),
+    "drama": ("Drama", "Immerse yourself in compelling stories with our drama collection."),
+    "scifi": ("Sci-Fi", "Explore new worlds and futuristic concepts with our sci-fi selection."),
+    "documentary": ("Documentary", "Discover fascinating facts and stories with our documentary collection."),
+}
+
+# How many titles "Trending Now" and categories "Discover Content" show
+TRENDING_TITLES = 6
+SHOWCASE_CATEGORIES = 6
+
+def feature_cards(features):
+    return "".join(FEATURE_CARD.render(title=title, desc=f'\n                    <p class="feature-desc">{escape(desc)}</p>'
+                                       if desc else "") for title, desc in features)
+
+def scene_section(node):
+    number = node.scene.number
+    if node.layout == "title":
+        # The call to action is a button rather than part of the tagline
+        cta = node.scene.call_to_action
+        tagline = " ".join(node.scene.overlays) if cta else node.subtitle
+        button = f'\n            <a href="#" class="cta-button">{escape(cta)}</a>' if cta else ""
+        return SCENE_TITLE.render(number=number, title=node.title, tagline=tagline,
+                                  cta=button)
+    return SCENE_FEATURES.render(number=number, title=node.title,
+                                 subtitle=node.subtitle, features=feature_cards(node.features))
+
+# The page body: one section per scene of graph (the trailer script's by
+# default), each followed by the page's showcases block it names. A block
+# no scene names comes after the last features section, so the page never
+# loses its catalog content to the script.
+def scene_sections(showcases, graph=None):
+    graph = graph or load_graph()
+    sections = []
+    for node in graph.nodes:
+        sections.append(scene_section(node).replace(SHOWCASE_MARKER, showcases.get(node.showcase, ""), 1))
+    named = {node.showcase for node in graph.nodes}
+    unnamed = "".join(block for name, block in showcases.items() if name not in named)
+    if unnamed:
+        last = max((i for i, node in enumerate(graph.nodes) if node.layout != "title"), default=0)
+        sections.insert(last + 1, f'\n        <section class="section">{unnamed}\n        </section>\n')
+    return "".join(sections)
+
+def _block(css_class, items):
+    return f'\n            <div class="{css_class}">{"".join(items)}\n            </div>' if items else ""
+
+# The simple page shows create_simple_trailer's flat-shape posters, kept
+# apart from the main posters so neither script overwrites the other's
+SIMPLE_POSTER_DIR = "images/simple_posters"
+
+# Card for the index-th record of the movie catalog, pointing at the
+# poster file the renderers wrote for it
+def movie_card(movie, index, directory="images/posters"):
+    src = f"{directory}/{record_key(movie, index, 'poster')}.jpg"
+    return MOVIE_CARD.render(movie, src=src)
+
+# category is a name or a catalog record ({"name", optional "id"})
+def _category_record(category):
+    return {"name": category} if isinstance(category, str) else category
+
+def category_src(category, index):
+    return f"images/categories/{record_key(_category_record(category), index, 'banner')}.jpg"
+
+def category_tile(category, index):
+    return CATEGORY_TILE.render(name=_category_record(category)["name"], src=category_src(category, index))
+
+# The trailer page's header shows the banner of this showcased category
+# (Sci-Fi in the built-in list), or of the last one when fewer are shown.
+# As a CSS background it would be found late, so the page preloads it.
+HERO_CATEGORY = 3
+
+def hero_slots(categories):
+    if not categories:
+        return {"hero_preload": "", "hero_background": ""}
+    index = min(HERO_CATEGORY, len(categories) - 1)
+    src = escape(category_src(categories[index], index))
+    return {"hero_preload": f'\n    <link rel="preload" as="image" href="{src}" fetchpriority="high">',
+            "hero_background": f", url('{src}')"}
+
+# Card markup is rendered per record and joined once, so building a page
+# costs time proportional to the records it shows. movies and categories
+# may be any iterables (streamed catalogs included); None shows them all.
+# The rest of each page comes from the trailer script (see scene_sections()).
+def trailer_page(movies, categories, trending=TRENDING_TITLES, showcase=SHOWCASE_CATEGORIES, graph=None):
+    cards = [movie_card(movie, i) for i, movie in enumerate(islice(movies, trending))]
+    shown = list(islice(categories, showcase))
+    tiles = [category_tile(category, i) for i, category in enumerate(shown)]
+    showcases = {"categories": _block("category-showcase", tiles), "trending": _block("movie-grid", cards)}
+    return TRAILER_PAGE.render(hero_slots(shown), scenes=scene_sections(showcases, graph))
+
+def simple_trailer_page(movies, trending=TRENDING_TITLES, graph=None):
+    cards = [movie_card(movie, i, SIMPLE_POSTER_DIR) for i, movie in enumerate(islice(movies, trending))]
+    showcases = {"trending": _block("movie-grid", cards)}
+    return SIMPLE_TRAILER_PAGE.render(scenes=scene_sections(showcases, graph))
+
+# Still shown for a clip until it plays: its poster frame from
+# clip_posters.py, or else the banner of the matching category
+def clip_poster(category, src):
+    frame = os.path.splitext(src)[0] + ".jpg"
+    if os.path.exists(frame):
+        return frame
+    from catalog_data import categories
+    heading = CLIP_CATEGORIES.get(category, (category.title(), ""))[0]
+    if heading in categories:
+        banner = f"images/categories/{record_key({}, categories.index(heading), 'banner')}.jpg"
+        if os.path.exists(banner):
+            return banner
+    return None
+
+def clip_block(category, name):
+    src = f"clips/{category}/{name}"
+    poster = clip_poster(category, src)
+    return CLIP.render(src=src, name=os.path.splitext(name)[0],
+                       poster=f' poster="{escape(poster)}"' if poster else "")
+
+# One section per clip category, in the order the clips list them. clips
+# are download_youtube_samples.videos records ({"category", "name"}).
+def video_page(clips, graph=None):
+    grouped = {}
+    for clip in clips:
+        grouped.setdefault(clip["category"], []).append(clip["name"])
+    sections = []
+    for category, names in grouped.items():
+        heading, blurb = CLIP_CATEGORIES.get(category, (category.title(), ""))
+        sections.append(CLIP_SECTION.render(heading=heading, blurb=blurb,
+                                            clips="".join(clip_block(category, name) for name in names)))
+    return VIDEO_PAGE.render(scenes=scene_sections({"clips": "".join(sections)}, graph))
+
+# Catalog browser page for a shard index written by catalog_pages.py. The
+# index is inlined (its size depends on the number of genres, not of
+# titles), so the page costs the same to open at 100 titles or 100,000.
+def catalog_page(index):
+    options = "".join(GENRE_OPTION.render(genre) for genre in index["genres"])
+    index_json = json.dumps(index, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    return CATALOG_PAGE.render(genre_options=options, index_json=index_json)
+
+# name -> (output file, sprite atlas name)
+PAGES = {
+    "trailer": ("netfix_trailer_with_images.html", "trailer_with_images"),
+    "simple": ("netfix_simple_trailer.html", "simple_trailer"),
+    "videos": ("netfix_trailer.html", None),
+}
+
+# A page rendered from the built-in data (for netfix-assets html)
+def default_page(name):
+    from catalog_data import categories, movie_data
+    if name == "trailer":
+        return trailer_page(movie_data, categories)
+    if name == "simple":
+        return simple_trailer_page(movie_data)
+    from download_youtube_samples import videos
+    return video_page(videos)
+
+IMG_TAG = re.compile(r'<img src="([^"]+)" alt="([^"]*)">')
+
+# Placeholders (tiny preview + colors) for every rendered image, keyed by
+# the path the pages use; written by placeholders.save_placeholders()
+PLACEHOLDER_MANIFEST = os.path.join("images", "placeholders.json")
+
+# The manifest as loaded, remembering each entry as it was so that
+# save_placeholders() writes back only the entries a run changed
+class PlaceholderManifest(dict):
+    def __init__(self, entries=()):
+        super().__init__(entries)
+        self.mark_saved()
+
+    def mark_saved(self):
+        self.loaded = {key: json.dumps(entry, sort_keys=True) for key, entry in self.items()}
+
+def load_placeholders(path=PLACEHOLDER_MANIFEST):
+    entries = read_json(path, {})
+    return PlaceholderManifest(entries if isinstance(entries, dict) else {})
+
+# The width each page lays an image out at, by image directory (see the
+# .movie-grid and .category-item rules), for the sizes attribute: with it
+# the browser picks the smallest srcset candidate that's still sharp
+IMAGE_SIZES = {
+    "images/posters": "(max-width: 440px) calc(100vw - 40px), (max-width: 1200px) 290px, 216px",
+    "images/categories": ("(max-width: 480px) calc(100vw - 40px), (max-width: 768px) calc(50vw - 30px), "
+                          "(max-width: 1200px) calc(33vw - 27px), 373px"),
+}
+IMAGE_SIZES[SIMPLE_POSTER_DIR] = IMAGE_SIZES["images/posters"]
+# <source> types in order of preference; the <img> itself gets the JPEGs
+SOURCE_TYPES = (("avif", "image/avif"), ("webp", "image/webp"))
+
+def _srcset(candidates):
+    return ", ".join(f"{path} {width}w" for width, path in candidates)
+
+# Rewrite each <img> for loading:
+#   - width/height from the manifest, so the layout doesn't jump, and the
+#     placeholder (average color + blurred-up preview) painted underneath
+#     until the real image loads over it
+#   - srcset/sizes over the derivative widths placeholders.complete()
+#     found on disk, with AVIF/WebP offered through <picture> <source>s
+#   - loading="lazy" for everything after the first eager images (the
+#     trailer pages open on a full-screen header, so none of their images
+#     are above the fold), fetchpriority="high" for those, and
+#     decoding="async" so decoding never holds up rendering
+def responsive_images(html, manifest, eager=0):
+    position = [0]
+
+    def replace(match):
+        src, alt = match.group(1), match.group(2)
+        index = position[0]
+        position[0] += 1
+        attributes = [f'src="{src}"', f'alt="{alt}"']
+        entry = manifest.get(src)
+        variants = {}
+        if entry is not None:
+            variants = entry.get("variants", {})
+            attributes.append(f'width="{entry["width"]}" height="{entry["height"]}"')
+        sizes = IMAGE_SIZES.get(os.path.dirname(src), "100vw")
+        if variants.get("jpeg"):
+            attributes.append(f'srcset="{_srcset(variants["jpeg"])}" sizes="{sizes}"')
+        attributes.append('fetchpriority="high"' if index < eager else 'loading="lazy"')
+        attributes.append('decoding="async"')
+        if entry is not None:
+            attributes.append(f"style=\"background: {entry['average']} url('{entry['lqip']}') center / cover "
+                              "no-repeat\"")
+        image = f"<img {' '.join(attributes)}>"
+
+        sources = [f'<source type="{mime}" srcset="{_srcset(variants[fmt])}" sizes="{sizes}">'
+                   for fmt, mime in SOURCE_TYPES if variants.get(fmt)]
+        if sources:
+            return "<picture>" + "".join(sources) + image + "</picture>"
+        return image
+
+    return IMG_TAG.sub(replace, html)
+
+# Encodings written next to each page for servers that send precompressed
+# files as is (nginx gzip_static/brotli_static, Caddy precompressed): the
+# page at the strongest settings, once, at build time. Brotli needs the
+# brotli package; without it only .gz is written.
+def precompressed(data):
+    siblings = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        siblings[".br"] = brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+    return siblings
+
+def _read_bytes(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+# Digest of everything write_page() makes a page from: the markup, the
+# options, and the placeholder entry and file stamp of each image it
+# shows (a re-rendered image changes its sprite sheet and srcset)
+def page_key(html, atlas_name, placeholders, minify, extensions):
+    images = {}
+    for src, _ in IMG_TAG.findall(html):
+        try:
+            stat = os.stat(src)
+            stamp = [stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            stamp = None
+        images[src] = [(placeholders or {}).get(src), stamp]
+    payload = json.dumps([html, atlas_name, minify, extensions, images], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+# Write a page, optionally serving its <img>s from sprite sheets packed
+# into images/atlas/<atlas_name>_sheet_N.jpg, and marking the rest up
+# with their sizes, derivatives and placeholders from the manifest. The
+# page is minified and written with .gz/.br siblings unless
+# minify/compress are off. With scenes (the trailer_script.SceneManifest
+# the page was rendered with), a page whose scenes, images and options
+# are all as they were last time isn't processed at all. Returns False
+# if the files already had this content.
+def write_page(html, path, atlas_name=None, placeholders=None, minify=True, compress=True, scenes=None):
+    extensions = []
+    if compress:
+        extensions = [".gz", ".br"] if brotli is not None else [".gz"]
+    if scenes is not None:
+        key = page_key(html, atlas_name, placeholders, minify, extensions)
+        if scenes.page_current(path, key) and all(os.path.exists(path + ext) for ext in [""] + extensions):
+            count("html_unchanged")
+            return False
+    written = _write_page(html, path, atlas_name, placeholders, minify, extensions)
+    if scenes is not None:
+        scenes.record_page(path, key)
+        scenes.save()
+    return written
+
+def _write_page(html, path, atlas_name, placeholders, minify, extensions):
+    if atlas_name:
+        from atlas import build_atlas, html_image_paths, spritify_html, thumbnail_width
+        entries = [(src, thumbnail_width(src)) for src in html_image_paths(html)]
+        atlas_map = build_atlas(entries, atlas_name)
+        html = spritify_html(html, atlas_map)
+        print(f"Packed {len(entries)} images into {len(atlas_map['sheets'])} sprite sheet(s)")
+    html = responsive_images(html, placeholders or {})
+    if minify:
+        with timed("html_minify"):
+            html = minify_html(html)
+    data = html.encode("utf-8")
+
+    # Leave the files (and their mtimes) alone when nothing in them changed
+    if _read_bytes(path) == data and all(os.path.exists(path + ext) for ext in extensions):
+        count("html_unchanged")
+        return False
+    with timed("html_write"), open(path, "wb") as f:
+        f.write(data)
+    siblings = {}
+    if extensions:
+        with timed("html_compress"):
+            siblings = precompressed(data)
+        for ext, compressed in siblings.items():
+            with open(path + ext, "wb") as f:
+                f.write(compressed)
+    # A stale sibling would be served in place of the new page
+    for ext in (".gz", ".br"):
+        if ext not in siblings and os.path.exists(path + ext):
+            os.remove(path + ext)
+    return True
+
+# Most a page should make a browser fetch on open: the page itself
+# (compressed) plus everything it doesn't defer
+PAGE_BUDGET_KB = 500
+
+ASSET_REFERENCE = re.compile(r"<(img|video|source|link)\b([^>]*)>|url\('([^')]+)'\)", re.IGNORECASE)
+ATTRIBUTE = re.compile(r'([\w-]+)(?:="([^"]*)")?')
+
+# Bytes of the files a written page references, split by when a browser
+# fetches them ({path: bytes} each):
+#   initial   the page (its .gz when there is one), CSS backgrounds and
+#             preloads, <img>s that aren't lazy, video posters, and clips
+#             whose <video> may preload
+#   deferred  lazy <img>s and clips that load only near the viewport or
+#             on play
+#   missing   referenced but not on disk, so not counted
+# An <img> is counted at its src; with a srcset most browsers fetch less.
+def page_weight(path):
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    page = path + ".gz" if os.path.exists(path + ".gz") else path
+    weight = {"initial": {path: os.path.getsize(page)}, "deferred": {}, "missing": {}}
+
+    def add(src, when):
+        if not src or src.startswith(("data:", "http:", "https:", "//")):
+            return
+        if not os.path.exists(src):
+            weight["missing"][src] = 0
+        elif src not in weight["initial"]:
+            weight[when][src] = os.path.getsize(src)
+            if when == "initial":
+                weight["deferred"].pop(src, None)
+
+    video_preloads = True
+    for match in ASSET_REFERENCE.finditer(html):
+        if match.group(3):
+            add(match.group(3), "initial")
+            continue
+        tag = match.group(1).lower()
+        attributes = {name.lower(): value for name, value in ATTRIBUTE.findall(match.group(2))}
+        if tag == "img":
+            add(attributes.get("src"), "deferred" if attributes.get("loading") == "lazy" else "initial")
+        elif tag == "video":
+            video_preloads = attributes.get("preload") != "none"
+            add(attributes.get("poster"), "initial")
+        elif tag == "source":
+            add(attributes.get("data-src"), "deferred")
+            add(attributes.get("src"), "initial" if video_preloads else "deferred")
+        elif tag == "link" and attributes.get("rel") == "preload":
+            add(attributes.get("href"), "initial")
+    return weight
+
+# One line per page: what opening it costs against budget_kb
+def budget_report(path, budget_kb=PAGE_BUDGET_KB):
+    weight = page_weight(path)
+    initial = sum(weight["initial"].values())
+    deferred = sum(weight["deferred"].values())
+    status = "within budget" if initial <= budget_kb * 1024 else "OVER BUDGET"
+    line = (f"{path}: {initial / 1024:,.1f} KB on open ({len(weight['initial'])} file(s)), "
+            f"{deferred / 1024:,.1f} KB deferred ({len(weight['deferred'])} file(s)); "
+            f"{status} ({budget_kb:,} KB)")
+    if weight["missing"]:
+        line += f"; {len(weight['missing'])} referenced file(s) missing"
+    return line
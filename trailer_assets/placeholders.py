@@ -0,0 +1,123 @@
+import base64
+import json
+import os
+from io import BytesIO
+import numpy as np
+from PIL import Image
+from derivatives import FORMAT_OPTIONS, LADDER, derivative_path, ladder_width
+from file_lock import merge_save
+from pages import PLACEHOLDER_MANIFEST
+
+# Tiny stand-ins for a poster/banner that can be inlined into a page (or
+# shipped to the app) and painted before the real image arrives (the
+# manifest also lists each image's derivatives, see variants()):
+#   lqip     - ~16px wide JPEG as a data: URI, stretched and blurred by the browser
+#   average  - mean color, e.g. for a plain background while loading
+#   dominant - most common color (4 bits per channel buckets)
+LQIP_WIDTH = 16
+LQIP_QUALITY = 40
+# Colors are computed on a copy about this wide rather than full size
+SAMPLE_WIDTH = 32
+
+def _hex(color):
+    return "#" + "".join(f"{int(round(c)):02x}" for c in color)
+
+def _scaled(image, width):
+    height = max(1, round(image.height * width / image.width))
+    return image.convert("RGB").resize((width, height), Image.BOX, reducing_gap=2.0)
+
+# Mean and most common color of an image, vectorized over a small copy
+def colors(image):
+    pixels = np.asarray(_scaled(image, SAMPLE_WIDTH), dtype=np.uint8).reshape(-1, 3)
+    average = pixels.mean(axis=0)
+
+    # Bucket by the top 4 bits of each channel, take the fullest bucket and
+    # report its mean so the color isn't snapped to the bucket corner
+    buckets = pixels >> 4
+    index = (buckets[:, 0].astype(np.int32) << 8) | (buckets[:, 1].astype(np.int32) << 4) | buckets[:, 2]
+    top = np.bincount(index, minlength=4096).argmax()
+    dominant = pixels[index == top].mean(axis=0)
+    return _hex(average), _hex(dominant)
+
+def lqip(image, width=LQIP_WIDTH, quality=LQIP_QUALITY):
+    buffer = BytesIO()
+    _scaled(image, width).save(buffer, "JPEG", quality=quality, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+# Manifest entry for one rendered image
+def placeholder(image):
+    average, dominant = colors(image)
+    return {
+        "width": image.width,
+        "height": image.height,
+        "lqip": lqip(image),
+        "average": average,
+        "dominant": dominant,
+    }
+
+# Same, for an image already on disk (draft() keeps the JPEG decode small)
+def placeholder_from_file(path):
+    with Image.open(path) as image:
+        size = image.size
+        image.draft("RGB", (SAMPLE_WIDTH * 2, SAMPLE_WIDTH * 2 * image.height // image.width))
+        entry = placeholder(image.convert("RGB"))
+    entry["width"], entry["height"] = size
+    return entry
+
+# Manifest key for an output path: the path as the pages reference it
+def manifest_key(path):
+    return os.path.normpath(path).replace(os.sep, "/")
+
+# Derivatives of an image on disk (derivatives.build_derivatives()) by
+# format, as [[width, path], ...] for the pages' srcset, e.g.
+#   {"jpeg": [[185, "images/posters/w185/movie_1.jpg"], ..., [600, "images/posters/movie_1.jpg"]],
+#    "webp": [[185, "images/posters/w185/movie_1.webp"], ...]}
+# Ladder steps wider than the master aren't upscaled, so they are listed
+# at the master's width. Empty when there's nothing but the master.
+def variants(path, master_width):
+    found = {}
+    for label in LADDER:
+        width = ladder_width(label)
+        width = master_width if width is None else min(width, master_width)
+        for fmt in FORMAT_OPTIONS:
+            if label == "original" and fmt == "jpeg":
+                candidate = path
+            else:
+                candidate = derivative_path(path, label, fmt)
+            if os.path.exists(candidate):
+                found.setdefault(fmt, {})[width] = manifest_key(candidate)
+    if sum(len(widths) for widths in found.values()) <= 1:
+        return {}
+    return {fmt: [[width, widths[width]] for width in sorted(widths)] for fmt, widths in found.items()}
+
+# Fill in entries for images that exist but have none (e.g. skipped by
+# the render cache on the first run after placeholders were added),
+# refresh the derivatives listed for them, and drop entries whose image
+# is gone
+def complete(manifest, paths=()):
+    for path in paths:
+        key = manifest_key(path)
+        if not os.path.exists(path):
+            continue
+        if key not in manifest:
+            manifest[key] = placeholder_from_file(path)
+        found = variants(path, manifest[key]["width"])
+        if found:
+            manifest[key]["variants"] = found
+        else:
+            manifest[key].pop("variants", None)
+    for key in [key for key in manifest if not os.path.exists(key)]:
+        del manifest[key]
+    return manifest
+
+# Only the entries changed since manifest was loaded (all of them for a
+# plain dict) are written, merged with what other processes saved
+# meanwhile (see file_lock)
+def save_placeholders(manifest, path=PLACEHOLDER_MANIFEST):
+    loaded = getattr(manifest, "loaded", {})
+    changes = {key: entry for key, entry in manifest.items()
+               if json.dumps(entry, sort_keys=True) != loaded.get(key)}
+    removed = [key for key in loaded if key not in manifest]
+    merge_save(path, changes, removed, indent=2, sort_keys=True)
+    if hasattr(manifest, "mark_saved"):
+        manifest.mark_saved()
@@ -0,0 +1,209 @@
+import argparse
+import asyncio
+from collections import OrderedDict
+from http import HTTPStatus
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+from create_trailer_images import (
+    BANNER_SIZE, POSTER_SIZE, RENDERER_NAME, RENDERER_VERSION, categories, movie_data
+)
+from derivatives import available_formats
+from render_cache import input_key
+from render_stream import render_record
+
+CONTENT_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp", "avif": "image/avif"}
+MIN_WIDTH = 16
+
+# LRU of encoded images bounded by total bytes rather than entry count
+class ByteLRU:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.items = OrderedDict()
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        if key in self.items:
+            self.size -= len(self.items.pop(key))
+        self.items[key] = value
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, evicted = self.items.popitem(last=False)
+            self.size -= len(evicted)
+
+# Renders posters/banners on request, caching encoded bytes and sharing
+# one render between concurrent requests for the same image
+class PosterService:
+    def __init__(self, movies, banners, workers=None, cache_bytes=64 * 1024 * 1024):
+        self.catalog = {
+            "poster": {f"movie_{i+1}": movie for i, movie in enumerate(movies)},
+            "banner": {f"category_{i+1}": {"name": name} for i, name in enumerate(banners)},
+        }
+        self.formats = available_formats()
+        self.cache = ByteLRU(cache_bytes)
+        self.in_flight = {}
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.stats = {"requests": 0, "hits": 0, "renders": 0, "coalesced": 0, "not_modified": 0, "errors": 0}
+
+    # Accept "3" as well as "movie_3"/"category_3"
+    def lookup(self, kind, item_id):
+        items = self.catalog[kind]
+        if item_id.isdigit():
+            item_id = f"{'movie' if kind == 'poster' else 'category'}_{item_id}"
+        return item_id, items.get(item_id)
+
+    # ETag derived from the render inputs, so a matching If-None-Match can
+    # be answered without rendering or even touching the cache
+    def etag(self, kind, key, record, width, fmt):
+        digest = input_key(renderer=RENDERER_NAME, version=RENDERER_VERSION, kind=kind,
+                           key=key, record=record, width=width, format=fmt)
+        return f'"{digest[:32]}"'
+
+    async def render(self, kind, key, record, width, fmt, etag):
+        data = self.cache.get(etag)
+        if data is not None:
+            self.stats["hits"] += 1
+            return data
+
+        # Someone is already rendering this exact image: wait for theirs.
+        # shield() keeps one client disconnecting from cancelling the
+        # render everyone else is waiting on.
+        task = self.in_flight.get(etag)
+        if task is None:
+            task = asyncio.ensure_future(self._render_and_cache(kind, key, record, width, fmt, etag))
+            self.in_flight[etag] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(etag, None))
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    async def _render_and_cache(self, kind, key, record, width, fmt, etag):
+        loop = asyncio.get_running_loop()
+        _, data, _ = await loop.run_in_executor(
+            self.executor, render_record, kind, key, record, fmt, width)
+        self.stats["renders"] += 1
+        self.cache.put(etag, data)
+        return data
+
+    # Returns (status, headers, body)
+    async def handle(self, method, target, headers):
+        self.stats["requests"] += 1
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.split("/") if p]
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD"}, b"method not allowed\n"
+        if len(parts) != 2 or parts[0] not in self.catalog:
+            return 404, {}, b"not found\n"
+
+        kind = parts[0]
+        key, record = self.lookup(kind, parts[1])
+        if record is None:
+            return 404, {}, b"unknown id\n"
+
+        query = parse_qs(url.query)
+        fmt = query.get("fmt", ["jpeg"])[0].lower()
+        fmt = "jpeg" if fmt == "jpg" else fmt
+        if fmt not in self.formats:
+            return 400, {}, f"unsupported fmt, use one of {', '.join(self.formats)}\n".encode()
+
+        full_width = (POSTER_SIZE if kind == "poster" else BANNER_SIZE)[0]
+        try:
+            width = int(query.get("w", [full_width])[0])
+        except ValueError:
+            return 400, {}, b"w must be an integer\n"
+        width = max(MIN_WIDTH, min(width, full_width))
+
+        etag = self.etag(kind, key, record, width, fmt)
+        response_headers = {
+            "Content-Type": CONTENT_TYPES[fmt],
+            "ETag": etag,
+            "Cache-Control": "public, max-age=86400",
+        }
+        if_none_match = headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            self.stats["not_modified"] += 1
+            return 304, response_headers, b""
+
+        # A failed render is answered with a 500 for this request and everyone
+        # coalesced onto it, and forgotten so the next request tries again
+        try:
+            data = await self.render(kind, key, record, width, fmt, etag)
+        except Exception as e:
+            self.in_flight.pop(etag, None)
+            self.stats["errors"] += 1
+            print(f"Render of {kind} {key} (w={width}, fmt={fmt}) failed: {e!r}")
+            return 500, {}, b"render failed\n"
+        return 200, response_headers, data
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                status, response_headers, body = await self.handle(method, target, headers)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                reason = HTTPStatus(status).phrase
+                response_headers["Content-Length"] = str(0 if status == 304 else len(body))
+                response_headers["Connection"] = "keep-alive" if keep_alive else "close"
+                head = f"HTTP/1.1 {status} {reason}\r\n" + "".join(
+                    f"{name}: {value}\r\n" for name, value in response_headers.items()) + "\r\n"
+                writer.write(head.encode("latin-1"))
+                if method != "HEAD" and status != 304:
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host, port, service):
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"Serving posters on http://{host}:{port}/poster/1?w=342&fmt=webp")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Render Netfix posters and banners on demand over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="render processes (default: one per CPU core)")
+    parser.add_argument("--cache-mb", type=float, default=64,
+                        help="size of the in-memory cache of encoded images")
+    args = parser.parse_args()
+
+    service = PosterService(movie_data, categories, args.workers, int(args.cache_mb * 1024 * 1024))
+    try:
+        asyncio.run(serve(args.host, args.port, service))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.executor.shutdown()
+        print(f"Stats: {service.stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+from file_lock import merge_save, read_json
+
+# Default location of the manifest shared by the image generators
+MANIFEST_PATH = os.path.join('images', '.render_manifest.json')
+
+# Hash everything that affects the pixels of one rendered item
+def input_key(**inputs):
+    payload = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# Persistent record of which inputs produced which output file, so a
+# rebuild only re-renders items whose inputs changed
+class RenderCache:
+    def __init__(self, manifest_path=MANIFEST_PATH, force=False):
+        self.manifest_path = manifest_path
+        self.force = force
+        self.entries = {}
+        self.skipped = 0
+        self.rendered = 0
+        self.pruned = 0
+        self._seen = set()
+        # Entries recorded or pruned since the last save, the only ones
+        # save() writes back
+        self._recorded = set()
+        self._pruned = set()
+
+        # A corrupt manifest just means everything gets rebuilt
+        self.entries = read_json(manifest_path, {}).get("entries", {})
+
+    # True if the output (and any files derived from it) exists and was
+    # produced from exactly these inputs
+    def is_fresh(self, output_path, key):
+        self._seen.add(output_path)
+        entry = self.entries.get(output_path)
+        if not entry or self.force or entry["key"] != key:
+            return False
+        outputs = [output_path] + entry.get("extra_outputs", [])
+        if not all(os.path.exists(path) for path in outputs):
+            return False
+        self.skipped += 1
+        return True
+
+    # Remember that output_path (plus extra_outputs, such as resized copies)
+    # was rendered from the inputs hashed into key
+    def record(self, output_path, key, owner, extra_outputs=()):
+        self._seen.add(output_path)
+        entry = {"key": key, "owner": owner}
+        if extra_outputs:
+            entry["extra_outputs"] = list(extra_outputs)
+
+        # Files the previous render produced but this one didn't are stale
+        previous = self.entries.get(output_path, {})
+        for path in set(previous.get("extra_outputs", [])) - set(extra_outputs):
+            if os.path.exists(path):
+                os.remove(path)
+
+        self.entries[output_path] = entry
+        self._recorded.add(output_path)
+        self._pruned.discard(output_path)
+        self.rendered += 1
+
+    # Delete outputs this owner produced earlier that are no longer part of
+    # the current build (e.g. a catalog shrank from 12 titles to 6)
+    def prune(self, owner, directory):
+        for output_path in list(self.entries):
+            entry = self.entries[output_path]
+            if entry.get("owner") != owner or output_path in self._seen:
+                continue
+            if os.path.dirname(output_path) != os.path.normpath(directory):
+                continue
+            for path in [output_path] + entry.get("extra_outputs", []):
+                if os.path.exists(path):
+                    os.remove(path)
+            del self.entries[output_path]
+            self._pruned.add(output_path)
+            self._recorded.discard(output_path)
+            self.pruned += 1
+
+    # Write this run's entries into the manifest, atomically and merged
+    # with what other processes (e.g. the build rendering posters and
+    # banners at once) saved since it was read
+    def save(self):
+        changes = {path: self.entries[path] for path in self._recorded}
+        self.entries = merge_save(self.manifest_path, changes, self._pruned, "entries", indent=2, sort_keys=True)
+        self._recorded, self._pruned = set(), set()
+
+    def summary(self):
+        return f"{self.rendered} rendered, {self.skipped} unchanged, {self.pruned} pruned"
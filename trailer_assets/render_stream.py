@@ -0,0 +1,84 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from catalog_data import record_key
+from create_trailer_images import item_seed, render_category_banner, render_movie_poster
+from derivatives import FORMAT_OPTIONS, scale_to_width
+from encoder import encode_image
+
+# Render, optionally resize, and encode one record into bytes
+def render_record(kind, key, record, fmt="jpeg", width=None, encoding=None, base_seed=0):
+    seed = item_seed(kind if kind == "poster" else "banner", f"{key}.jpg", base_seed)
+    if kind == "poster":
+        image = render_movie_poster(record["title"], record["genre"], record["year"],
+                                    record["rating"], seed=seed)
+    else:
+        image = render_category_banner(record.get("name", record.get("title")), seed=seed)
+
+    if width:
+        image = scale_to_width(image, width)
+
+    quality = None
+    if encoding is not None and fmt in ("jpeg", "webp"):
+        result = encode_image(image, fmt, encoding)
+        data, quality = result.data, result.quality
+    else:
+        buffer = BytesIO()
+        if fmt == "jpeg":
+            # Same bytes as image.save("....jpg") in the file pipeline
+            image.save(buffer, "JPEG")
+        else:
+            image.save(buffer, fmt.upper(), **FORMAT_OPTIONS[fmt][1])
+        data = buffer.getvalue()
+
+    metadata = {
+        "kind": kind,
+        "format": fmt,
+        "width": image.width,
+        "height": image.height,
+        "bytes": len(data),
+        "quality": quality,
+        "seed": seed,
+    }
+    return key, data, metadata
+
+def _render_job(job):
+    return render_record(*job)
+
+# Yield (key, encoded_bytes, metadata) for every record without touching
+# disk. kind is "poster" (records need title/genre/year/rating) or
+# "banner" (records need name, or are plain strings). With workers > 1,
+# renders run in a process pool, at most workers * 2 ahead of the
+# consumer, and are still yielded in input order. For example, to fill a
+# zip archive:
+#
+#     with zipfile.ZipFile("posters.zip", "w") as archive:
+#         for key, data, meta in render_stream(movie_data, fmt="webp", width=342):
+#             archive.writestr(f"{key}.webp", data)
+def render_stream(records, kind="poster", fmt="jpeg", width=None, encoding=None,
+                  base_seed=0, workers=1):
+    if kind not in ("poster", "banner"):
+        raise ValueError(f"Unknown render kind: {kind}")
+    if fmt not in FORMAT_OPTIONS:
+        raise ValueError(f"Unknown image format: {fmt}")
+
+    # Banner records may be bare category names, as in categories
+    records = ({"name": r} if isinstance(r, str) else r for r in records)
+    jobs = (
+        (kind, record_key(record, i, kind), record, fmt, width, encoding, base_seed)
+        for i, record in enumerate(records)
+    )
+
+    if workers <= 1:
+        for job in jobs:
+            yield _render_job(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for job in jobs:
+            pending.append(executor.submit(_render_job, job))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,247 @@
+import argparse
+import gzip
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from xml.sax.saxutils import escape, quoteattr
+from background_engine import CIRCLE, RECTANGLE, banner_background, poster_background
+from create_trailer_images import BANNER_SIZE, CATEGORY_COLORS, POSTER_SIZE, item_seed
+from instrumentation import collect, count, merge, report as report_metrics, reset, timed
+from render_cache import RenderCache, input_key
+from render_stream import record_key
+from text_layout import fit_text
+
+# Vector versions of the posters and banners: the same seed-driven shapes
+# and text as create_trailer_images.py, written as SVG markup (a couple of
+# KB each) instead of rasterized JPEGs. Text is laid out with the same
+# font metrics so it wraps the same way, and rendered by the viewer in
+# FONT_FAMILY.
+RENDERER_NAME = "svg_render"
+RENDERER_VERSION = 1
+FONT_FAMILY = "Arial, 'Liberation Sans', Arimo, Helvetica, sans-serif"
+WATERMARK_COLOR = (229, 9, 20)
+# Records read from the catalog per round of rendering
+BATCH_SIZE = 512
+
+def _color(rgb):
+    return "#{:02x}{:02x}{:02x}".format(*(int(c) for c in rgb))
+
+def _num(value):
+    return f"{float(value):g}"
+
+# One element per shape, matching background_engine.composite(): rectangles
+# cover their corner pixels inclusively, lines get round caps
+def shape_elements(shapes):
+    elements = []
+    for kind, geom, stroke, color in zip(shapes.kind, shapes.geom, shapes.width, shapes.color):
+        fill = _color(color[:3])
+        opacity = f"{color[3] / 255:.3f}"
+        if kind == RECTANGLE:
+            x1, y1, x2, y2 = geom
+            elements.append(f'<rect x="{_num(x1)}" y="{_num(y1)}" width="{_num(x2 - x1 + 1)}" '
+                            f'height="{_num(y2 - y1 + 1)}" fill="{fill}" fill-opacity="{opacity}"/>')
+        elif kind == CIRCLE:
+            cx, cy, r, _ = geom
+            elements.append(f'<circle cx="{_num(cx)}" cy="{_num(cy)}" r="{_num(r)}" '
+                            f'fill="{fill}" fill-opacity="{opacity}"/>')
+        else:
+            x1, y1, x2, y2 = geom
+            elements.append(f'<line x1="{_num(x1)}" y1="{_num(y1)}" x2="{_num(x2)}" y2="{_num(y2)}" '
+                            f'stroke="{fill}" stroke-opacity="{opacity}" stroke-width="{_num(stroke)}" '
+                            f'stroke-linecap="round"/>')
+    return elements
+
+# <text> centered on (x, y), with a black copy underneath for the shadow
+def text_elements(xy, text, size, fill, shadow_offset=0):
+    x, y = xy
+    elements = []
+    if shadow_offset:
+        elements.append(f'<text x="{x + shadow_offset}" y="{y + shadow_offset}" font-size="{size}" '
+                        f'fill="#000000">{escape(text)}</text>')
+    elements.append(f'<text x="{x}" y="{y}" font-size="{size}" fill="{_color(fill)}">{escape(text)}</text>')
+    return elements
+
+# Same line placement as text_layout.draw_layout()
+def layout_elements(xy, layout, fill, shadow_offset=0):
+    x, y = xy
+    first_y = y - layout.line_height * (len(layout.lines) - 1) // 2
+    elements = []
+    for i, line in enumerate(layout.lines):
+        elements += text_elements((x, first_y + i * layout.line_height), line, layout.size, fill, shadow_offset)
+    return elements
+
+def svg_document(size, bg_color, elements, title=None):
+    width, height = size
+    head = (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">')
+    if title:
+        head += f"<title>{escape(title)}</title>"
+    return "\n".join([
+        head,
+        f'<rect width="{width}" height="{height}" fill="{_color(bg_color)}"/>',
+        *elements,
+        "</svg>",
+    ]) + "\n"
+
+# SVG markup for a movie poster, the vector twin of render_movie_poster()
+def poster_svg(title, genre, year, rating, seed=None):
+    width, height = POSTER_SIZE
+    with timed("shape_draw"):
+        bg_color, shapes = poster_background(seed, POSTER_SIZE, count=5)
+        elements = shape_elements(shapes)
+
+    with timed("text_draw"):
+        layout = fit_text(title, width - 80, 120, 48, min_size=20)
+        text = layout_elements((width // 2, height - 200), layout, (255, 255, 255), shadow_offset=2)
+        text += text_elements((width // 2, height - 120), f"{genre} • {year} • {rating}★", 24, (200, 200, 200))
+        text += text_elements((width // 2, 50), "NETFIX", 48, WATERMARK_COLOR)
+    return svg_document(POSTER_SIZE, bg_color, elements + [_text_group(text)], title)
+
+# SVG markup for a category banner, the vector twin of render_category_banner()
+def banner_svg(category_name, seed=None):
+    width, height = BANNER_SIZE
+    with timed("shape_draw"):
+        bg_color, shapes = banner_background(seed, BANNER_SIZE, CATEGORY_COLORS.get(category_name), count=10)
+        elements = shape_elements(shapes)
+
+    with timed("text_draw"):
+        layout = fit_text(category_name, width - 160, 320, 120, min_size=32, max_lines=2)
+        text = layout_elements((width // 2, height // 2), layout, (255, 255, 255), shadow_offset=4)
+        text += text_elements((width - 100, height - 50), "NETFIX", 36, WATERMARK_COLOR)
+    return svg_document(BANNER_SIZE, bg_color, elements + [_text_group(text)], category_name)
+
+# Text shares one set of font attributes instead of repeating them per element
+def _text_group(elements):
+    return (f'<g font-family={quoteattr(FONT_FAMILY)} text-anchor="middle" dominant-baseline="central">'
+            + "".join(elements) + "</g>")
+
+# Write markup as .svg, or gzipped as .svgz when compress is set (mtime is
+# left out of the gzip header so unchanged inputs give identical files)
+def write_svg(path, markup, compress=False):
+    data = markup.encode("utf-8")
+    if compress:
+        data = gzip.compress(data, compresslevel=9, mtime=0)
+    with timed("file_write"), open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+# Same inputs as create_trailer_images.create_movie_poster(); filename is
+# the .jpg name the raster poster would get, so both share a seed
+def create_movie_poster(title, genre, year, rating, filename, seed=None, compress=False):
+    path = os.path.join("images", "posters", _svg_name(filename, compress))
+    write_svg(path, poster_svg(title, genre, year, rating, seed), compress)
+    count("posters_rendered")
+    return path
+
+def create_category_banner(category_name, filename, seed=None, compress=False):
+    path = os.path.join("images", "categories", _svg_name(filename, compress))
+    write_svg(path, banner_svg(category_name, seed), compress)
+    count("banners_rendered")
+    return path
+
+def _svg_name(filename, compress):
+    return os.path.splitext(filename)[0] + (".svgz" if compress else ".svg")
+
+# Worker entry point: (kind, record, filename, seed, compress) -> path
+def _render_svg_job(job):
+    kind, record, filename, seed, compress = job
+    if kind == "poster":
+        return create_movie_poster(record["title"], record["genre"], record["year"], record["rating"],
+                                   filename, seed, compress)
+    return create_category_banner(record["name"], filename, seed, compress)
+
+# Render posters (kind="poster") or banners from records. Seeds and file
+# names follow create_trailer_images.py / catalog.py. Records are taken
+# BATCH_SIZE at a time, so a streamed catalog is never held in memory;
+# with workers > 1 each batch is spread across a process pool (fitting
+# the title text dominates, so this scales with cores). Returns the paths
+# written.
+def render_svgs(records, kind="poster", base_seed=0, cache=None, compress=False, workers=1):
+    output_dir = os.path.join("images", "posters" if kind == "poster" else "categories")
+    os.makedirs(output_dir, exist_ok=True)
+    if workers is None or workers < 1:
+        workers = os.cpu_count() or 1
+
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=reset)
+    written = []
+    try:
+        records = iter(records)
+        index = 0
+        while True:
+            batch = list(itertools.islice(records, BATCH_SIZE))
+            if not batch:
+                break
+            jobs, keys = [], []
+            for record in batch:
+                if isinstance(record, str):
+                    record = {"name": record}
+                filename = f"{record_key(record, index, kind)}.jpg"
+                index += 1
+                seed = item_seed(kind, filename, base_seed)
+                output_path = os.path.join(output_dir, _svg_name(filename, compress))
+                key = input_key(renderer=RENDERER_NAME, version=RENDERER_VERSION, kind=kind, seed=seed,
+                                compress=compress, **record)
+                if cache is not None and cache.is_fresh(output_path, key):
+                    continue
+                jobs.append((kind, record, filename, seed, compress))
+                keys.append((output_path, key))
+
+            if executor is None:
+                paths = [_render_svg_job(job) for job in jobs]
+            else:
+                paths = []
+                for path, metrics in executor.map(partial(collect, _render_svg_job), jobs,
+                                                  chunksize=max(1, len(jobs) // (workers * 4))):
+                    merge(metrics)
+                    paths.append(path)
+            written += paths
+            if cache is not None:
+                for output_path, key in keys:
+                    cache.record(output_path, key, RENDERER_NAME)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if cache is not None:
+        cache.prune(RENDERER_NAME, output_dir)
+    return written
+
+def main():
+    from catalog import CatalogError, iter_catalog
+    from create_trailer_images import categories, movie_data
+
+    parser = argparse.ArgumentParser(description="Write the Netfix posters and banners as SVG")
+    parser.add_argument("--svgz", action="store_true", help="write gzipped .svgz files instead of .svg")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of render processes (0 = one per CPU core)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="base seed for the per-item random shapes")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render every image even if its inputs are unchanged")
+    parser.add_argument("--catalog", default=None,
+                        help="stream movies from a CSV/JSONL file ('-' for stdin) instead of movie_data")
+    parser.add_argument("--categories", default=None,
+                        help="stream category names from a CSV/JSONL file instead of categories")
+    parser.add_argument("--strict", action="store_true",
+                        help="stop at the first invalid catalog record instead of skipping it")
+    args = parser.parse_args()
+
+    cache = RenderCache(force=args.force)
+    movies = iter_catalog(args.catalog, "poster", strict=args.strict) if args.catalog else movie_data
+    names = iter_catalog(args.categories, "banner", strict=args.strict) if args.categories else categories
+    try:
+        posters = render_svgs(movies, "poster", args.seed, cache, args.svgz, args.workers)
+        banners = render_svgs(names, "banner", args.seed, cache, args.svgz, args.workers)
+    except CatalogError as e:
+        parser.exit(1, f"Invalid catalog: {e}\n")
+    finally:
+        cache.save()
+    print(f"Wrote {len(posters)} poster(s) and {len(banners)} banner(s)")
+    print(f"Render cache: {cache.summary()}")
+    report_metrics(RENDERER_NAME)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import re
+from html import escape
+
+# Minimal templates for the pages. "{{name}}" is replaced with the value
+# HTML-escaped, "{{name|raw}}" with the value as is (markup rendered by
+# another template). A template is split into literal text and slots once,
+# when it's created; rendering a record is then one pass over that list,
+# with no parsing or regex work per card.
+SLOT = re.compile(r"\{\{\s*(\w+)(\|raw)?\s*\}\}")
+
+class Template:
+    def __init__(self, text):
+        # Literal strings alternate with (name, raw) slots
+        self.parts = []
+        position = 0
+        for match in SLOT.finditer(text):
+            self.parts.append(text[position:match.start()])
+            self.parts.append((match.group(1), bool(match.group(2))))
+            position = match.end()
+        self.parts.append(text[position:])
+        self.names = {part[0] for part in self.parts if isinstance(part, tuple)}
+
+    # values is a record (dict) and/or keyword arguments; every slot must
+    # be given a value
+    def render(self, values=None, **extra):
+        if values:
+            extra = dict(values, **extra)
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+            else:
+                name, raw = part
+                value = extra[name]
+                out.append(value if raw else _escape(str(value)))
+        return "".join(out)
+
+# Attributes in the templates are always double-quoted, so ' can stay as is
+def _escape(text):
+    return escape(text, quote=False).replace('"', "&quot;")
+
+# Blocks whose whitespace matters (or that have their own minifier)
+PROTECTED = re.compile(r"(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2>)", re.IGNORECASE | re.DOTALL)
+HTML_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+# Whitespace that only indents the markup: a run with a line break in it
+# between two tags. The pages' inline elements never sit on their own
+# lines, so dropping these doesn't change what's rendered.
+INDENT = re.compile(r">\s*\n\s*<")
+# The same at the edges of markup next to a <style>/<script> block
+EDGES = re.compile(r"^\s*\n\s*|\s*\n\s*$")
+SPACES = re.compile(r"\s+")
+
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_STRING = re.compile(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')""")
+CSS_PUNCTUATION = re.compile(r"\s*([{};:,>])\s*")
+
+def minify_css(css):
+    css = CSS_COMMENT.sub("", css)
+    # Odd pieces are quoted strings (content: ". ", url('...')), kept as is
+    pieces = CSS_STRING.split(css)
+    for i in range(0, len(pieces), 2):
+        piece = SPACES.sub(" ", pieces[i])
+        pieces[i] = CSS_PUNCTUATION.sub(r"\1", piece).replace(";}", "}")
+    return "".join(pieces).strip()
+
+# Scripts keep their line structure (no semicolon insertion to worry
+# about); only indentation, blank lines and whole-line // comments go
+def minify_js(js):
+    lines = (line.strip() for line in js.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+def _minify_block(match):
+    opening, tag, body, closing = match.groups()
+    tag = tag.lower()
+    if tag == "style":
+        body = minify_css(body)
+    elif tag == "script":
+        body = minify_js(body)
+    return opening + body + closing
+
+# Comments and indentation are dropped and other whitespace runs
+# collapsed; <style> and <script> bodies go through their own minifiers
+# and <pre>/<textarea> are left alone
+def minify_html(html):
+    out = []
+    position = 0
+    for match in PROTECTED.finditer(html):
+        out.append(_minify_markup(html[position:match.start()]))
+        out.append(_minify_block(match))
+        position = match.end()
+    out.append(_minify_markup(html[position:]))
+    return "".join(out).strip() + "\n"
+
+def _minify_markup(markup):
+    markup = HTML_COMMENT.sub("", markup)
+    markup = INDENT.sub("><", EDGES.sub("", markup))
+    return SPACES.sub(" ", markup)
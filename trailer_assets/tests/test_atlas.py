@@ -0,0 +1,58 @@
+import re
+import pytest
+from atlas import pack, sprite_class, sprite_css, spritify_html
+
+def _overlap(a, b):
+    (ax, ay, aw, ah), (bx, by, bw, bh) = a, b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+def test_pack_places_every_image_inside_its_sheet_without_overlaps():
+    sizes = {f"images/posters/movie_{i}.jpg": (342, 513) for i in range(12)}
+    sizes.update({f"images/categories/category_{i}.jpg": (768, 432) for i in range(5)})
+    placements, sheets = pack(sizes, (2048, 2048), padding=2)
+    assert set(placements) == set(sizes)
+    boxes = {}
+    for key, (sheet, x, y) in placements.items():
+        width, height = sizes[key]
+        assert x + width <= sheets[sheet][0] <= 2048
+        assert y + height <= sheets[sheet][1] <= 2048
+        boxes.setdefault(sheet, []).append((x, y, width + 2, height + 2))
+    for rects in boxes.values():
+        for i, a in enumerate(rects):
+            assert not any(_overlap(a, b) for b in rects[i + 1:])
+
+def test_pack_starts_a_new_sheet_when_one_is_full():
+    placements, sheets = pack({name: (100, 100) for name in "abcde"}, (210, 210), padding=0)
+    assert len(sheets) == 2
+    assert sorted(sheet for sheet, _, _ in placements.values()) == [0, 0, 0, 0, 1]
+
+def test_pack_rejects_an_image_larger_than_a_sheet():
+    with pytest.raises(ValueError):
+        pack({"huge": (3000, 10)}, (2048, 2048))
+
+def _atlas():
+    return {
+        "sheets": [{"file": "images/atlas/page_sheet_0.jpg", "width": 400, "height": 300}],
+        "sprites": {
+            "images/posters/movie_1.jpg": {"sheet": 0, "x": 0, "y": 0, "width": 200, "height": 300},
+            "images/posters/movie_2.jpg": {"sheet": 0, "x": 200, "y": 0, "width": 200, "height": 300},
+        },
+    }
+
+def test_sprite_css_sizes_and_offsets_are_percentages_of_the_sheet():
+    css = sprite_css(_atlas())
+    assert ".sprite-sheet-0 { background-image: url('images/atlas/page_sheet_0.jpg'); }" in css
+    first = re.search(r"\.sprite-posters-movie_1 \{([^}]*)\}", css).group(1)
+    second = re.search(r"\.sprite-posters-movie_2 \{([^}]*)\}", css).group(1)
+    assert "background-size: 200.0000% 100.0000%" in first
+    assert "background-position: 0.0000% 0.0000%" in first
+    assert "background-position: 100.0000% 0.0000%" in second
+
+def test_spritify_html_only_replaces_images_in_the_atlas():
+    html = ('<head></head><img src="images/posters/movie_1.jpg" alt="One">'
+            '<img src="images/posters/movie_3.jpg" alt="Three">')
+    result = spritify_html(html, _atlas())
+    assert f'<span class="sprite sprite-sheet-0 {sprite_class("images/posters/movie_1.jpg")}" ' \
+           'role="img" aria-label="One"></span>' in result
+    assert '<img src="images/posters/movie_3.jpg" alt="Three">' in result
+    assert "<style>" in result
@@ -0,0 +1,22 @@
+from benchmark import compare, machine_differences
+
+def _results(items_per_s, p99_ms, seconds, cpu_count=1, platform="Linux"):
+    return {"platform": platform, "cpu_count": cpu_count,
+            "cases": [{"stage": "html", "size": 10, "items_per_s": items_per_s, "p99_ms": p99_ms,
+                       "seconds": seconds}]}
+
+def test_large_slowdowns_are_regressions():
+    regressions = compare(_results(50, 40.0, 2.0), _results(100, 20.0, 1.0))
+    assert len(regressions) == 2
+
+def test_slowdowns_below_the_absolute_floors_are_noise():
+    # Half the throughput and twice the p99, but microseconds either way
+    assert compare(_results(1500, 0.06, 0.006), _results(3000, 0.03, 0.003)) == []
+
+def test_small_relative_slowdowns_pass():
+    assert compare(_results(95, 21.0, 1.05), _results(100, 20.0, 1.0)) == []
+
+def test_machine_differences():
+    baseline = _results(100, 20.0, 1.0)
+    assert machine_differences(_results(100, 20.0, 1.0), baseline) == []
+    assert machine_differences(_results(100, 20.0, 1.0, cpu_count=8), baseline) == ["cpu_count 8 vs 1"]
@@ -0,0 +1,132 @@
+import subprocess
+import pytest
+import build
+from build import BuildState, Node, Result, critical_path, run_build, select
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("source.txt", "code.py"):
+        (tmp_path / name).write_text(name, encoding="utf-8")
+    return tmp_path
+
+@pytest.fixture
+def failing():
+    return set()
+
+@pytest.fixture
+def runs(monkeypatch, failing):
+    commands = []
+
+    # Stands in for the netfix-assets process: writes the node's output
+    # (named after its first argument) unless asked to fail
+    def run_command(command):
+        commands.append(command)
+        if command[0] in failing:
+            return subprocess.CompletedProcess(command, 1, "", "boom"), 0.0, 0.0
+        with open(command[0] + ".out", "w", encoding="utf-8") as f:
+            f.write(command[0])
+        return subprocess.CompletedProcess(command, 0, "", ""), 0.0, 0.0
+
+    monkeypatch.setattr(build, "run_command", run_command)
+    return commands
+
+def _nodes():
+    nodes = [
+        Node("fetch", ["fetch"], [], [], ["fetch.out"], None, True),
+        Node("render", ["render"], [], ["code.py", "source.txt"], ["render.out"], ["source.txt"], False),
+        Node("page", ["page"], ["render", "fetch"], ["render.out"], ["page.out"], ["render.out"], False),
+        Node("deck", ["deck"], ["render"], ["render.out"], ["deck.out"], [], False),
+    ]
+    return {node.name: node for node in nodes}
+
+def _build(nodes, names=None, **kwargs):
+    return {name: result.status
+            for name, result in run_build(nodes, names or list(nodes), jobs=1, state=BuildState(".state.json"),
+                                          **kwargs).items()}
+
+def test_an_unchanged_input_skips_the_node(workdir, runs):
+    nodes = _nodes()
+    assert set(_build(nodes).values()) == {"built"}
+    runs.clear()
+    assert set(_build(nodes).values()) == {"up to date"}
+    assert runs == []
+
+def test_a_change_the_command_checks_itself_runs_it_as_is(workdir, runs):
+    nodes = _nodes()
+    _build(nodes)
+    runs.clear()
+    (workdir / "source.txt").write_text("new titles", encoding="utf-8")
+    # render.out comes out the same, so nothing after render runs
+    assert _build(nodes) == {"fetch": "up to date", "render": "built", "page": "up to date", "deck": "up to date"}
+    assert runs == [["render"]]
+
+def test_any_other_change_passes_force(workdir, runs):
+    nodes = _nodes()
+    _build(nodes)
+    runs.clear()
+    (workdir / "code.py").write_text("new code", encoding="utf-8")
+    _build(nodes)
+    assert runs == [["render", "--force"]]
+
+def test_a_missing_output_reruns_the_node(workdir, runs):
+    nodes = _nodes()
+    _build(nodes)
+    runs.clear()
+    (workdir / "deck.out").unlink()
+    assert _build(nodes)["deck"] == "built"
+    assert runs == [["deck"]]
+
+def test_a_failed_optional_node_does_not_block_the_others(workdir, runs, failing):
+    failing.add("fetch")
+    assert _build(_nodes()) == {"fetch": "failed", "render": "built", "page": "built", "deck": "built"}
+
+def test_a_failed_node_skips_what_needs_it(workdir, runs, failing):
+    failing.add("render")
+    assert _build(_nodes()) == {"fetch": "built", "render": "failed", "page": "skipped", "deck": "skipped"}
+    # And it runs again next time
+    failing.clear()
+    assert _build(_nodes())["render"] == "built"
+
+def test_dry_run_runs_nothing(workdir, runs):
+    nodes = _nodes()
+    assert set(_build(nodes, dry_run=True).values()) == {"would run"}
+    assert runs == []
+
+def test_opt_in_nodes_only_run_when_named(workdir, runs, monkeypatch):
+    nodes = _nodes()
+    monkeypatch.setattr(build, "OPT_IN", ("fetch",))
+    assert select(nodes) == ["render", "page", "deck"]
+    assert select(nodes, ["page"]) == ["render", "page"]
+    assert select(nodes, ["fetch", "page"]) == ["fetch", "render", "page"]
+    # page doesn't wait for a fetch that wasn't selected
+    assert _build(nodes, select(nodes)) == {"render": "built", "page": "built", "deck": "built"}
+    assert ["fetch"] not in runs
+
+def test_the_default_build_leaves_out_clips_and_the_checked_in_deck():
+    nodes = build.build_nodes()
+    names = select(nodes)
+    assert "clips" not in names and "page_videos" in names
+    assert "clips" in select(nodes, ["clips"])
+    assert all("Netfix_App_Trailer.pptx" != output for name in names for output in nodes[name].outputs)
+
+def test_critical_path_follows_what_each_node_waited_for():
+    nodes = _nodes()
+    results = {
+        "fetch": Result("built", 0.0, 1.0, ""),
+        "render": Result("built", 0.0, 3.0, ""),
+        "deck": Result("built", 3.0, 4.0, ""),
+        "page": Result("built", 4.0, 6.0, ""),
+    }
+    # page needs render, but with one job slot it also had to wait for deck
+    assert critical_path(nodes, results) == [("page", "waited for a job slot (deck)"), ("deck", "needs render"),
+                                             ("render", "")]
+    results["page"] = Result("built", 3.0, 5.0, "")
+    results["deck"] = Result("up to date", 3.0, 3.0, "")
+    assert critical_path(nodes, results) == [("page", "needs render"), ("render", "")]
+    assert critical_path(nodes, {"deck": Result("up to date", 0.0, 0.0, "")}) == []
+
+def test_pages_wait_for_every_node_that_writes_the_placeholder_manifest():
+    nodes = build.build_nodes()
+    for name in ("page_trailer", "page_simple", "page_videos"):
+        assert {"posters", "banners", "simple_posters"} <= set(nodes[name].deps)
@@ -0,0 +1,134 @@
+import io
+import json
+import os
+import sys
+import threading
+import pytest
+import catalog
+import render_stream
+from catalog import CatalogError, _threaded, iter_catalog, render_catalog
+
+MOVIES = [
+    {"title": "Cosmic Adventure", "genre": "Sci-Fi", "year": 2025, "rating": 4.8},
+    {"title": "The Last Detective", "genre": "Thriller", "year": 2024, "rating": 4.6},
+    {"title": "Love in Paris", "genre": "Romance", "year": 2025, "rating": 4.5},
+]
+
+def _csv(path, rows):
+    lines = ["title,genre,year,rating"] + [",".join(str(row[field]) for field in row) for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+def _jsonl(path, rows):
+    path.write_text("".join((row if isinstance(row, str) else json.dumps(row)) + "\n" for row in rows),
+                    encoding="utf-8")
+    return str(path)
+
+def test_csv_and_jsonl_give_the_same_records(tmp_path):
+    from_csv = list(iter_catalog(_csv(tmp_path / "movies.csv", MOVIES)))
+    from_jsonl = list(iter_catalog(_jsonl(tmp_path / "movies.jsonl", MOVIES)))
+    assert from_csv == from_jsonl == MOVIES
+
+@pytest.mark.parametrize("text", [
+    "title,genre,year,rating\nJungle Quest,Adventure,2024,4.7\n",
+    '{"title": "Jungle Quest", "genre": "Adventure", "year": 2024, "rating": 4.7}\n',
+])
+def test_stdin_format_is_sniffed(monkeypatch, text):
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(text.encode("utf-8"))))
+    assert list(iter_catalog("-")) == [{"title": "Jungle Quest", "genre": "Adventure", "year": 2024,
+                                        "rating": 4.7}]
+
+def test_unknown_extension_is_an_error(tmp_path):
+    with pytest.raises(CatalogError):
+        list(iter_catalog(str(tmp_path / "movies.txt")))
+
+BAD_ROWS = [
+    MOVIES[0],
+    "{not json",
+    dict(MOVIES[1], year="soon"),
+    dict(MOVIES[1], rating=7),
+    dict(MOVIES[1], id="../escape"),
+    {"genre": "Drama", "year": 2024, "rating": 3},
+    MOVIES[2],
+]
+
+def test_bad_records_are_skipped_with_their_line(tmp_path):
+    path = _jsonl(tmp_path / "movies.jsonl", BAD_ROWS)
+    errors = []
+    records = list(iter_catalog(path, on_error=lambda *error: errors.append(error)))
+    assert records == [MOVIES[0], MOVIES[2]]
+    assert [(source, line) for source, line, _ in errors] == [(path, n) for n in range(2, 7)]
+    assert "year 'soon'" in errors[1][2]
+    assert "missing title" in errors[4][2]
+
+def test_strict_stops_at_the_first_bad_record(tmp_path):
+    path = _jsonl(tmp_path / "movies.jsonl", BAD_ROWS)
+    records = iter_catalog(path, strict=True)
+    assert next(records) == MOVIES[0]
+    with pytest.raises(CatalogError, match=f"^{path}:2: invalid JSON"):
+        next(records)
+
+def test_csv_errors_name_the_csv_line(tmp_path):
+    path = _csv(tmp_path / "movies.csv", [MOVIES[0], dict(MOVIES[1], rating="great")])
+    with pytest.raises(CatalogError, match=f"^{path}:3: rating 'great'"):
+        list(iter_catalog(path, strict=True))
+
+def test_categories_accept_bare_names_and_columns(tmp_path):
+    path = _jsonl(tmp_path / "genres.jsonl", ['"Action"', {"category": "Drama", "id": "drama"}])
+    assert list(iter_catalog(path, "banner")) == [{"name": "Action"}, {"name": "Drama", "id": "drama"}]
+
+@pytest.fixture
+def written(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = []
+    monkeypatch.setattr(render_stream, "render_record",
+                        lambda kind, key, record, *args: (key, record["title"].encode(), None))
+    monkeypatch.setattr(catalog, "write_bytes", lambda path, data: paths.append((path, data)))
+    return paths
+
+def test_pipeline_writes_in_catalog_order(written):
+    movies = [dict(MOVIES[i % 3], title=f"Title {i}") for i in range(50)]
+    assert render_catalog(movies, queue_size=2) == 50
+    assert written == [(os.path.join("images", "posters", f"movie_{i + 1}.jpg"), f"Title {i}".encode())
+                       for i in range(50)]
+
+def test_strict_failure_stops_the_pipeline_and_closes_the_file(tmp_path, written):
+    path = _jsonl(tmp_path / "movies.jsonl", MOVIES * 20 + ["{not json"] + MOVIES * 20)
+    threads = threading.active_count()
+    records = iter_catalog(path, strict=True)
+    with pytest.raises(CatalogError):
+        render_catalog(records, queue_size=2)
+    assert len(written) == 60
+    assert threading.active_count() == threads
+    assert records.gi_frame is None
+
+def test_closing_a_threaded_stage_stops_and_joins_its_producer():
+    closed = []
+
+    def source():
+        try:
+            yield from range(1000)
+        finally:
+            closed.append(True)
+
+    threads = threading.active_count()
+    items = _threaded(source(), maxsize=2)
+    assert [next(items), next(items)] == [0, 1]
+    items.close()
+    assert closed == [True]
+    assert threading.active_count() == threads
+
+def test_failed_write_stops_the_producers_and_closes_the_file(tmp_path, written, monkeypatch):
+    def write_bytes(path, data):
+        if len(written) == 5:
+            raise OSError("disk full")
+        written.append(path)
+
+    monkeypatch.setattr(catalog, "write_bytes", write_bytes)
+    path = _jsonl(tmp_path / "movies.jsonl", MOVIES * 100)
+    threads = threading.active_count()
+    records = iter_catalog(path)
+    with pytest.raises(OSError):
+        render_catalog(records, queue_size=2)
+    assert threading.active_count() == threads
+    assert records.gi_frame is None
@@ -0,0 +1,56 @@
+import json
+import os
+import pytest
+from catalog_pages import ALL_GENRES, FIELDS, write_shards
+
+GENRES = ["Drama", "Sci-Fi", "Drama", "Comedy"]
+
+def _movies(n, genres=GENRES):
+    return [{"title": f"Title {i}", "genre": genres[i % len(genres)], "year": 2000 + i % 20, "rating": 4.0}
+            for i in range(n)]
+
+def _files(shard_dir):
+    return sorted(os.path.relpath(os.path.join(root, name), shard_dir).replace(os.sep, "/")
+                  for root, _, names in os.walk(shard_dir) for name in names)
+
+def _shard(shard_dir, slug, offset):
+    with open(os.path.join(shard_dir, slug, f"{offset}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+@pytest.fixture
+def shard_dir(tmp_path):
+    return str(tmp_path / "catalog")
+
+def test_shards_hold_every_record_per_genre(shard_dir):
+    index, writer = write_shards(_movies(25), shard_dir, shard_size=10)
+    assert index["fields"] == FIELDS
+    assert [(genre["slug"], genre["count"], genre["shards"]) for genre in index["genres"]] == [
+        (ALL_GENRES, 25, 3), ("drama", 13, 2), ("comedy", 6, 1), ("sci-fi", 6, 1)]
+    assert _shard(shard_dir, ALL_GENRES, 20) == {
+        "offset": 20, "rows": [[f"movie_{i + 1}", f"Title {i}", 2000 + i % 20, 4.0, GENRES[i % 4]]
+                                 for i in range(20, 25)]}
+    assert [row[1] for row in _shard(shard_dir, "drama", 10)["rows"]] == ["Title 20", "Title 22", "Title 24"]
+    assert writer.written == 7
+    assert all(name + ".gz" in _files(shard_dir) for name in _files(shard_dir) if name.endswith(".json"))
+
+def test_unchanged_shards_are_not_rewritten(shard_dir):
+    write_shards(_movies(25), shard_dir, shard_size=10)
+    _, writer = write_shards(_movies(25), shard_dir, shard_size=10)
+    assert writer.written == 0
+    movies = _movies(25)
+    movies[24]["title"] = "Renamed"
+    _, writer = write_shards(movies, shard_dir, shard_size=10)
+    # The last shard of "All" and of its genre
+    assert writer.written == 2
+
+def test_shrinking_catalog_removes_stale_shards_and_genres(shard_dir):
+    write_shards(_movies(25), shard_dir, shard_size=10)
+    write_shards(_movies(8, ["Drama"]), shard_dir, shard_size=10, compress=False)
+    assert _files(shard_dir) == [f"{ALL_GENRES}/0.json", "drama/0.json"]
+
+def test_changing_the_shard_size_removes_the_old_offsets(shard_dir):
+    write_shards(_movies(30), shard_dir, shard_size=7)
+    assert f"{ALL_GENRES}/7.json" in _files(shard_dir)
+    write_shards(_movies(30), shard_dir, shard_size=200)
+    assert _files(shard_dir) == sorted(f"{slug}/0.json{ext}" for slug in (ALL_GENRES, "comedy", "drama", "sci-fi")
+                                       for ext in ("", ".gz"))
@@ -0,0 +1,38 @@
+import os
+import zipfile
+from PIL import Image
+from catalog_data import categories, movie_data
+from create_trailer_ppt import scene_images, update_deck
+from deck_media import DeckMedia
+from trailer_script import SceneManifest, load_graph
+
+def _image(path, color, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new("RGB", size, color).save(path, "JPEG")
+
+def _media(path):
+    with zipfile.ZipFile(path) as deck:
+        return {deck.read(name) for name in deck.namelist() if name.startswith("ppt/media/")}
+
+def test_rerendered_poster_rebuilds_its_slide(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for i in range(len(movie_data)):
+        _image(os.path.join("images", "posters", f"movie_{i + 1}.jpg"), (i * 10 % 256, 40, 80), (300, 450))
+    for i in range(len(categories)):
+        _image(os.path.join("images", "categories", f"category_{i + 1}.jpg"), (80, i * 10 % 256, 40), (800, 450))
+    graph = load_graph()
+    deck = str(tmp_path / "trailer.pptx")
+
+    assert update_deck(deck, graph, SceneManifest(), DeckMedia()) == len(graph.nodes)
+    before = _media(deck)
+    assert update_deck(deck, graph, SceneManifest(), DeckMedia()) == 0
+
+    # Same script, new poster: the slide showing it is rebuilt with it
+    poster = next(paths for paths in map(scene_images, (node.scene for node in graph.nodes)) if paths)[0]
+    _image(poster, (255, 255, 0), (300, 450))
+    assert update_deck(deck, graph, SceneManifest(), DeckMedia()) >= 1
+    after = _media(deck)
+    assert after != before
+    assert after - before
+
+    assert update_deck(deck, graph, SceneManifest(), DeckMedia()) == 0
@@ -0,0 +1,53 @@
+import random
+from io import BytesIO
+import pytest
+from PIL import Image, ImageDraw
+from encoder import MAX_QUALITY, MIN_QUALITY, EncodeSettings, encode, encode_image, similarity
+
+def _image(seed=0, size=(240, 320)):
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, (30, 30, 40))
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        draw.ellipse([x, y, x + rng.randint(10, 60), y + rng.randint(10, 60)],
+                     fill=tuple(rng.randrange(256) for _ in range(3)))
+    return image
+
+def test_similarity_of_identical_images_is_one():
+    image = _image()
+    assert similarity(image, image.copy()) == pytest.approx(1.0)
+    assert similarity(image, _image(seed=1)) < 0.9
+
+@pytest.mark.parametrize("fmt", ["jpeg", "webp"])
+def test_budget_picks_the_highest_quality_that_fits(fmt):
+    image = _image()
+    budget = len(encode(image, fmt, 60))
+    result = encode_image(image, fmt, EncodeSettings(max_bytes=budget))
+    assert len(result.data) <= budget
+    assert result.quality >= 60
+    if result.quality < MAX_QUALITY:
+        assert len(encode(image, fmt, result.quality + 1)) > budget
+
+def test_unreachable_budget_falls_back_to_the_lowest_quality():
+    result = encode_image(_image(), "jpeg", EncodeSettings(max_bytes=1))
+    assert result.quality == MIN_QUALITY
+
+def test_similarity_floor_picks_the_lowest_quality_that_meets_it():
+    image = _image()
+    result = encode_image(image, "jpeg", EncodeSettings(min_similarity=0.95))
+    assert result.similarity >= 0.95
+    if result.quality > MIN_QUALITY:
+        lower = encode(image, "jpeg", result.quality - 1)
+        assert similarity(image, Image.open(BytesIO(lower))) < 0.95
+
+def test_budget_wins_over_the_similarity_floor():
+    image = _image()
+    budget = len(encode(image, "jpeg", MIN_QUALITY + 5))
+    result = encode_image(image, "jpeg", EncodeSettings(max_bytes=budget, min_similarity=0.999))
+    assert len(result.data) <= budget
+
+def test_fixed_quality_without_budget_or_floor():
+    result = encode_image(_image(), "jpeg", EncodeSettings(quality=70))
+    assert (result.quality, result.similarity) == (70, None)
+    assert result.data == encode(_image(), "jpeg", 70)
@@ -0,0 +1,62 @@
+import os
+import re
+from catalog_data import categories, movie_data
+from pages import IMAGE_SIZES, budget_report, page_weight, responsive_images, trailer_page
+
+ENTRY = {
+    "width": 600, "height": 900, "average": "#203040", "lqip": "data:image/jpeg;base64,AAAA",
+    "variants": {
+        "jpeg": [[185, "images/posters/w185/movie_1.jpg"], [600, "images/posters/movie_1.jpg"]],
+        "webp": [[185, "images/posters/w185/movie_1.webp"], [600, "images/posters/original/movie_1.webp"]],
+    },
+}
+POSTERS = '<img src="images/posters/movie_1.jpg" alt="One"><img src="images/posters/movie_2.jpg" alt="Two">'
+
+def test_images_get_sizes_srcset_sources_and_placeholders():
+    html = responsive_images(POSTERS, {"images/posters/movie_1.jpg": ENTRY})
+    first, second = re.findall(r"<picture>.*?</picture>|<img [^>]*>", html)
+    sizes = IMAGE_SIZES["images/posters"]
+    assert first.startswith('<picture><source type="image/webp" srcset="images/posters/w185/movie_1.webp 185w, '
+                            f'images/posters/original/movie_1.webp 600w" sizes="{sizes}">')
+    assert 'width="600" height="900"' in first
+    assert ('srcset="images/posters/w185/movie_1.jpg 185w, images/posters/movie_1.jpg 600w" '
+            f'sizes="{sizes}"') in first
+    assert "background: #203040 url('data:image/jpeg;base64,AAAA')" in first
+    assert "image/avif" not in first
+    # Nothing known about the second: just lazy loading
+    assert second == '<img src="images/posters/movie_2.jpg" alt="Two" loading="lazy" decoding="async">'
+
+def test_only_the_first_eager_images_skip_lazy_loading():
+    html = responsive_images(POSTERS, {}, eager=1)
+    assert re.findall(r'(fetchpriority="high"|loading="lazy")', html) == ['fetchpriority="high"', 'loading="lazy"']
+
+def test_hero_preload_follows_the_showcased_categories():
+    html = trailer_page(movie_data, categories)
+    assert '<link rel="preload" as="image" href="images/categories/category_4.jpg" fetchpriority="high">' in html
+    assert "url('images/categories/category_4.jpg')" in html
+
+    html = trailer_page(movie_data, [{"name": "Noir", "id": "noir"}, {"name": "Western", "id": "western"}])
+    assert re.findall(r'rel="preload" as="image" href="([^"]+)"', html) == ["images/categories/western.jpg"]
+    assert "url('images/categories/western.jpg')" in html
+    assert "category_4" not in html
+
+    html = trailer_page(movie_data, [])
+    assert 'rel="preload"' not in html
+    assert "url('images/categories/" not in html
+
+def test_page_weight_counts_preloads_on_open_and_lazy_images_later(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.join("images", "categories"))
+    os.makedirs(os.path.join("images", "posters"))
+    for path, size in (("images/categories/western.jpg", 3000), ("images/posters/movie_1.jpg", 2000)):
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+    html = trailer_page(movie_data[:2], [{"name": "Western", "id": "western"}])
+    with open("page.html", "w", encoding="utf-8") as f:
+        f.write(responsive_images(html, {}))
+
+    weight = page_weight("page.html")
+    assert weight["initial"]["images/categories/western.jpg"] == 3000
+    assert weight["deferred"] == {"images/posters/movie_1.jpg": 2000}
+    assert list(weight["missing"]) == ["images/posters/movie_2.jpg"]
+    assert "within budget" in budget_report("page.html")
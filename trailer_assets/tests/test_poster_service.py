@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import poster_service
+from catalog_data import categories, movie_data
+from poster_service import ByteLRU, PosterService
+
+@pytest.fixture
+def renders(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    # Stands in for the process pool render: slow enough for concurrent
+    # requests to overlap, and fails for a title asked to
+    def render_record(kind, key, record, fmt, width):
+        with lock:
+            calls.append((kind, key, fmt, width))
+        time.sleep(0.05)
+        if record.get("title") == "Broken":
+            raise RuntimeError("render failed")
+        return key, f"{kind}:{key}:{fmt}:{width}".encode(), None
+
+    monkeypatch.setattr(poster_service, "render_record", render_record)
+    return calls
+
+@pytest.fixture
+def service():
+    service = PosterService(movie_data + [{"title": "Broken", "genre": "Drama", "year": 2024, "rating": 1.0}],
+                            categories, workers=1)
+    service.executor.shutdown()
+    service.executor = ThreadPoolExecutor(max_workers=4)
+    yield service
+    service.executor.shutdown()
+
+def _get(service, target, **headers):
+    return asyncio.run(service.handle("GET", target, headers))
+
+def test_renders_once_then_serves_from_cache(service, renders):
+    status, headers, body = _get(service, "/poster/1?w=185&fmt=webp")
+    assert (status, body) == (200, b"poster:movie_1:webp:185")
+    assert headers["Content-Type"] == "image/webp"
+    assert _get(service, "/poster/movie_1?w=185&fmt=webp")[2] == body
+    assert len(renders) == 1
+    assert service.stats["hits"] == 1
+
+def test_matching_etag_is_answered_with_304_without_rendering(service, renders):
+    etag = _get(service, "/poster/2")[1]["ETag"]
+    status, headers, body = _get(service, "/poster/2", **{"if-none-match": f'"other", {etag}'})
+    assert (status, body, headers["ETag"]) == (304, b"", etag)
+    assert len(renders) == 1
+    assert _get(service, "/poster/2?w=185")[1]["ETag"] != etag
+
+def test_concurrent_requests_share_one_render(service, renders):
+    async def burst():
+        return await asyncio.gather(*(service.handle("GET", "/banner/3?w=400", {}) for _ in range(5)))
+
+    responses = asyncio.run(burst())
+    assert {(status, body) for status, _, body in responses} == {(200, b"banner:category_3:jpeg:400")}
+    assert len(renders) == 1
+    assert service.stats["coalesced"] == 4
+
+def test_failed_render_is_a_500_and_is_retried(service, renders):
+    broken = f"/poster/{len(movie_data) + 1}"
+    assert _get(service, broken)[0] == 500
+    assert _get(service, broken)[0] == 500
+    assert len(renders) == 2
+    assert service.stats["errors"] == 2
+
+@pytest.mark.parametrize("target, status", [
+    ("/poster/999", 404),
+    ("/trailer/1", 404),
+    ("/poster/1?fmt=gif", 400),
+    ("/poster/1?w=wide", 400),
+])
+def test_bad_requests(service, renders, target, status):
+    assert _get(service, target)[0] == status
+    assert renders == []
+
+def test_width_is_clamped_to_the_master_size(service, renders):
+    assert _get(service, "/poster/1?w=5000")[2] == b"poster:movie_1:jpeg:600"
+
+def test_byte_lru_evicts_least_recently_used_by_size():
+    cache = ByteLRU(10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")
+    cache.put("c", b"1234")
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (b"1234", None, b"1234")
+    cache.put("huge", b"x" * 11)
+    assert cache.get("huge") is None
+    assert cache.size == 8
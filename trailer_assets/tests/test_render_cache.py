@@ -0,0 +1,75 @@
+import os
+import pytest
+import create_simple_trailer as simple
+import create_trailer_images as images
+from catalog_data import movie_data
+from pages import SIMPLE_POSTER_DIR
+from render_cache import RenderCache, input_key
+
+MOVIES = [dict(movie) for movie in movie_data[:3]]
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(SIMPLE_POSTER_DIR)
+    os.makedirs(os.path.join("images", "posters"))
+
+def _render(movies=MOVIES, seed=0, force=False):
+    cache = RenderCache(force=force)
+    rendered = simple.render_posters(movies, seed, cache)
+    cache.save()
+    return rendered, cache
+
+def test_unchanged_inputs_are_skipped():
+    rendered, _ = _render()
+    assert len(rendered) == len(MOVIES)
+    rendered, cache = _render()
+    assert rendered == []
+    assert cache.skipped == len(MOVIES)
+
+def test_changed_title_or_seed_renders_again():
+    _render()
+    movies = [dict(MOVIES[0], title="Cosmic Adventure II")] + MOVIES[1:]
+    assert _render(movies)[0] == ["movie_1.jpg"]
+    assert len(_render(movies, seed=1)[0]) == len(MOVIES)
+
+def test_force_renders_everything():
+    _render()
+    rendered, cache = _render(force=True)
+    assert len(rendered) == len(MOVIES)
+    assert cache.skipped == 0
+
+def test_missing_output_renders_again():
+    _render()
+    os.remove(os.path.join(SIMPLE_POSTER_DIR, "movie_2.jpg"))
+    assert _render()[0] == ["movie_2.jpg"]
+
+def test_prune_only_removes_the_owners_files_in_its_directory():
+    _render()
+    # Someone else's file in the same directory, and this owner's in another
+    other = os.path.join(SIMPLE_POSTER_DIR, "other.jpg")
+    elsewhere = os.path.join("images", "elsewhere", "movie_9.jpg")
+    cache = RenderCache()
+    for path, owner in ((other, "someone_else"), (elsewhere, simple.RENDERER_NAME)):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "wb").close()
+        cache.record(path, input_key(path=path), owner)
+    cache.save()
+
+    # The catalog shrank to one title
+    cache = RenderCache()
+    simple.render_posters(MOVIES[:1], 0, cache)
+    cache.save()
+    assert cache.pruned == len(MOVIES) - 1
+    assert sorted(os.listdir(SIMPLE_POSTER_DIR)) == ["movie_1.jpg", "other.jpg"]
+    assert os.path.exists(elsewhere)
+    assert set(RenderCache().entries) == {os.path.join(SIMPLE_POSTER_DIR, "movie_1.jpg"), other, elsewhere}
+
+def test_generators_keep_each_others_cache_entries():
+    _render()
+    cache = RenderCache()
+    images.render_posters(MOVIES, cache=cache)
+    cache.save()
+    assert _render()[0] == []
+    cache = RenderCache()
+    assert images.render_posters(MOVIES, cache=cache) == []
@@ -0,0 +1,58 @@
+import pytest
+from templates import Template, minify_css, minify_html, minify_js
+
+def test_slots_are_escaped_unless_raw():
+    template = Template('<a title="{{ title }}">{{title}}</a>{{extra|raw}}')
+    html = template.render({"title": 'Tom & "Jerry" <3'}, extra="<b>new</b>")
+    assert html == '<a title="Tom &amp; &quot;Jerry&quot; &lt;3">Tom &amp; &quot;Jerry&quot; &lt;3</a><b>new</b>'
+
+def test_keyword_values_override_the_record():
+    assert Template("{{year}} {{title}}").render({"title": "A", "year": 2024}, title="B") == "2024 B"
+    assert Template("{{rating}}").render(rating=4.5) == "4.5"
+
+def test_a_missing_value_is_an_error():
+    with pytest.raises(KeyError):
+        Template("{{title}} {{genre}}").render(title="A")
+
+def test_template_is_parsed_once():
+    template = Template("<p>{{a}}</p><p>{{b|raw}}</p>")
+    assert template.parts == ["<p>", ("a", False), "</p><p>", ("b", True), "</p>"]
+    assert template.names == {"a", "b"}
+
+def test_minify_html_drops_indentation_and_comments_only():
+    html = """<!DOCTYPE html>
+<html>
+    <body>
+        <!-- a comment -->
+        <p>Some   <b>bold</b> text</p>
+        <pre>  keep
+   this  </pre>
+    </body>
+</html>
+"""
+    assert minify_html(html) == ("<!DOCTYPE html><html><body><p>Some <b>bold</b> text</p>"
+                                 "<pre>  keep\n   this  </pre></body></html>\n")
+
+def test_minify_css_keeps_strings():
+    css = """
+        /* header */
+        .a > .b {
+            content: " : ";
+            background: url('images/a b.jpg');
+        }
+    """
+    assert minify_css(css) == """.a>.b{content:" : ";background:url('images/a b.jpg')}"""
+
+def test_minify_js_keeps_lines_and_drops_comment_lines():
+    js = """
+        // set up
+        const a = 1
+        const b = "// not a comment"
+
+    """
+    assert minify_js(js) == 'const a = 1\nconst b = "// not a comment"'
+
+def test_minify_html_minifies_style_and_script_blocks():
+    html = ("<head>\n    <style>\n        p { color: red; }\n    </style>\n"
+            "    <script>\n        // x\n        go()\n    </script>\n</head>")
+    assert minify_html(html) == "<head><style>p{color:red}</style><script>go()</script></head>\n"
@@ -0,0 +1,80 @@
+from collections import namedtuple
+from functools import lru_cache
+from font_registry import SANS_FONTS, draw_text_layer, get_font
+
+# Result of fitting a piece of text into a box
+#   size        - font size chosen
+#   lines       - wrapped lines, top to bottom
+#   line_height - distance between line centers in pixels
+Layout = namedtuple("Layout", ["size", "lines", "line_height"])
+
+# Width and height of a single line of text. Memoized per (font, size,
+# string) so fitting a large catalog never measures the same text twice.
+@lru_cache(maxsize=65536)
+def measure(text, size, candidates=tuple(SANS_FONTS)):
+    left, top, right, bottom = get_font(size, candidates).getbbox(text)
+    return right - left, bottom - top
+
+# Baseline-to-baseline distance for a font size
+@lru_cache(maxsize=None)
+def line_height(size, spacing=1.15, candidates=tuple(SANS_FONTS)):
+    ascent, descent = get_font(size, candidates).getmetrics()
+    return int(round((ascent + descent) * spacing))
+
+# Greedy word wrap. A single word wider than max_width stays on its own
+# line; the caller's fit check rejects that size.
+def wrap_lines(text, size, max_width, candidates=tuple(SANS_FONTS)):
+    words = text.split()
+    if not words:
+        return [""]
+
+    lines = [words[0]]
+    for word in words[1:]:
+        candidate = f"{lines[-1]} {word}"
+        if measure(candidate, size, candidates)[0] <= max_width:
+            lines[-1] = candidate
+        else:
+            lines.append(word)
+    return lines
+
+# Lines for text at size, or None if it doesn't fit the box
+def _layout_at(text, size, box_width, box_height, max_lines, spacing, candidates):
+    lines = wrap_lines(text, size, box_width, candidates)
+    if len(lines) > max_lines:
+        return None
+    if any(measure(line, size, candidates)[0] > box_width for line in lines):
+        return None
+    step = line_height(size, spacing, candidates)
+    if step * len(lines) > box_height:
+        return None
+    return Layout(size, lines, step)
+
+# Binary-search the largest font size (min_size..max_size) at which the
+# wrapped text fits inside the box. Falls back to min_size, which may
+# still overflow for pathological input.
+@lru_cache(maxsize=4096)
+def fit_text(text, box_width, box_height, max_size, min_size=12, max_lines=3,
+             spacing=1.15, candidates=tuple(SANS_FONTS)):
+    best = None
+    low, high = min_size, max_size
+    while low <= high:
+        size = (low + high) // 2
+        layout = _layout_at(text, size, box_width, box_height, max_lines, spacing, candidates)
+        if layout:
+            best = layout
+            low = size + 1
+        else:
+            high = size - 1
+
+    if best is None:
+        lines = wrap_lines(text, min_size, box_width, candidates)
+        best = Layout(min_size, lines, line_height(min_size, spacing, candidates))
+    return best
+
+# Draw a layout centered on (x, y), one cached text layer per line
+def draw_layout(image, xy, layout, fill, shadow_offset=0):
+    x, y = xy
+    first_y = y - layout.line_height * (len(layout.lines) - 1) // 2
+    for i, line in enumerate(layout.lines):
+        draw_text_layer(image, (x, first_y + i * layout.line_height), line,
+                        layout.size, fill, shadow_offset)
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from file_lock import locked, read_json, write_json
+
+# Parser for trailer_script.txt:
+#
+#     [SCENE 1: INTRO]
+#     - Fade in from black
+#     - Text overlay: "Introducing Netfix - Your Ultimate Streaming Experience"
+#     ...
+#     TOTAL DURATION: 1-2 minutes
+#
+# Each scene keeps its directions in order; quoted text overlays and
+# calls to action are pulled out, and "Fade in from black"/"Fade to
+# black" become flags. Lines for the deck and pages rather than the
+# video aren't directions:
+#
+#     - Heading: "Discover Content"
+#     - Feature: "Trending now section" "Optional one-line description"
+#     - Showcase: categories
+#
+# give the scene's slide/section heading, its feature bullets, and the
+# block of catalog content its page section shows ("categories" tiles,
+# "trending" movie cards or the downloaded "clips").
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trailer_script.txt")
+
+#   number          - scene number from the header
+#   name            - e.g. "MOVIE CATEGORIES"
+#   directions      - every "- ..." line, in order
+#   overlays        - quoted text of the "Text overlay:" lines
+#   call_to_action  - quoted text of a "Call to action:" line, or None
+#   fade_in/out     - fades from/to black at the scene boundaries
+#   heading         - quoted text of a "Heading:" line, or None
+#   features        - (title, description) of each "Feature:" line; the
+#                     description is "" when there's only one quote
+#   showcase        - the word after "Showcase:", or None
+Scene = namedtuple("Scene", ["number", "name", "directions", "overlays", "call_to_action",
+                             "fade_in", "fade_out", "heading", "features", "showcase"])
+Script = namedtuple("Script", ["title", "scenes", "duration"])
+
+class ScriptError(ValueError):
+    pass
+
+SCENE_HEADER = re.compile(r"^\[SCENE\s+(\d+)\s*:\s*(.+?)\]$", re.IGNORECASE)
+QUOTED = re.compile(r'"([^"]*)"')
+DURATION = re.compile(r"^TOTAL DURATION\s*:\s*(\d+(?:\.\d+)?)(?:\s*-\s*(\d+(?:\.\d+)?))?\s*(minutes?|seconds?)",
+                      re.IGNORECASE)
+
+def _quoted(direction):
+    match = QUOTED.search(direction)
+    return match.group(1) if match else direction.split(":", 1)[1].strip()
+
+def _scene(number, name, lines):
+    directions = []
+    overlays = []
+    call_to_action = heading = showcase = None
+    features = []
+    for line in lines:
+        label = line.split(":", 1)[0].strip().lower() if ":" in line else ""
+        if label == "heading":
+            heading = _quoted(line)
+        elif label == "feature":
+            quoted = QUOTED.findall(line)
+            features.append((quoted[0], quoted[1] if len(quoted) > 1 else "") if quoted
+                            else (line.split(":", 1)[1].strip(), ""))
+        elif label == "showcase":
+            showcase = line.split(":", 1)[1].strip().lower() or None
+        else:
+            directions.append(line)
+            if label == "text overlay":
+                overlays.append(_quoted(line))
+            elif label == "call to action":
+                call_to_action = _quoted(line)
+    lowered = [direction.lower() for direction in directions]
+    return Scene(
+        number=number,
+        name=name,
+        directions=tuple(directions),
+        overlays=tuple(overlays),
+        call_to_action=call_to_action,
+        fade_in=any(d.startswith("fade in") for d in lowered),
+        fade_out=any(d.startswith("fade to black") or d.startswith("fade out") for d in lowered),
+        heading=heading,
+        features=tuple(features),
+        showcase=showcase,
+    )
+
+# Script from the text of a trailer script. duration is (shortest,
+# longest) in seconds from the TOTAL DURATION line, or None.
+def parse_script(text):
+    title = None
+    scenes = []
+    duration = None
+    current = None
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+        header = SCENE_HEADER.match(line)
+        total = DURATION.match(line)
+        if header:
+            if current:
+                scenes.append(_scene(*current))
+            current = (int(header.group(1)), header.group(2).strip(), [])
+        elif total:
+            low = float(total.group(1))
+            high = float(total.group(2) or low)
+            scale = 60 if total.group(3).lower().startswith("minute") else 1
+            duration = (low * scale, high * scale)
+        elif line.startswith("-"):
+            if current is None:
+                raise ScriptError(f"line {line_number}: direction before the first [SCENE n: NAME] header")
+            current[2].append(line[1:].strip())
+        elif title is None and current is None:
+            title = line
+        else:
+            raise ScriptError(f"line {line_number}: expected a scene header or a '- ' direction")
+    if current:
+        scenes.append(_scene(*current))
+    if not scenes:
+        raise ScriptError("no [SCENE n: NAME] sections found")
+    return Script(title, tuple(scenes), duration)
+
+def load_script(path=SCRIPT_PATH):
+    with open(path, encoding="utf-8") as f:
+        return parse_script(f.read())
+
+# What a scene shows behind its text (video) or beside it (deck): the logo, a scroll across category
+# banners, or a row of posters
+def scene_backdrop(scene):
+    text = " ".join((scene.name,) + scene.directions).lower()
+    if "logo" in text:
+        return "logo"
+    if "categor" in text:
+        return "categories"
+    return "posters"
+
+# Scene graph: the script's scenes in order, each with the content the
+# deck and pages show for it
+#   layout       - "title" for logo scenes, otherwise "features"
+#   title        - slide/section heading: the scene's Heading, else its name
+#   subtitle     - tagline (text overlays, then the call to action)
+#   features     - (title, description) pairs: the scene's Feature lines,
+#                  else the directions that aren't overlays, calls to
+#                  action or fades, without descriptions
+#   bullets      - the feature titles, one per slide bullet
+#   showcase     - catalog block shown with the page section, or None
+#   transition   - how the scene hands over to the next: "fade" or "cut"
+#   fingerprint  - hash of all of the above; a scene whose fingerprint is
+#                  unchanged doesn't need its slide rebuilt
+SceneNode = namedtuple("SceneNode", ["scene", "layout", "title", "subtitle", "features", "bullets",
+                                     "showcase", "transition", "fingerprint"])
+SceneGraph = namedtuple("SceneGraph", ["title", "nodes", "duration"])
+
+# Bump whenever scene_graph() derives content differently
+GRAPH_VERSION = 2
+
+# Directions that only describe camera work, not content to show
+STAGE_DIRECTIONS = ("fade in", "fade to black", "fade out", "text overlay", "call to action")
+
+def _fingerprint(fields):
+    payload = json.dumps([GRAPH_VERSION] + list(fields), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def scene_node(scene, next_scene=None):
+    if any("logo" in direction.lower() for direction in scene.directions):
+        layout, title = "title", "NETFIX"
+    else:
+        layout, title = "features", scene.heading or scene.name.title()
+    taglines = list(scene.overlays) + ([scene.call_to_action] if scene.call_to_action else [])
+    subtitle = ". ".join(line.rstrip(".") for line in taglines) + ("." if len(taglines) > 1 else "")
+    features = scene.features or tuple((direction, "") for direction in scene.directions
+                                       if not direction.lower().startswith(STAGE_DIRECTIONS))
+    bullets = tuple(feature for feature, _ in features)
+    fade = scene.fade_out or (next_scene is not None and next_scene.fade_in)
+    transition = "fade" if fade else "cut"
+    fields = (scene.number, scene.name, scene.directions, scene.call_to_action, layout, title, subtitle,
+              features, scene.showcase, transition)
+    return SceneNode(scene, layout, title, subtitle, features, bullets, scene.showcase, transition,
+                     _fingerprint(fields))
+
+def scene_graph(script):
+    scenes = script.scenes
+    nodes = tuple(scene_node(scene, scenes[i + 1] if i + 1 < len(scenes) else None)
+                  for i, scene in enumerate(scenes))
+    return SceneGraph(script.title, nodes, script.duration)
+
+def load_graph(path=SCRIPT_PATH):
+    return scene_graph(load_script(path))
+
+SCENE_MANIFEST = os.path.join("images", ".scene_manifest.json")
+
+# Which scene fingerprints each deck was last built from and the key each
+# page was last written with, so a rebuild only redoes the slides and
+# pages that changed
+class SceneManifest:
+    def __init__(self, manifest_path=SCENE_MANIFEST, force=False):
+        self.manifest_path = manifest_path
+        self.force = force
+        data = read_json(manifest_path, {})
+        self.artifacts = data.get("artifacts", {})
+        self.pages = data.get("pages", {})
+        # Decks and pages recorded since the last save, the only entries
+        # save() writes back
+        self._recorded = set()
+
+    # Nodes whose output in artifact is out of date, or None when the
+    # whole artifact has to be rebuilt (missing, forced, or scenes added,
+    # removed or reordered). keys, one per node, are what each node's
+    # output is built from when that's more than its fingerprint.
+    def changed(self, artifact, graph, keys=None):
+        previous = self.artifacts.get(artifact)
+        if self.force or previous is None or not os.path.exists(artifact):
+            return None
+        if [number for number, _ in previous] != [node.scene.number for node in graph.nodes]:
+            return None
+        built = dict((number, key) for number, key in previous)
+        keys = keys or [node.fingerprint for node in graph.nodes]
+        return [node for node, key in zip(graph.nodes, keys) if built[node.scene.number] != key]
+
+    def record(self, artifact, graph, keys=None):
+        keys = keys or [node.fingerprint for node in graph.nodes]
+        self.artifacts[artifact] = [[node.scene.number, key] for node, key in zip(graph.nodes, keys)]
+        self._recorded.add(("artifacts", artifact))
+
+    # Whether the page at path was last written with this key (a digest
+    # of everything that goes into it, see pages.write_page())
+    def page_current(self, path, key):
+        return not self.force and self.pages.get(path, {}).get("key") == key
+
+    def record_page(self, path, key):
+        self.pages[path] = {"key": key}
+        self._recorded.add(("pages", path))
+
+    # Merged with what other processes (the build writes the pages and
+    # the deck at once) saved since this manifest was read
+    def save(self):
+        with locked(self.manifest_path):
+            data = read_json(self.manifest_path, {})
+            sections = {"artifacts": data.get("artifacts", {}), "pages": data.get("pages", {})}
+            for section, name in self._recorded:
+                sections[section][name] = getattr(self, section)[name]
+            self.artifacts, self.pages = sections["artifacts"], sections["pages"]
+            write_json(self.manifest_path, {"artifacts": self.artifacts, "pages": self.pages},
+                       indent=2, sort_keys=True)
+        self._recorded = set()
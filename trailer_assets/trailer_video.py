@@ -0,0 +1,337 @@
+import argparse
+import os
+import subprocess
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+from PIL import Image
+from clip_posters import find_ffmpeg
+from create_trailer_images import (categories, item_seed, movie_data, render_category_banner,
+                                   render_movie_poster)
+from instrumentation import collect, count, merge, report as report_metrics, reset, timed
+from text_layout import draw_layout, fit_text
+from trailer_script import SCRIPT_PATH, ScriptError, load_script, scene_backdrop
+
+# Renders trailer_script.txt to an MP4: every scene gets a share of the
+# running time, a backdrop built from the generated posters/banners (or
+# the logo), its text overlays and fades. Frames are composited with
+# NumPy in worker processes a few chunks ahead of the encoder and piped
+# to ffmpeg's stdin as raw RGB, so nothing touches the disk but the MP4.
+#
+#     python trailer_video.py --output netfix_trailer.mp4 --workers 0
+RENDERER_NAME = "trailer_video"
+DEFAULT_OUTPUT = "netfix_trailer.mp4"
+FPS = 24
+HEIGHT = 1080
+
+# Seconds of the fades the script asks for, and of the dip to black
+# between any two other scenes
+FADE_SECONDS = 1.5
+CUT_SECONDS = 0.4
+# Frames a worker renders per task, and tasks queued ahead of the encoder
+# per worker (each 1080p frame is ~6 MB)
+FRAMES_PER_TASK = 8
+TASKS_AHEAD = 2
+
+# scene - trailer_script.Scene; start/length in seconds
+Shot = namedtuple("Shot", ["scene", "start", "length"])
+
+# Split the running time between scenes in proportion to how many
+# directions each has (at least two shares, so short scenes stay readable)
+def timeline(scenes, duration):
+    weights = [max(2, len(scene.directions)) for scene in scenes]
+    total = float(sum(weights))
+    shots = []
+    start = 0.0
+    for scene, weight in zip(scenes, weights):
+        length = duration * weight / total
+        shots.append(Shot(scene, start, length))
+        start += length
+    return shots
+
+def _smoothstep(p):
+    p = min(max(p, 0.0), 1.0)
+    return p * p * (3 - 2 * p)
+
+def _cover(image, size):
+    scale = max(size[0] / image.width, size[1] / image.height)
+    resized = image.resize((max(size[0], round(image.width * scale)), max(size[1], round(image.height * scale))),
+                           Image.LANCZOS, reducing_gap=3.0)
+    left = (resized.width - size[0]) // 2
+    top = (resized.height - size[1]) // 2
+    return resized.crop((left, top, left + size[0], top + size[1]))
+
+# The rendered poster/banner if it's on disk, otherwise the same image
+# rendered in memory from the same seed
+def _poster(index):
+    filename = f"movie_{index + 1}.jpg"
+    path = os.path.join("images", "posters", filename)
+    if os.path.exists(path):
+        return Image.open(path).convert("RGB")
+    movie = movie_data[index]
+    return render_movie_poster(movie["title"], movie["genre"], movie["year"], movie["rating"],
+                               seed=item_seed("poster", filename))
+
+def _banner(index):
+    filename = f"category_{index + 1}.jpg"
+    path = os.path.join("images", "categories", filename)
+    if os.path.exists(path):
+        return Image.open(path).convert("RGB")
+    return render_category_banner(categories[index], seed=item_seed("banner", filename))
+
+# Text rendered once into an RGB + alpha pair, cropped to what's drawn.
+# Returns (rgb, alpha, x, y) for compositing at (x, y).
+def _text_layer(size, text, center_y, max_size, color, box_height=None, max_lines=2):
+    width, height = size
+    box_height = box_height or max_size * 3
+    canvas = Image.new("RGBA", (width, min(height, box_height * 2)), (0, 0, 0, 0))
+    layout = fit_text(text, width - width // 8, box_height, max_size, min_size=max(12, max_size // 3),
+                      max_lines=max_lines)
+    draw_layout(canvas, (width // 2, canvas.height // 2), layout, color, shadow_offset=max(2, max_size // 24))
+    box = canvas.getbbox()
+    if box is None:
+        return None
+    pixels = np.asarray(canvas.crop(box), dtype=np.float32)
+    y = center_y - canvas.height // 2 + box[1]
+    return pixels[..., :3], pixels[..., 3] / 255.0, box[0], y
+
+# Everything a scene needs per frame, built once per worker process
+class SceneAssets:
+    def __init__(self, scene, size):
+        width, height = size
+        self.kind = scene_backdrop(scene)
+        self.strip = None
+        self.logo = None
+        scale = height / 1080.0
+
+        if self.kind == "logo":
+            self.logo = _text_layer(size, "NETFIX", int(height * 0.42), int(220 * scale), (229, 9, 20),
+                                    max_lines=1)
+        elif self.kind == "categories":
+            # Banners named in the directions, in list order (all of them if none are)
+            text = " ".join(scene.directions).lower()
+            picked = [i for i, name in enumerate(categories) if name.lower() in text] or range(len(categories))
+            self.strip = np.concatenate([np.asarray(_cover(_banner(i), size)) for i in picked], axis=1)
+        else:
+            # A row of posters, starting at a different movie per scene
+            poster_height = int(height * 0.62)
+            poster_width = poster_height * 2 // 3
+            gap = poster_width // 8
+            needed = (width * 2) // (poster_width + gap) + 1
+            strip_width = needed * (poster_width + gap) + gap
+            strip = np.full((height, strip_width, 3), 20, dtype=np.uint8)
+            top = int(height * 0.08)
+            for slot in range(needed):
+                index = (scene.number * 3 + slot) % len(movie_data)
+                poster = _poster(index).resize((poster_width, poster_height), Image.LANCZOS, reducing_gap=3.0)
+                left = gap + slot * (poster_width + gap)
+                strip[top:top + poster_height, left:left + poster_width] = np.asarray(poster)
+            self.strip = strip
+
+        # Overlays stack upwards from the bottom; a call to action sits below them
+        self.overlays = []
+        y = int(height * (0.80 if scene.call_to_action else 0.86))
+        for text in reversed(scene.overlays):
+            self.overlays.insert(0, _text_layer(size, text, y, int(64 * scale), (255, 255, 255)))
+            y -= int(150 * scale)
+        self.call_to_action = None
+        if scene.call_to_action:
+            self.call_to_action = _text_layer(size, scene.call_to_action, int(height * 0.92), int(56 * scale),
+                                              (229, 9, 20), max_lines=1)
+
+def _blend(frame, layer, opacity):
+    if layer is None or opacity <= 0:
+        return
+    rgb, alpha, x, y = layer
+    # Clip the layer to the frame
+    top, left = max(0, -y), max(0, -x)
+    bottom = min(alpha.shape[0], frame.shape[0] - y)
+    right = min(alpha.shape[1], frame.shape[1] - x)
+    if top >= bottom or left >= right:
+        return
+    region = frame[y + top:y + bottom, x + left:x + right]
+    mixed = region.astype(np.float32)
+    mixed += (rgb[top:bottom, left:right] - mixed) * (alpha[top:bottom, left:right] * opacity)[..., None]
+    region[:] = mixed
+
+# Composites frames for a script at a size; scene assets are built the
+# first time a frame of that scene is asked for
+class FrameRenderer:
+    def __init__(self, script, size, fps, duration):
+        self.size = size
+        self.fps = fps
+        self.shots = timeline(script.scenes, duration)
+        self.frame_count = int(round(duration * fps))
+        self.assets = {}
+
+    def _shot(self, t):
+        for shot in self.shots:
+            if t < shot.start + shot.length:
+                return shot
+        return self.shots[-1]
+
+    def _assets(self, scene):
+        assets = self.assets.get(scene.number)
+        if assets is None:
+            with timed("scene_setup"):
+                assets = self.assets[scene.number] = SceneAssets(scene, self.size)
+        return assets
+
+    def render(self, index):
+        width, height = self.size
+        t = index / self.fps
+        shot = self._shot(t)
+        local = t - shot.start
+        progress = local / shot.length
+        assets = self._assets(shot.scene)
+
+        if assets.strip is None:
+            frame = np.zeros((height, width, 3), dtype=np.uint8)
+        else:
+            offset = int(_smoothstep(progress) * (assets.strip.shape[1] - width))
+            frame = assets.strip[:, offset:offset + width].copy()
+
+        if assets.logo is not None:
+            _blend(frame, assets.logo, _smoothstep(local / 1.5))
+        # Each overlay eases in half a second after the one above it
+        for i, layer in enumerate(assets.overlays):
+            _blend(frame, layer, _smoothstep((local - 0.5 - 0.5 * i) / 0.5))
+        if assets.call_to_action is not None:
+            _blend(frame, assets.call_to_action, _smoothstep((progress - 0.5) * shot.length / 0.5))
+
+        fade_in = FADE_SECONDS if shot.scene.fade_in else CUT_SECONDS
+        fade_out = FADE_SECONDS if shot.scene.fade_out else CUT_SECONDS
+        level = min(1.0, local / fade_in, (shot.length - local) / fade_out)
+        if level < 1.0:
+            frame = (frame.astype(np.uint16) * int(max(level, 0.0) * 256) >> 8).astype(np.uint8)
+        return frame
+
+    def render_range(self, span):
+        start, stop = span
+        frames = []
+        for index in range(start, stop):
+            with timed("frame_render"):
+                frames.append(self.render(index).tobytes())
+        count("frames_rendered", stop - start)
+        return b"".join(frames)
+
+# Each worker process builds its own renderer (and scene assets) once
+_renderer = None
+
+def _init_worker(script, size, fps, duration):
+    global _renderer
+    reset()
+    _renderer = FrameRenderer(script, size, fps, duration)
+
+def _render_span(span):
+    return _renderer.render_range(span)
+
+# Raw RGB frames in order, rendered serially or by a pool that stays at
+# most workers * TASKS_AHEAD chunks ahead of the consumer
+def iter_frames(script, size, fps, duration, workers=1):
+    renderer = FrameRenderer(script, size, fps, duration)
+    spans = [(start, min(start + FRAMES_PER_TASK, renderer.frame_count))
+             for start in range(0, renderer.frame_count, FRAMES_PER_TASK)]
+    if workers <= 1:
+        for span in spans:
+            yield renderer.render_range(span)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(script, size, fps, duration)) as executor:
+        pending = deque()
+        spans = iter(spans)
+        for span in spans:
+            pending.append(executor.submit(partial(collect, _render_span), span))
+            if len(pending) >= workers * TASKS_AHEAD:
+                break
+        while pending:
+            data, metrics = pending.popleft().result()
+            merge(metrics)
+            span = next(spans, None)
+            if span is not None:
+                pending.append(executor.submit(partial(collect, _render_span), span))
+            yield data
+
+# ffmpeg reading raw RGB frames from stdin and writing H.264 in an MP4
+def encoder_command(ffmpeg, output, size, fps, crf=20, preset="veryfast"):
+    return [
+        ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{size[0]}x{size[1]}", "-r", str(fps), "-i", "-",
+        "-c:v", "libx264", "-preset", preset, "-crf", str(crf), "-pix_fmt", "yuv420p",
+        "-movflags", "+faststart", output,
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Render trailer_script.txt to an MP4 trailer")
+    parser.add_argument("--script", default=SCRIPT_PATH)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--height", type=int, default=HEIGHT, help="frame height; width is 16:9")
+    parser.add_argument("--fps", type=int, default=FPS)
+    parser.add_argument("--duration", type=float, default=None,
+                        help="running time in seconds (default: the script's shortest TOTAL DURATION, else 60)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="frame render processes (0 = one per CPU core)")
+    parser.add_argument("--crf", type=int, default=20, help="x264 quality (lower is better)")
+    parser.add_argument("--preset", default="veryfast", help="x264 speed preset")
+    parser.add_argument("--ffmpeg", default=None, help="ffmpeg binary (default: $NETFIX_FFMPEG or PATH)")
+    parser.add_argument("--null", action="store_true",
+                        help="render and discard the frames, e.g. to time frame generation without ffmpeg")
+    args = parser.parse_args()
+
+    if args.fps <= 0:
+        parser.error("--fps must be positive")
+    if args.height < 2:
+        parser.error("--height must be at least 2")
+    try:
+        script = load_script(args.script)
+    except (OSError, ScriptError) as e:
+        parser.exit(1, f"Can't read {args.script}: {e}\n")
+    if args.duration is not None:
+        duration = args.duration
+    else:
+        duration = script.duration[0] if script.duration else 60.0
+    if int(round(duration * args.fps)) < 1:
+        parser.exit(1, f"A {duration:g}s trailer at {args.fps} fps has no frames; "
+                       "give a positive --duration or TOTAL DURATION\n")
+    size = (args.height * 16 // 9 // 2 * 2, args.height // 2 * 2)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+
+    encoder = None
+    if not args.null:
+        ffmpeg = find_ffmpeg(args.ffmpeg)
+        if not ffmpeg:
+            parser.exit(1, "ffmpeg not found; install it, pass --ffmpeg or set NETFIX_FFMPEG (or use --null)\n")
+        encoder = subprocess.Popen(encoder_command(ffmpeg, args.output, size, args.fps, args.crf, args.preset),
+                                   stdin=subprocess.PIPE)
+
+    started = time.perf_counter()
+    frames = 0
+    frame_bytes = size[0] * size[1] * 3
+    try:
+        for data in iter_frames(script, size, args.fps, duration, workers):
+            if encoder is not None:
+                with timed("frame_write"):
+                    encoder.stdin.write(data)
+            frames += len(data) // frame_bytes
+    except BrokenPipeError:
+        encoder.wait()
+        parser.exit(1, f"ffmpeg exited early with status {encoder.returncode}\n")
+    if encoder is not None:
+        encoder.stdin.close()
+        with timed("encode_finish"):
+            if encoder.wait() != 0:
+                parser.exit(1, f"ffmpeg failed with status {encoder.returncode}\n")
+
+    elapsed = time.perf_counter() - started
+    video_seconds = frames / args.fps
+    print(f"Rendered {frames} frames ({video_seconds:.1f}s at {size[0]}x{size[1]}) in {elapsed:.1f}s, "
+          f"{elapsed / video_seconds:.2f}x real time")
+    if encoder is not None:
+        print(f"Trailer video created: {args.output}")
+    report_metrics(RENDERER_NAME)
+
+if __name__ == "__main__":
+    main()